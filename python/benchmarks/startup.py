@@ -0,0 +1,129 @@
+"""CLI startup benchmark: import-time profile and time-to-first-byte per command
+
+Usage (from python/):
+    python -m benchmarks.startup [command ...] [--runs N] [--top N]
+
+Each command is started as `python -X importtime -m src.main <command> ...`.
+The timer stops at the first byte the command writes to stdout, and the process is
+then killed, so no vehicle is needed. The cold run uses an empty bytecode cache
+(PYTHONPYCACHEPREFIX pointing at a fresh directory). Warm runs reuse that cache.
+"""
+import os
+import select
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Commands with the minimum arguments needed to reach their first output line
+COMMANDS: dict[str, list[str]] = {
+    "rc-status": [],
+    "rc-monitor": ["1"],
+    "ekf-status": [],
+    "ekf-monitor": ["1"],
+    "heartbeat-monitor": ["udpin://127.0.0.1:14599", "1"],
+    "compare-params": ["/dev/null", "57600"],
+    "configure-telem2": ["/dev/null", "57600"],
+    "reboot": ["/dev/null", "57600"],
+    "mavsdk-ekf-status": [],
+    "takeoff": [],
+}
+
+# Unused UDP port: commands print their banner, then block waiting for a heartbeat
+BENCH_ADDRESS = "udpin://127.0.0.1:14599"
+FIRST_BYTE_TIMEOUT = 30.0
+
+
+def _run_once(command: str, args: list[str], pycache: str) -> tuple[float | None, list[tuple[int, int, str]]]:
+    """Start one command and measure time to its first stdout byte.
+
+    Returns:
+        Tuple of (seconds to first byte or None on timeout/no output, importtime rows)
+    """
+    env = dict(os.environ, DRONE_ADDRESS=BENCH_ADDRESS, PYTHONPYCACHEPREFIX=pycache, PYTHONUNBUFFERED="1")
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-X", "importtime", "-m", "src.main", command, *args],
+        cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    ready, _, _ = select.select([proc.stdout], [], [], FIRST_BYTE_TIMEOUT)
+    ttfb = time.perf_counter() - start if ready and proc.stdout.read(1) else None
+
+    proc.kill()
+    _, stderr = proc.communicate()
+    return ttfb, _parse_importtime(stderr.decode(errors="replace"))
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Parse `-X importtime` output into (self_us, cumulative_us, module) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def _total_import_us(rows: list[tuple[int, int, str]]) -> int:
+    """Sum cumulative time of top-level imports (those not nested in another)."""
+    return sum(cumulative for _, cumulative, name in rows if not name.startswith("  "))
+
+
+def benchmark(commands: list[str], runs: int = 5, top: int = 5) -> None:
+    """Print cold/warm time-to-first-byte and the heaviest imports per command.
+
+    Args:
+        commands: Command names from COMMANDS
+        runs: Number of warm runs (median is reported)
+        top: Number of heaviest top-level imports to show per command
+    """
+    print(f"{'Command':20} | {'Cold TTFB':>10} | {'Warm TTFB':>10} | {'Imports':>9} | {'Modules':>7}")
+    print("-" * 70)
+
+    for command in commands:
+        with tempfile.TemporaryDirectory() as pycache:
+            cold, _ = _run_once(command, COMMANDS[command], pycache)
+            warm_runs = [_run_once(command, COMMANDS[command], pycache) for _ in range(runs)]
+
+        warm_times = [t for t, _ in warm_runs if t is not None]
+        rows = warm_runs[-1][1]
+        cold_str = f"{cold * 1000:8.1f}ms" if cold is not None else "no output"
+        warm_str = f"{statistics.median(warm_times) * 1000:8.1f}ms" if warm_times else "no output"
+        print(f"{command:20} | {cold_str:>10} | {warm_str:>10} | "
+              f"{_total_import_us(rows) / 1000:7.1f}ms | {len(rows):7d}")
+
+        heaviest = sorted((r for r in rows if not r[2].startswith("  ")), key=lambda r: r[1], reverse=True)
+        for _, cumulative, name in heaviest[:top]:
+            print(f"{'':20} |   {cumulative / 1000:7.1f}ms  {name.strip()}")
+
+
+def main(argv: list[str]) -> None:
+    """Parse arguments and run the benchmark."""
+    runs, top, commands = 5, 5, []
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--runs":
+            runs = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--top":
+            top = int(argv[i + 1])
+            i += 2
+        else:
+            commands.append(argv[i])
+            i += 1
+
+    unknown = [c for c in commands if c not in COMMANDS]
+    if unknown:
+        print(f"Unknown command(s): {', '.join(unknown)}")
+        print(f"Available commands: {', '.join(sorted(COMMANDS))}")
+        sys.exit(1)
+
+    benchmark(commands or list(COMMANDS), runs=runs, top=top)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
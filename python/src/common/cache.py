@@ -0,0 +1,35 @@
+"""Small persistent caches under the user cache directory"""
+import json
+import os
+from pathlib import Path
+
+CACHE_APP_NAME = "mav_pixhawk_px4"
+
+
+def cache_dir() -> Path:
+    """Cache directory ($XDG_CACHE_HOME/mav_pixhawk_px4, default ~/.cache/mav_pixhawk_px4)."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / CACHE_APP_NAME
+
+
+def load_json(name: str) -> dict:
+    """Load a JSON cache file; missing or corrupt files read as empty."""
+    try:
+        with open(cache_dir() / name) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json(name: str, data: dict) -> None:
+    """Write a JSON cache file atomically (best effort: errors are ignored)."""
+    path = cache_dir() / name
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        pass
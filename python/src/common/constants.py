@@ -15,3 +15,6 @@ PARAMETER_READ_TIMEOUT = 5
 REBOOT_WAIT_SECONDS = 15
 DEVICE_POLL_ATTEMPTS = 15
 RECONNECT_ATTEMPTS = 5
+
+# Monitor output
+DISPLAY_RATE_HZ = 2.0  # Human-readable refresh rate, independent of message rate
@@ -15,3 +15,13 @@ def get_connection_address() -> str:
     if not address:
         raise ValueError("DRONE_ADDRESS environment variable not set")
     return address
+
+
+def use_reader_thread() -> bool:
+    """Whether serial MAVLink connections read on a dedicated thread (MAVLINK_READER=thread)."""
+    return os.getenv("MAVLINK_READER", "").lower() == "thread"
+
+
+def use_mavsdk_server_pool() -> bool:
+    """Whether MAVSDK commands attach to pooled, long-lived mavsdk_server instances (MAVSDK_SERVER_POOL=1)."""
+    return os.getenv("MAVSDK_SERVER_POOL", "").lower() in ("1", "true", "yes")
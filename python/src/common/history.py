@@ -0,0 +1,246 @@
+"""Fixed-memory, multi-resolution history of numeric time series
+
+Each series keeps:
+- a raw ring of the most recent samples, sized for the last minute at the expected rate
+- round-robin aggregate tiers (min/max/sum/count per bucket), 1 s and 1 min by default
+
+All storage is preallocated at construction, so memory stays constant however long a
+monitor runs. A bucket slot is reused when its bucket number comes round again, so no
+cleanup pass is needed. Tiers also keep running totals and a min/max sparse table, so
+a sample costs O(log slots) per tier and any bucket range is aggregated in O(1).
+"""
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Optional
+
+# (resolution seconds, bucket slots): 1 s buckets for an hour, 1 min buckets for a week
+DEFAULT_TIERS = ((1.0, 3600), (60.0, 7 * 24 * 60))
+RAW_SECONDS = 60.0  # Raw samples are kept for this long at the expected rate
+DEFAULT_RATE_HZ = 50.0  # Expected sample rate (PX4 position/attitude streams on USB)
+
+
+@dataclass
+class Summary:
+    """Aggregate of the samples in a time window."""
+    count: int = 0
+    min: float = math.inf
+    max: float = -math.inf
+    total: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def merge(self, count: int, minimum: float, maximum: float, total: float) -> None:
+        """Fold another aggregate into this one."""
+        if count:
+            self.count += count
+            self.min = min(self.min, minimum)
+            self.max = max(self.max, maximum)
+            self.total += total
+
+
+class _Tier:
+    """Ring of aggregate buckets at one resolution, queryable over any range in O(1).
+
+    Every bucket from the oldest retained one to the newest is materialised (empty
+    buckets included), so each slot also carries the running count/sum of all earlier
+    samples: range count/sum are differences of these. Range min/max come from a
+    sparse table over the ring: level k holds the min/max of 2**k consecutive buckets
+    starting at each slot, and any range is covered by two overlapping level-k runs.
+    """
+
+    def __init__(self, resolution: float, slots: int):
+        self.resolution = resolution
+        self.slots = slots
+        self.newest: Optional[int] = None  # Newest bucket number
+        self.sums = array('d', [0.0]) * slots
+        self.counts = array('q', [0]) * slots
+        self.sums_before = array('d', [0.0]) * slots  # Running totals before each bucket
+        self.counts_before = array('q', [0]) * slots
+        levels = max(slots.bit_length(), 1)
+        self.mins = [array('d', [math.inf]) * slots for _ in range(levels)]
+        self.maxs = [array('d', [-math.inf]) * slots for _ in range(levels)]
+
+    def add(self, t: float, value: float) -> None:
+        bucket = int(t // self.resolution)
+        if self.newest is None:
+            self._start(bucket, 0, 0.0)
+        elif bucket > self.newest:
+            # Open every bucket up to this one (at most a full ring after a long gap);
+            # the buckets in between are empty, so they all share the same running totals
+            newest = self.newest % self.slots
+            counts_before = self.counts_before[newest] + self.counts[newest]
+            sums_before = self.sums_before[newest] + self.sums[newest]
+            for opened in range(max(self.newest + 1, bucket - self.slots + 1), bucket + 1):
+                self._start(opened, counts_before, sums_before)
+        slot = self.newest % self.slots
+        self.sums[slot] += value
+        self.counts[slot] += 1
+        if value < self.mins[0][slot] or value > self.maxs[0][slot]:
+            self.mins[0][slot] = min(self.mins[0][slot], value)
+            self.maxs[0][slot] = max(self.maxs[0][slot], value)
+            self._update_runs(self.newest)
+
+    def _start(self, bucket: int, counts_before: int, sums_before: float) -> None:
+        """Reuse the slot of an expired bucket for a new, empty one."""
+        slot = bucket % self.slots
+        self.newest = bucket
+        self.sums[slot] = 0.0
+        self.counts[slot] = 0
+        self.sums_before[slot] = sums_before
+        self.counts_before[slot] = counts_before
+        self.mins[0][slot] = math.inf
+        self.maxs[0][slot] = -math.inf
+        self._update_runs(bucket)
+
+    def _update_runs(self, bucket: int) -> None:
+        """Recompute the sparse-table runs that end at bucket."""
+        for level in range(1, len(self.mins)):
+            half = 1 << (level - 1)
+            first = bucket - 2 * half + 1
+            if first < bucket - self.slots + 1:
+                break
+            left, right = first % self.slots, (first + half) % self.slots
+            mins, maxs = self.mins[level - 1], self.maxs[level - 1]
+            self.mins[level][left] = min(mins[left], mins[right])
+            self.maxs[level][left] = max(maxs[left], maxs[right])
+
+    def fold(self, first_bucket: int, last_bucket: int, summary: Summary) -> None:
+        """Merge buckets first_bucket..last_bucket (inclusive) that are still retained."""
+        if self.newest is None:
+            return
+        first_bucket = max(first_bucket, last_bucket - self.slots + 1, self.newest - self.slots + 1)
+        last_bucket = min(last_bucket, self.newest)
+        if first_bucket > last_bucket:
+            return
+        first, last = first_bucket % self.slots, last_bucket % self.slots
+        count = self.counts_before[last] + self.counts[last] - self.counts_before[first]
+        if not count:
+            return
+        level = (last_bucket - first_bucket + 1).bit_length() - 1
+        other = (last_bucket - (1 << level) + 1) % self.slots
+        summary.merge(count,
+                      min(self.mins[level][first], self.mins[level][other]),
+                      max(self.maxs[level][first], self.maxs[level][other]),
+                      self.sums_before[last] + self.sums[last] - self.sums_before[first])
+
+
+def _fold_enclosing(tier: _Tier, t: float, summary: Summary) -> None:
+    """Merge the whole bucket containing t (widens a window edge to tier resolution)."""
+    bucket = int(t // tier.resolution)
+    tier.fold(bucket, bucket, summary)
+
+
+class MultiResolutionSeries:
+    """History of one numeric field at raw and aggregate resolutions."""
+
+    def __init__(self, tiers: tuple[tuple[float, int], ...] = DEFAULT_TIERS,
+                 rate_hz: float = DEFAULT_RATE_HZ, raw_seconds: float = RAW_SECONDS):
+        """
+        Args:
+            tiers: (resolution seconds, slots) per tier, finest first; each resolution
+                must be a whole multiple of the previous one
+            rate_hz: Expected sample rate, which sizes the raw ring
+            raw_seconds: Raw history kept at that rate (less if samples arrive faster)
+        """
+        self.tiers = [_Tier(resolution, slots) for resolution, slots in tiers]
+        raw_capacity = max(math.ceil(rate_hz * raw_seconds), 1)
+        self._raw_t = array('d', [0.0]) * raw_capacity
+        self._raw_v = array('d', [0.0]) * raw_capacity
+        self._raw_count = 0  # Total samples ever added (ring write position = count % capacity)
+        self.last_time: Optional[float] = None
+
+    def add(self, t: float, value: float) -> None:
+        """Record one sample (timestamps must be non-decreasing)."""
+        value = float(value)
+        slot = self._raw_count % len(self._raw_t)
+        self._raw_t[slot] = t
+        self._raw_v[slot] = value
+        self._raw_count += 1
+        self.last_time = t
+        for tier in self.tiers:
+            tier.add(t, value)
+
+    def raw_samples(self, seconds: float, now: Optional[float] = None) -> list[tuple[float, float]]:
+        """Raw (time, value) samples of the last `seconds` that are still in the raw ring."""
+        now = self.last_time if now is None else now
+        if now is None:
+            return []
+        first = self._raw_search(now - seconds)
+        return [self._raw(i) for i in range(first, self._raw_len())]
+
+    def summary(self, seconds: float, now: Optional[float] = None) -> Summary:
+        """Aggregate the last `seconds` of data.
+
+        The newest tier bucket that lies entirely inside the window is taken from the
+        coarsest such tier, along with the other whole buckets of that tier. The
+        leftover head of the window is filled from successively finer tiers, then from
+        raw samples. Each tier answers its bucket range in O(1) from running totals and
+        its sparse table, so apart from the raw samples of less than one finest bucket
+        the cost depends on the number of tiers, not on the window length.
+        Where a finer level has already expired the head of the window, the edge is
+        widened to the enclosing bucket of the coarser tier instead of dropping data.
+
+        Args:
+            seconds: Window length ending at `now`
+            now: Window end (defaults to the newest sample time)
+        """
+        result = Summary()
+        now = self.last_time if now is None else now
+        if now is None:
+            return result
+        start = now - seconds
+
+        # Coarsest tier whose current bucket starts inside the window
+        boundary = math.inf
+        coarser = None
+        for level in reversed(range(len(self.tiers))):
+            tier = self.tiers[level]
+            current = int(now // tier.resolution)
+            if current * tier.resolution < start:
+                continue
+            first = math.ceil(start / tier.resolution)
+            tier.fold(first, current, result)
+            boundary = first * tier.resolution
+            coarser = tier
+
+            # Refine the head of the window [start, boundary) with finer tiers
+            for finer in reversed(self.tiers[:level]):
+                first = math.ceil(start / finer.resolution)
+                if first <= int(now // finer.resolution) - finer.slots:
+                    # Head is older than this tier retains: widen to the enclosing coarser bucket
+                    _fold_enclosing(coarser, start, result)
+                    return result
+                finer.fold(first, int(boundary // finer.resolution) - 1, result)
+                boundary = first * finer.resolution
+                coarser = finer
+            break
+
+        if self._raw_count > len(self._raw_t) and self._raw(0)[0] > start:
+            # Raw ring no longer reaches back to the window start
+            if coarser is not None:
+                _fold_enclosing(coarser, start, result)
+            return result
+
+        # Whatever is left before the finest bucket boundary comes from raw samples
+        for i in range(self._raw_search(start), self._raw_len()):
+            t, value = self._raw(i)
+            if t >= boundary:
+                break
+            result.merge(1, value, value, value)
+        return result
+
+    def _raw_len(self) -> int:
+        return min(self._raw_count, len(self._raw_t))
+
+    def _raw(self, i: int) -> tuple[float, float]:
+        """Raw sample by logical index (0 = oldest retained)."""
+        slot = (self._raw_count - self._raw_len() + i) % len(self._raw_t)
+        return self._raw_t[slot], self._raw_v[slot]
+
+    def _raw_search(self, t: float) -> int:
+        """Logical index of the first retained raw sample at or after t."""
+        return bisect_left(range(self._raw_len()), t, key=lambda i: self._raw(i)[0])
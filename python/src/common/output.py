@@ -0,0 +1,140 @@
+"""Telemetry output: batched machine-readable records and throttled display
+
+Monitors ingest every message but only hand data to one of two sinks:
+- RecordWriter: raw field values as NDJSON or CSV, written to stdout in batches
+- DisplayThrottle: gates human-readable rendering to a fixed display rate
+"""
+import contextlib
+import json
+import math
+import sys
+import time
+from typing import Any, BinaryIO, Iterator, Optional, Sequence
+
+OUTPUT_FORMATS = ("text", "ndjson", "csv")
+
+# Flush a batch after this many records or this many seconds, whichever comes first
+BATCH_RECORDS = 256
+BATCH_SECONDS = 0.5
+
+
+class RecordWriter:
+    """Buffered writer for telemetry records in NDJSON or CSV format.
+
+    NDJSON: one object per record: {"type": ..., "t": ..., <field>: <value>, ...}; NaN and
+    infinite values are written as null, since JSON has no literal for them
+    CSV: rows of `type,t,<values...>`; the first record of each type is preceded by a
+    `# type,t,<field names...>` header comment so mixed message streams stay parseable.
+    """
+
+    def __init__(self, output_format: str, stream: BinaryIO):
+        if output_format not in ("ndjson", "csv"):
+            raise ValueError(f"Unsupported record format: {output_format}")
+        self.output_format = output_format
+        self.records_written = 0
+        self._stream = stream
+        self._batch: list[str] = []
+        self._last_flush = time.monotonic()
+        self._csv_headers: set[str] = set()
+
+    def write(self, msg_type: str, timestamp: float, names: Sequence[str], values: Sequence[Any]) -> None:
+        """Queue one record, flushing the batch when it is full or old enough.
+
+        Args:
+            msg_type: Message type name (e.g. "RC_CHANNELS")
+            timestamp: Sample timestamp in seconds
+            names: Field names
+            values: Raw field values, in the same order as names
+        """
+        if self.output_format == "ndjson":
+            record = dict(zip(names, map(_json_value, values)))
+            record["type"] = msg_type
+            record["t"] = _json_value(timestamp)
+            self._batch.append(json.dumps(record, separators=(",", ":"), allow_nan=False))
+        else:
+            if msg_type not in self._csv_headers:
+                self._csv_headers.add(msg_type)
+                self._batch.append("# type,t," + ",".join(names))
+            self._batch.append(f"{msg_type},{timestamp:.6f}," + ",".join(map(_csv_value, values)))
+
+        self.records_written += 1
+        if len(self._batch) >= BATCH_RECORDS or time.monotonic() - self._last_flush >= BATCH_SECONDS:
+            self.flush()
+
+    def write_object(self, msg_type: str, timestamp: float, obj: Any) -> None:
+        """Queue one record from an object's attributes (e.g. a MAVSDK telemetry value)."""
+        fields = vars(obj)
+        self.write(msg_type, timestamp, list(fields), list(fields.values()))
+
+    def flush(self) -> None:
+        """Write all queued records in a single call."""
+        if self._batch:
+            self._batch.append("")
+            self._stream.write("\n".join(self._batch).encode())
+            self._stream.flush()
+            self._batch.clear()
+        self._last_flush = time.monotonic()
+
+
+def _json_value(value: Any) -> Any:
+    """Replace non-finite floats (also inside array fields) with None."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item) for item in value]
+    return value
+
+
+def _csv_value(value: Any) -> str:
+    """Format a field value for CSV, quoting anything that could contain separators."""
+    if isinstance(value, (int, float)):
+        return repr(value)
+    text = str(value).replace('"', '""')
+    return f'"{text}"'
+
+
+class DisplayThrottle:
+    """Limit human-readable rendering to a fixed rate, independent of ingest rate."""
+
+    def __init__(self, rate_hz: float):
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self._next = 0.0
+
+    def ready(self) -> bool:
+        """Check whether a display refresh is due (and start the next interval if so)."""
+        now = time.monotonic()
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        return True
+
+
+@contextlib.contextmanager
+def open_writer(output_format: str = "text") -> Iterator[Optional[RecordWriter]]:
+    """Open the record sink for a monitor.
+
+    In machine-readable formats, stdout carries only records: anything the monitor
+    prints (connection banners, progress) is redirected to stderr.
+
+    Args:
+        output_format: One of OUTPUT_FORMATS
+
+    Yields:
+        RecordWriter, or None for human-readable text output
+
+    Raises:
+        ValueError: If output_format is not supported
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format} (expected one of {', '.join(OUTPUT_FORMATS)})")
+    if output_format == "text":
+        yield None
+        return
+
+    sys.stdout.flush()
+    writer = RecordWriter(output_format, sys.stdout.buffer)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield writer
+    finally:
+        writer.flush()
@@ -0,0 +1,146 @@
+"""Append-only parameter snapshot history (SQLite)
+
+Each parameter read is recorded as a snapshot, but only values that differ from
+the vehicle's previous snapshot are stored. A snapshot of an unchanged vehicle
+costs one row. The `latest` table holds the current value of every (vehicle,
+name), so deduplication never rescans history.
+
+Indexes:
+- changes(vehicle, name, taken_at): "when did EKF2_* change on vehicle 7"
+- changes(name, taken_at): "who changed MAV_1_CONFIG, and when"
+- latest(name, vehicle): "which vehicles have a non-default MAV_1_CONFIG"
+
+Name patterns are SQLite GLOBs (EKF2_*), which use the name indexes for their prefix.
+"""
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from src.common.cache import cache_dir
+
+PARAM_STORE_FILE = "param_history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    vehicle TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    param_count INTEGER NOT NULL,
+    changed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    vehicle TEXT NOT NULL,
+    name TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    value REAL NOT NULL,
+    type INTEGER NOT NULL,
+    previous REAL
+);
+CREATE TABLE IF NOT EXISTS latest (
+    vehicle TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    type INTEGER NOT NULL,
+    taken_at REAL NOT NULL,
+    PRIMARY KEY (vehicle, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_by_vehicle ON snapshots(vehicle, taken_at);
+CREATE INDEX IF NOT EXISTS changes_by_vehicle ON changes(vehicle, name, taken_at);
+CREATE INDEX IF NOT EXISTS changes_by_name ON changes(name, taken_at);
+CREATE INDEX IF NOT EXISTS latest_by_name ON latest(name, vehicle);
+"""
+
+
+@dataclass
+class ParamChange:
+    vehicle: str
+    name: str
+    taken_at: float
+    value: float
+    type: int
+    previous: Optional[float]  # None: first time the parameter was seen on this vehicle
+
+
+class ParamStore:
+    """Snapshot history in one SQLite file (default: user cache directory)."""
+
+    def __init__(self, path: str = None):
+        if path is None:
+            cache_dir().mkdir(parents=True, exist_ok=True)
+            path = str(cache_dir() / PARAM_STORE_FILE)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ParamStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def record(self, vehicle: str, values: dict[str, tuple[float, int]], source: str,
+               taken_at: float = None) -> tuple[int, int]:
+        """Record a snapshot of decoded parameter values.
+
+        Args:
+            vehicle: Vehicle identity (USB serial number, fleet name or address)
+            values: Parameter name -> (value, MAV_PARAM_TYPE)
+            source: Command that read the values
+            taken_at: Unix time (default now)
+
+        Returns:
+            Tuple of (snapshot id, number of changed values stored)
+        """
+        taken_at = time.time() if taken_at is None else taken_at
+        with self._db:
+            previous = dict(self._db.execute(
+                "SELECT name, value FROM latest WHERE vehicle = ?", (vehicle,)))
+            changed = [(name, value, param_type, previous.get(name))
+                       for name, (value, param_type) in values.items()
+                       if name not in previous or previous[name] != value]
+            snapshot_id = self._db.execute(
+                "INSERT INTO snapshots (vehicle, taken_at, source, param_count, changed) VALUES (?, ?, ?, ?, ?)",
+                (vehicle, taken_at, source, len(values), len(changed))).lastrowid
+            self._db.executemany(
+                "INSERT INTO changes (snapshot_id, vehicle, name, taken_at, value, type, previous) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(snapshot_id, vehicle, name, taken_at, value, param_type, old)
+                 for name, value, param_type, old in changed])
+            self._db.executemany(
+                "INSERT OR REPLACE INTO latest (vehicle, name, value, type, taken_at) VALUES (?, ?, ?, ?, ?)",
+                [(vehicle, name, value, param_type, taken_at) for name, value, param_type, _ in changed])
+        return snapshot_id, len(changed)
+
+    def changes(self, pattern: str = "*", vehicle: str = None, since: float = None) -> list[ParamChange]:
+        """Stored value changes, oldest first."""
+        query = "SELECT vehicle, name, taken_at, value, type, previous FROM changes WHERE name GLOB ?"
+        args = [pattern]
+        if vehicle is not None:
+            query += " AND vehicle = ?"
+            args.append(vehicle)
+        if since is not None:
+            query += " AND taken_at >= ?"
+            args.append(since)
+        query += " ORDER BY taken_at, vehicle, name"
+        return [ParamChange(*row) for row in self._db.execute(query, args)]
+
+    def latest(self, pattern: str = "*", vehicles: Iterable[str] = None) -> list[tuple[str, str, float, int]]:
+        """Current (vehicle, name, value, type) of matching parameters, by name then vehicle."""
+        query = "SELECT vehicle, name, value, type FROM latest WHERE name GLOB ?"
+        args = [pattern]
+        if vehicles is not None:
+            vehicles = list(vehicles)
+            query += f" AND vehicle IN ({','.join('?' * len(vehicles))})"
+            args.extend(vehicles)
+        return list(self._db.execute(query + " ORDER BY name, vehicle", args))
+
+    def vehicles(self) -> list[tuple[str, int, float]]:
+        """(vehicle, snapshot count, last snapshot time) of every recorded vehicle."""
+        return list(self._db.execute(
+            "SELECT vehicle, COUNT(*), MAX(taken_at) FROM snapshots GROUP BY vehicle ORDER BY vehicle"))
@@ -0,0 +1,106 @@
+"""Constant-memory streaming statistics"""
+import math
+from array import array
+
+
+class LogHistogram:
+    """Histogram with logarithmically spaced buckets.
+
+    Each bucket spans a fixed ratio (1 + relative_error), so any percentile is
+    reported within that relative error. Memory and per-sample cost are constant
+    regardless of how many samples are added.
+    """
+
+    def __init__(self, minimum: float = 1e-4, maximum: float = 1e3, relative_error: float = 0.02):
+        """
+        Args:
+            minimum: Smallest distinguishable value (smaller values share the first bucket)
+            maximum: Largest distinguishable value (larger values share the last bucket)
+            relative_error: Bucket width as a ratio
+        """
+        self.minimum = minimum
+        self._log_base = math.log1p(relative_error)
+        self._buckets = array('q', [0]) * (int(math.log(maximum / minimum) / self._log_base) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """Record one sample."""
+        if value > self.minimum:
+            index = min(int(math.log(value / self.minimum) / self._log_base) + 1, len(self._buckets) - 1)
+        else:
+            index = 0
+        self._buckets[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, p: float) -> float:
+        """Approximate p-th percentile (0-100), clamped to the observed min/max."""
+        if not self.count:
+            return math.nan
+        rank = p / 100.0 * (self.count - 1)
+        seen = 0
+        for index, count in enumerate(self._buckets):
+            seen += count
+            if seen > rank:
+                # Geometric midpoint of the bucket
+                value = self.minimum * math.exp((index - 0.5) * self._log_base) if index else self.minimum
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+class Ewma:
+    """Exponentially weighted moving average and variance of an irregular time series.
+
+    The weight of a sample decays with its age (time constant `tau` seconds), so
+    the statistic means the same thing at any message rate. Each update is O(1)
+    and keeps no samples.
+
+    Until the decay weights catch up, samples since the start are weighted equally
+    (a plain mean), so the first sample does not dominate. After a gap longer than
+    `max_gap` the decay would let one sample replace the whole average, so the
+    statistic restarts instead; `run` counts the samples since the (re)start.
+    """
+
+    __slots__ = ("tau", "max_gap", "mean", "variance", "count", "run", "_last_t")
+
+    def __init__(self, tau: float, max_gap: float = math.inf):
+        self.tau = tau
+        self.max_gap = max_gap
+        self.mean = math.nan
+        self.variance = 0.0
+        self.count = 0
+        self.run = 0
+        self._last_t = None
+
+    def update(self, value: float, t: float) -> float:
+        """Add a sample taken at time t (seconds); returns the new mean."""
+        self.count += 1
+        if self._last_t is None or t - self._last_t > self.max_gap:
+            self.mean = value
+            self.variance = 0.0
+            self.run = 1
+            self._last_t = t
+            return value
+        self.run += 1
+        alpha = max(1.0 - math.exp(-max(t - self._last_t, 0.0) / self.tau), 1.0 / self.run)
+        self._last_t = t
+        delta = value - self.mean
+        increment = alpha * delta
+        self.mean += increment
+        self.variance = (1.0 - alpha) * (self.variance + delta * increment)
+        return self.mean
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
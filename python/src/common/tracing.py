@@ -0,0 +1,77 @@
+"""Phase-level timing spans exported in Chrome trace event format
+
+Tracing is disabled by default, so `span()` costs a single check. Once enabled,
+every completed span is recorded as a Chrome "complete" event ("ph": "X").
+Spans recorded on the same thread nest by time containment, so the output loads
+directly into chrome://tracing or https://ui.perfetto.dev as a timeline.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Recorded events; None while tracing is disabled
+_events: Optional[list[dict]] = None
+
+
+def _now_us() -> float:
+    """Current monotonic time in microseconds."""
+    return time.perf_counter_ns() / 1000.0
+
+
+def enable() -> None:
+    """Start recording spans (discards anything recorded before)."""
+    global _events
+    _events = []
+
+
+def is_enabled() -> bool:
+    """Check whether spans are currently being recorded."""
+    return _events is not None
+
+
+@contextmanager
+def span(name: str, category: str = "phase", **args) -> Iterator[None]:
+    """Time the enclosed block as one trace event.
+
+    Args:
+        name: Span name shown in the trace viewer
+        category: Event category ("phase" for CLI phases, "mavlink" for request/response pairs)
+        **args: Extra details attached to the event
+    """
+    if _events is None:
+        yield
+        return
+
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start,
+            "dur": _now_us() - start,
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "args": args,
+        })
+
+
+def write(path: str) -> int:
+    """Write recorded spans to a Chrome trace JSON file.
+
+    Args:
+        path: Output file path
+
+    Returns:
+        int: Number of events written
+    """
+    import json
+
+    events = _events or []
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
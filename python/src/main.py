@@ -1,56 +1,237 @@
 """CLI entry point"""
-import asyncio
+import importlib
+import os
 import sys
 from typing import Callable, Any
 
-from src.mavsdk.commands import flight, shell, offboard
-from src.mavsdk.telemetry import ekf as mavsdk_ekf
-from src.mavlink.telemetry import rc_channels, heartbeat, ekf as mavlink_ekf
-from src.mavlink import config
-from src.common.constants import DEFAULT_USB_PORT, DEFAULT_USB_BAUD
+from src.common.constants import DEFAULT_USB_PORT, DEFAULT_USB_BAUD, DISPLAY_RATE_HZ
+from src.common import tracing
+
+# Command handlers receive positional args (command name first) and parsed --options
+CommandHandler = Callable[[list[str], dict[str, str]], Any]
+
+# Options that take a value (`--name value` or `--name=value`)
+VALUE_OPTIONS = frozenset({
+    "clients", "config", "consumer-delay", "display-rate", "format", "history-window", "max-diffs", "maxsize",
+    "out", "policy", "rate", "reader", "reference", "show", "since-days", "source", "step", "tlog", "trace",
+    "vehicle", "window", "workers",
+})
+
+# Commands whose arguments are passed on verbatim, options included
+PASSTHROUGH_COMMANDS = frozenset({"shell"})
 
 
 def _parse_serial_args(args: list[str], start_idx: int = 1) -> tuple[str, int]:
-    """Parse serial port and baud rate from args."""
-    port = args[start_idx] if len(args) > start_idx else DEFAULT_USB_PORT
+    """Parse serial port and baud rate from args.
+
+    Without a port argument the autopilot is auto-discovered (cached after the first
+    probe); the USB defaults are used if nothing is found.
+    """
+    if len(args) <= start_idx:
+        from src.mavlink import discovery
+        found = discovery.find_autopilot()
+        if found:
+            print(f"Using {found.port} @ {found.baud} baud (system {found.sysid})")
+            return found.port, found.baud
+        return DEFAULT_USB_PORT, DEFAULT_USB_BAUD
+    port = args[start_idx]
     baud = int(args[start_idx + 1]) if len(args) > start_idx + 1 else DEFAULT_USB_BAUD
     return port, baud
 
 
+def _parse_options(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    """Split `--name value` / `--name=value` options from positional args.
+
+    Only names in VALUE_OPTIONS take the following token as their value; any other
+    `--name` is a boolean flag (value "true"). Arguments after a passthrough command
+    (e.g. `shell`) are all positional.
+
+    Returns:
+        Tuple of (positional args, options keyed by name without dashes)
+    """
+    positional, options = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if positional and positional[0] in PASSTHROUGH_COMMANDS:
+            positional.append(arg)
+        elif arg.startswith("--") and "=" in arg:
+            name, value = arg[2:].split("=", 1)
+            options[name] = value
+        elif arg.startswith("--") and arg[2:] in VALUE_OPTIONS:
+            if i + 1 >= len(args):
+                print(f"Option {arg} requires a value")
+                sys.exit(1)
+            options[arg[2:]] = args[i + 1]
+            i += 1
+        elif arg.startswith("--"):
+            options[arg[2:]] = "true"
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, options
+
+
 def _parse_duration_arg(args: list[str], start_idx: int = 1, default: float = 10.0) -> float:
     """Parse duration argument from args."""
     return float(args[start_idx]) if len(args) > start_idx else default
 
 
+def _output_options(options: dict[str, str]) -> dict[str, Any]:
+    """Output keyword arguments shared by telemetry monitors (--format, --display-rate)."""
+    return {
+        "output_format": options.get("format", "text"),
+        "display_rate": float(options.get("display-rate", DISPLAY_RATE_HZ)),
+    }
+
+
+def _lazy(module: str, run: Callable[[Any, list[str], dict[str, str]], Any]) -> CommandHandler:
+    """Build a command handler that imports its module only when the command runs.
+
+    Keeps CLI startup cheap: e.g. `rc-status` never loads MAVSDK/gRPC.
+
+    Args:
+        module: Dotted module path providing the command
+        run: Callable receiving (module, args, options)
+    """
+    def handler(args: list[str], options: dict[str, str]) -> Any:
+        return run(importlib.import_module(module), args, options)
+    return handler
+
+
+def _run_async(coro) -> Any:
+    """Run a coroutine to completion (asyncio is only imported by async commands)."""
+    import asyncio
+    return asyncio.run(coro)
+
+
 # Command registry: maps command names to handler functions
-COMMAND_HANDLERS: dict[str, Callable[[list[str]], Any]] = {
+COMMAND_HANDLERS: dict[str, CommandHandler] = {
     # Flight commands (async)
-    "takeoff": lambda args: asyncio.run(flight.takeoff()),
-    "shell": lambda args: asyncio.run(shell.execute(' '.join(args[1:]))),
-    "offboard-hover": lambda args: asyncio.run(offboard.test_hover()),
-    "offboard": lambda args: asyncio.run(offboard.offboard_control(
+    "takeoff": _lazy("src.mavsdk.commands.flight", lambda m, args, opts: _run_async(m.takeoff())),
+    "shell": _lazy("src.mavsdk.commands.shell", lambda m, args, opts: _run_async(m.execute(' '.join(args[1:])))),
+    "offboard-hover": _lazy("src.mavsdk.commands.offboard", lambda m, args, opts: _run_async(m.test_hover())),
+    "offboard": _lazy("src.mavsdk.commands.offboard", lambda m, args, opts: _run_async(m.offboard_control(
         float(args[1]), float(args[2]), float(args[3]), float(args[4]),
         float(args[5]) if len(args) > 5 else 10.0
-    )),
+    ))),
 
     # Telemetry commands (MAVLink)
-    "ekf-status": lambda args: mavlink_ekf.ekf_status_once(),
-    "ekf-monitor": lambda args: mavlink_ekf.monitor_ekf(_parse_duration_arg(args)),
-    "rc-status": lambda args: rc_channels.rc_channels_once(),
-    "rc-monitor": lambda args: rc_channels.monitor_rc_channels(_parse_duration_arg(args)),
-    "heartbeat-monitor": lambda args: heartbeat.monitor_heartbeat(
-        args[1], _parse_duration_arg(args, start_idx=2)
-    ),
+    "ekf-status": _lazy("src.mavlink.telemetry.ekf", lambda m, args, opts: m.ekf_status_once(
+        opts.get("format", "text")
+    )),
+    "ekf-monitor": _lazy("src.mavlink.telemetry.ekf", lambda m, args, opts: m.monitor_ekf(
+        _parse_duration_arg(args), **_output_options(opts),
+        history_window=float(opts["history-window"]) if "history-window" in opts else None
+    )),
+    "estimator-monitor": _lazy("src.mavlink.telemetry.estimator", lambda m, args, opts: m.monitor_estimator(
+        _parse_duration_arg(args, default=30.0), display_rate=float(opts.get("display-rate", 0.5)),
+        rate_hz=float(opts["rate"]) if "rate" in opts else None,
+    )),
+    "gps-consistency": _lazy("src.mavlink.telemetry.consistency", lambda m, args, opts: m.check_tlog(
+        opts["tlog"], opts.get("source", "GPS_RAW_INT"),
+        float(opts.get("window", m.CONSISTENCY_WINDOW_SECONDS)), float(opts.get("step", m.CONSISTENCY_STEP_SECONDS))
+    ) if "tlog" in opts else m.monitor_consistency(
+        _parse_duration_arg(args, default=60.0), opts.get("source", "GPS_RAW_INT"),
+        float(opts.get("window", m.CONSISTENCY_WINDOW_SECONDS)), float(opts.get("display-rate", 0.5))
+    )),
+    "rc-status": _lazy("src.mavlink.telemetry.rc_channels", lambda m, args, opts: m.rc_channels_once(
+        opts.get("format", "text")
+    )),
+    "rc-monitor": _lazy("src.mavlink.telemetry.rc_channels", lambda m, args, opts: m.monitor_rc_channels(
+        _parse_duration_arg(args), **_output_options(opts)
+    )),
+    "rc-analyze": _lazy("src.mavlink.telemetry.rc_analysis", lambda m, args, opts: m.analyze_rc_channels(
+        _parse_duration_arg(args),
+        window=int(opts.get("window", m.RC_WINDOW_SAMPLES)),
+        rate_hz=float(opts["rate"]) if "rate" in opts else None,
+        display_rate=float(opts.get("display-rate", 1.0)),
+    )),
+    "heartbeat-monitor": _lazy("src.mavlink.telemetry.heartbeat", lambda m, args, opts: m.monitor_heartbeat(
+        args[1], _parse_duration_arg(args, start_idx=2), **_output_options(opts)
+    )),
+
+    "heartbeat-analyze": _lazy("src.mavlink.telemetry.heartbeat", lambda m, args, opts: m.analyze_heartbeat(
+        args[1], _parse_duration_arg(args, start_idx=2, default=60.0),
+        display_rate=float(opts.get("display-rate", 0.2))
+    )),
+    "dashboard": _lazy("src.mavlink.telemetry.dashboard", lambda m, args, opts: m.run_dashboard(
+        float(args[1]) if len(args) > 1 else None, display_rate=float(opts.get("display-rate", DISPLAY_RATE_HZ))
+    )),
+    "link-monitor": _lazy("src.mavlink.telemetry.link_quality", lambda m, args, opts: m.monitor_link(
+        _parse_duration_arg(args, default=30.0), display_rate=float(opts.get("display-rate", 0.5))
+    )),
+    "timesync-monitor": _lazy("src.mavlink.timesync", lambda m, args, opts: m.monitor_timesync(
+        _parse_duration_arg(args, default=30.0), display_rate=float(opts.get("display-rate", 0.5))
+    )),
+
+    "link-subscribe": _lazy("src.mavlink.pubsub", lambda m, args, opts: _run_async(m.subscribe_monitor(
+        args[1].split(","), _parse_duration_arg(args, start_idx=2),
+        maxsize=int(opts.get("maxsize", m.SUBSCRIBER_QUEUE_SIZE)), policy=opts.get("policy", "drop_oldest"),
+        consumer_delay=float(opts.get("consumer-delay", 0.0))
+    ))),
+    "relay": _lazy("src.mavlink.relay", lambda m, args, opts: m.run_relay(
+        m.load_clients(opts["config"]) if "config" in opts
+        else [m.parse_client(spec) for spec in opts["clients"].split(",")],
+        duration=float(args[1]) if len(args) > 1 else None,
+        display_rate=float(opts.get("display-rate", 0.2)),
+    )),
 
     # Telemetry commands (MAVSDK)
-    "mavsdk-ekf-status": lambda args: asyncio.run(mavsdk_ekf.ekf_status_once()),
-    "mavsdk-ekf-monitor": lambda args: asyncio.run(mavsdk_ekf.monitor_ekf(_parse_duration_arg(args))),
+    "mavsdk-ekf-status": _lazy("src.mavsdk.telemetry.ekf", lambda m, args, opts: _run_async(
+        m.ekf_status_once(opts.get("format", "text"))
+    )),
+    "mavsdk-ekf-monitor": _lazy("src.mavsdk.telemetry.ekf", lambda m, args, opts: _run_async(
+        m.monitor_ekf(_parse_duration_arg(args), **_output_options(opts))
+    )),
+    "mavsdk-pool": _lazy("src.mavsdk.server_pool", lambda m, args, opts: m.pool_command(
+        args[1] if len(args) > 1 else None
+    )),
+
+    # Mission commands
+    "mission-upload": _lazy("src.mavlink.mission", lambda m, args, opts: m.mission_upload(args[1])),
+    "mission-download": _lazy("src.mavlink.mission", lambda m, args, opts: m.mission_download(
+        args[1] if len(args) > 1 else None, window=int(opts.get("window", m.MISSION_DOWNLOAD_WINDOW))
+    )),
+
+    # Log commands
+    "log-list": _lazy("src.mavlink.log_download", lambda m, args, opts: m.log_list()),
+    "log-download": _lazy("src.mavlink.log_download", lambda m, args, opts: m.log_download(
+        int(args[1]), args[2] if len(args) > 2 else None,
+        window=int(opts.get("window", m.LOG_WINDOW_BYTES))
+    )),
+
+    # Flight log analysis (offline)
+    "ulog-summary": _lazy("src.ulog.commands", lambda m, args, opts: m.ulog_summary(args[1])),
+    "ulog-export": _lazy("src.ulog.commands", lambda m, args, opts: m.ulog_export(
+        args[1], args[2].split(","), opts.get("out", "."), opts.get("format", "csv")
+    )),
 
     # Configuration commands (sync)
-    "compare-params": lambda args: config.compare_params_with_defaults(*_parse_serial_args(args)),
-    "configure-telem2": lambda args: config.configure_telem2(*_parse_serial_args(args)),
-    "reset-params": lambda args: config.reset_params(*_parse_serial_args(args)),
-    "reboot": lambda args: config.reboot(*_parse_serial_args(args)),
+    "compare-params": _lazy("src.mavlink.config", lambda m, args, opts: m.compare_params_with_defaults(
+        *_parse_serial_args(args), max_diffs=int(opts["max-diffs"]) if "max-diffs" in opts else None
+    )),
+    "param-get": _lazy("src.mavlink.config", lambda m, args, opts: m.param_get(
+        *_parse_serial_args(args, start_idx=2), args[1].split(","), opts.get("reference")
+    )),
+    "param-set": _lazy("src.mavlink.config", lambda m, args, opts: m.param_set(
+        *_parse_serial_args(args, start_idx=2), args[1].split(",")
+    )),
+    "fleet-audit": _lazy("src.mavlink.fleet", lambda m, args, opts: m.fleet_audit(
+        args[1], opts.get("reference"), int(opts.get("workers", m.FLEET_WORKERS)),
+        int(opts["max-diffs"]) if "max-diffs" in opts else None
+    )),
+    "param-history": _lazy("src.mavlink.config", lambda m, args, opts: m.param_history(
+        args[1] if len(args) > 1 else "*", opts.get("vehicle"),
+        float(opts["since-days"]) if "since-days" in opts else None
+    )),
+    "param-latest": _lazy("src.mavlink.config", lambda m, args, opts: m.param_latest(
+        args[1], opts.get("show", "all") == "non-default", opts.get("reference")
+    )),
+    "configure-telem2": _lazy("src.mavlink.config", lambda m, args, opts: m.configure_telem2(*_parse_serial_args(args))),
+    "reset-params": _lazy("src.mavlink.config", lambda m, args, opts: m.reset_params(*_parse_serial_args(args))),
+    "reboot": _lazy("src.mavlink.config", lambda m, args, opts: m.reboot(*_parse_serial_args(args))),
+    "discover-ports": _lazy("src.mavlink.discovery", lambda m, args, opts: m.print_discovered()),
 }
 
 
@@ -59,12 +240,36 @@ def main(argv: list[str] = None) -> None:
 
     Args:
         argv: Command line arguments (defaults to sys.argv[1:])
+            `--trace out.json` records phase timings in Chrome trace event format.
+            `--format ndjson|csv` switches telemetry commands to machine-readable records.
+            `--display-rate HZ` sets the text refresh rate of monitors.
+            `--reader thread` drains serial links on a dedicated thread (MAVLINK_READER).
     """
-    args = argv if argv is not None else sys.argv[1:]
+    args, options = _parse_options(argv if argv is not None else sys.argv[1:])
+
+    reader = options.pop("reader", None)
+    if reader is not None:
+        os.environ["MAVLINK_READER"] = reader
+
+    trace_path = options.pop("trace", None)
+    if trace_path is None:
+        _run(args, options)
+        return
+
+    tracing.enable()
+    try:
+        with tracing.span(args[0] if args else "takeoff", category="command"):
+            _run(args, options)
+    finally:
+        count = tracing.write(trace_path)
+        print(f"Trace: {count} spans written to {trace_path}", file=sys.stderr)
+
 
+def _run(args: list[str], options: dict[str, str]) -> None:
+    """Dispatch a command to its registered handler."""
     # Default command if none specified
     if not args:
-        asyncio.run(flight.takeoff())
+        COMMAND_HANDLERS["takeoff"](["takeoff"], options)
         return
 
     cmd = args[0]
@@ -72,7 +277,7 @@ def main(argv: list[str] = None) -> None:
     # Look up and execute command handler
     handler = COMMAND_HANDLERS.get(cmd)
     if handler:
-        handler(args)
+        handler(args, options)
     else:
         print(f"Unknown command: {cmd}")
         print(f"Available commands: {', '.join(sorted(COMMAND_HANDLERS.keys()))}")
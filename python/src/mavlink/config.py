@@ -3,7 +3,11 @@ from pymavlink import mavutil
 import time
 import os
 import glob
-from typing import Dict, List, Tuple
+import sqlite3
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
 
 from src.common.constants import (
     HEARTBEAT_TIMEOUT,
@@ -14,7 +18,9 @@ from src.common.constants import (
     RECONNECT_ATTEMPTS,
 )
 from src.mavlink.parameters import encode_param_value, decode_param_value
-from src.mavlink import connection
+from src.mavlink import connection, discovery
+from src.common import cache, tracing
+from src.common.param_store import ParamStore
 
 # ============================================================================
 # Constants
@@ -35,6 +41,19 @@ FLOAT_COMPARISON_TOLERANCE = 1e-6
 # MAVLink integer parameter types
 INT_PARAM_TYPES = [1, 2, 3, 4, 5, 6]  # INT8, UINT8, INT16, UINT16, INT32, UINT32
 
+# Targeted parameter reads/writes (param-get / param-set)
+PARAM_REQUEST_WINDOW = 8         # PARAM_REQUEST_READ / PARAM_SET in flight at once
+PARAM_REQUEST_RETRY_SECONDS = 0.5
+PARAM_REQUEST_RETRIES = 4
+PARAM_NAMES_CACHE_FILE = "param_names.json"  # Names seen in the last full download, for glob patterns
+
+# Compiled reference cache (<reference>.cache): header, then one fixed-size record per parameter.
+# Integer values up to UINT32 are exact in float64.
+REFERENCE_CACHE_SUFFIX = ".cache"
+REFERENCE_CACHE_MAGIC = b"PRMC\x01"
+REFERENCE_CACHE_HEADER = np.dtype([('magic', 'S5'), ('mtime_ns', '<i8'), ('size', '<i8'), ('count', '<u4')])
+REFERENCE_CACHE_RECORD = np.dtype([('name', 'S16'), ('type', 'u1'), ('value', '<f8')])
+
 
 # ============================================================================
 # Connection Helpers
@@ -75,33 +94,34 @@ def _set_parameter(mav, param_name: str, param_value, param_type: int) -> tuple[
     elif len(param_name_bytes) < 16:
         param_name_bytes = param_name_bytes + b'\x00' * (16 - len(param_name_bytes))  # Pad if too short
 
-    # Send parameter set command
-    mav.mav.param_set_send(
-        mav.target_system,
-        mav.target_component,
-        param_name_bytes,
-        param_value,
-        param_type
-    )
-
-    # Loop to find the specific PARAM_VALUE response (may receive other params first)
-    timeout = time.time() + PARAMETER_READ_TIMEOUT
-    received_other_params = []
+    with tracing.span("PARAM_SET", category="mavlink", param=param_name):
+        # Send parameter set command
+        mav.mav.param_set_send(
+            mav.target_system,
+            mav.target_component,
+            param_name_bytes,
+            param_value,
+            param_type
+        )
 
-    while time.time() < timeout:
-        msg = mav.recv_match(type='PARAM_VALUE', blocking=True, timeout=1.0)
-        if msg:
-            # Decode param_id (comes as bytes with null padding)
-            received_name = msg.param_id.decode('utf-8') if isinstance(msg.param_id, bytes) else msg.param_id
-            received_name = received_name.rstrip('\x00')
-
-            if received_name == param_name:
-                # Found our parameter - decode and return
-                actual_value = decode_param_value(msg.param_value, msg.param_type)
-                return True, actual_value
-            else:
-                # Track other params for diagnostics
-                received_other_params.append(received_name)
+        # Loop to find the specific PARAM_VALUE response (may receive other params first)
+        timeout = time.time() + PARAMETER_READ_TIMEOUT
+        received_other_params = []
+
+        while time.time() < timeout:
+            msg = mav.recv_match(type='PARAM_VALUE', blocking=True, timeout=1.0)
+            if msg:
+                # Decode param_id (comes as bytes with null padding)
+                received_name = msg.param_id.decode('utf-8') if isinstance(msg.param_id, bytes) else msg.param_id
+                received_name = received_name.rstrip('\x00')
+
+                if received_name == param_name:
+                    # Found our parameter - decode and return
+                    actual_value = decode_param_value(msg.param_value, msg.param_type)
+                    return True, actual_value
+                else:
+                    # Track other params for diagnostics
+                    received_other_params.append(received_name)
 
     # Timeout - parameter not confirmed, show diagnostics
     if received_other_params:
@@ -120,16 +140,17 @@ def _send_command_long(mav, command: int, params: list[float], success_msg: str,
         if msg is None:
             break
 
-    # Send command
-    mav.mav.command_long_send(
-        mav.target_system,
-        mav.target_component,
-        command,
-        0, *params
-    )
+    with tracing.span("COMMAND_LONG", category="mavlink", command=command):
+        # Send command
+        mav.mav.command_long_send(
+            mav.target_system,
+            mav.target_component,
+            command,
+            0, *params
+        )
 
-    # Wait for acknowledgment
-    msg = mav.recv_match(type='COMMAND_ACK', blocking=True, timeout=COMMAND_ACK_TIMEOUT)
+        # Wait for acknowledgment
+        msg = mav.recv_match(type='COMMAND_ACK', blocking=True, timeout=COMMAND_ACK_TIMEOUT)
 
     if msg is None:
         print(f"{fail_msg} (timeout - no ACK received)")
@@ -161,15 +182,47 @@ def _send_command_long(mav, command: int, params: list[float], success_msg: str,
 # Parameter Loading & Reading
 # ============================================================================
 
-def _load_reference_params(reference_file: str) -> Dict[str, Dict]:
+def default_reference_file() -> str:
+    """px4_v1.16.0_default.params from the project root."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, '..', '..', '..', 'px4_v1.16.0_default.params')
+
+
+# Parsed references held for the life of the process, keyed by real path
+_reference_params: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict]]] = {}
+
+
+def load_reference_params(reference_file: str) -> Dict[str, Dict]:
     """Load reference parameters from file.
 
+    Parsed files are kept in memory (several references can be in use at once)
+    and compiled to `<reference_file>.cache`, which later runs load with a
+    single read. Both are rebuilt when the file's mtime or size changes.
+    The returned dict is shared: callers must not modify it.
+
     Args:
         reference_file: Path to reference params file
 
     Returns:
         Dict mapping parameter names to {'value': value, 'type': type}
     """
+    path = os.path.realpath(reference_file)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    held = _reference_params.get(path)
+    if held is not None and held[0] == key:
+        return held[1]
+
+    reference_params = _load_reference_cache(path + REFERENCE_CACHE_SUFFIX, key)
+    if reference_params is None:
+        reference_params = _parse_reference_params(path)
+        _save_reference_cache(path + REFERENCE_CACHE_SUFFIX, key, reference_params)
+    _reference_params[path] = (key, reference_params)
+    return reference_params
+
+
+def _parse_reference_params(reference_file: str) -> Dict[str, Dict]:
+    """Parse a QGC .params file (Vehicle-Id Component-Id Name Value Type, tab separated)."""
     reference_params = {}
     with open(reference_file, 'r') as f:
         for line in f:
@@ -194,54 +247,176 @@ def _load_reference_params(reference_file: str) -> Dict[str, Dict]:
     return reference_params
 
 
-def _read_all_params(mav) -> Dict[str, Dict]:
-    """Read all parameters from connected Pixhawk.
+def _load_reference_cache(cache_file: str, key: Tuple[int, int]) -> Dict[str, Dict]:
+    """Reference parameters from a compiled cache, None if it is missing or stale."""
+    try:
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < REFERENCE_CACHE_HEADER.itemsize:
+        return None
+    header = np.frombuffer(data, REFERENCE_CACHE_HEADER, count=1)[0]
+    if header['magic'] != REFERENCE_CACHE_MAGIC or (int(header['mtime_ns']), int(header['size'])) != key:
+        return None
+    count = int(header['count'])
+    if len(data) != REFERENCE_CACHE_HEADER.itemsize + count * REFERENCE_CACHE_RECORD.itemsize:
+        return None
+    records = np.frombuffer(data, REFERENCE_CACHE_RECORD, count=count, offset=REFERENCE_CACHE_HEADER.itemsize)
+
+    int_types = set(INT_PARAM_TYPES)
+    return {
+        name.decode('utf-8'): {'value': int(value) if param_type in int_types else value, 'type': param_type}
+        for name, param_type, value in zip(records['name'].tolist(), records['type'].tolist(),
+                                           records['value'].tolist())
+    }
+
+
+def _save_reference_cache(cache_file: str, key: Tuple[int, int], reference_params: Dict[str, Dict]) -> None:
+    """Compile parsed reference parameters (best effort: read-only locations are skipped)."""
+    if any(len(name.encode('utf-8')) > 16 for name in reference_params):
+        return  # MAVLink names are at most 16 bytes; anything else is not a parameter file we can compile
+    header = np.zeros(1, REFERENCE_CACHE_HEADER)
+    header['magic'] = REFERENCE_CACHE_MAGIC
+    header['mtime_ns'], header['size'] = key
+    header['count'] = len(reference_params)
+    records = np.zeros(len(reference_params), REFERENCE_CACHE_RECORD)
+    records['name'] = [name.encode('utf-8') for name in reference_params]
+    records['type'] = [p['type'] for p in reference_params.values()]
+    records['value'] = [p['value'] for p in reference_params.values()]
+
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(header.tobytes())
+            f.write(records.tobytes())
+        os.replace(tmp, cache_file)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _param_id(msg) -> str:
+    """Parameter name of a PARAM_VALUE (null padding stripped)."""
+    param_id = msg.param_id.decode('utf-8') if isinstance(msg.param_id, bytes) else msg.param_id
+    return param_id.rstrip('\x00')
+
+
+def _request_params(mav, names: List[str], send: Callable[[str], None],
+                    window: int = PARAM_REQUEST_WINDOW) -> Dict[str, Dict]:
+    """Send one request per name with up to `window` in flight, collecting the PARAM_VALUE replies.
+
+    Requests that are not answered within PARAM_REQUEST_RETRY_SECONDS are sent
+    again, up to PARAM_REQUEST_RETRIES times.
 
     Args:
         mav: Connected MAVLink connection
+        names: Parameter names
+        send: Sends the request for one name (PARAM_REQUEST_READ or PARAM_SET)
+        window: Requests in flight at once
 
     Returns:
-        Dict mapping parameter names to {'value': value, 'type': type}
+        Dict mapping answered parameter names to {'value': value, 'type': type}
     """
-    print("Requesting all parameters from Pixhawk...")
-    mav.mav.param_request_list_send(mav.target_system, mav.target_component)
+    pending = list(reversed(names))
+    in_flight: Dict[str, Tuple[float, int]] = {}  # name -> (time sent, attempts)
+    replies = {}
+
+    while pending or in_flight:
+        now = time.time()
+        while pending and len(in_flight) < window:
+            name = pending.pop()
+            send(name)
+            in_flight[name] = (now, 1)
+
+        msg = mav.recv_match(type='PARAM_VALUE', blocking=True, timeout=0.05)
+        if msg is not None:
+            name = _param_id(msg)
+            if name in in_flight:
+                del in_flight[name]
+                replies[name] = {'value': msg.param_value, 'type': msg.param_type}
+
+        for name, (sent_at, attempts) in list(in_flight.items()):
+            if now - sent_at < PARAM_REQUEST_RETRY_SECONDS:
+                continue
+            if attempts > PARAM_REQUEST_RETRIES:
+                del in_flight[name]  # Not on this vehicle
+            else:
+                send(name)
+                in_flight[name] = (now, attempts + 1)
+    return replies
 
-    current_params = {}
-    print("Reading parameters...", end="", flush=True)
 
-    # Collect all PARAM_VALUE messages
-    timeout = time.time() + 15
-    last_msg_time = time.time()
-    expected_count = None
+def _read_params(mav, names: List[str], window: int = PARAM_REQUEST_WINDOW) -> Dict[str, Dict]:
+    """Read named parameters with PARAM_REQUEST_READ (no full list download)."""
+    def send(name: str) -> None:
+        mav.mav.param_request_read_send(mav.target_system, mav.target_component, name.encode('utf-8'), -1)
 
-    while time.time() < timeout:
-        msg = mav.recv_match(type='PARAM_VALUE', blocking=True, timeout=0.5)
-        if msg:
-            last_msg_time = time.time()
-            param_id = msg.param_id.decode('utf-8') if isinstance(msg.param_id, bytes) else msg.param_id
-            param_id = param_id.rstrip('\x00')
-            current_params[param_id] = {
-                'value': msg.param_value,
-                'type': msg.param_type
-            }
-            # Show progress
-            if len(current_params) % 50 == 0:
-                print(".", end="", flush=True)
+    with tracing.span("PARAM_REQUEST_READ", category="mavlink", count=len(names)):
+        return _request_params(mav, names, send, window)
 
-            # Track expected count
-            if expected_count is None:
-                expected_count = msg.param_count
 
-            # Check if we've received all params
-            if msg.param_index + 1 == msg.param_count:
-                break
+def _resolve_param_names(patterns: List[str], reference_file: str = None) -> List[str]:
+    """Expand glob patterns against the cached name list and the reference file.
 
-        # Break if no messages received for 3 seconds
-        if time.time() - last_msg_time > 3:
-            break
+    Plain names are used as given. Patterns are matched case-insensitively
+    (parameter names are upper case).
+    """
+    known = set(cache.load_json(PARAM_NAMES_CACHE_FILE).get("names", []))
+    if any(_is_glob(p) for p in patterns):
+        try:
+            known.update(load_reference_params(reference_file or default_reference_file()))
+        except FileNotFoundError:
+            pass
+
+    names = []
+    for pattern in patterns:
+        if not _is_glob(pattern):
+            matches = [pattern.upper()]
+        else:
+            matches = sorted(n for n in known if fnmatchcase(n, pattern.upper()))
+            if not matches:
+                print(f"⚠ No known parameters match {pattern}")
+        names.extend(m for m in matches if m not in names)
+    return names
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def _save_param_names(names) -> None:
+    """Remember the vehicle's parameter names for param-get patterns."""
+    cache.save_json(PARAM_NAMES_CACHE_FILE, {"names": sorted(names)})
 
-    print(f" ✓ Read {len(current_params)} parameters\n")
-    return current_params
+
+def decoded_values(params: Dict[str, Dict]) -> Dict[str, Tuple[float, int]]:
+    """Name -> (decoded value, type) of parameters as received."""
+    return {name: (decode_param_value(p['value'], p['type']) if p['type'] in INT_PARAM_TYPES else p['value'], p['type'])
+            for name, p in params.items()}
+
+
+def _vehicle_id(port: str) -> str:
+    """Snapshot history key: the USB serial number survives port renumbering."""
+    return discovery.serial_number_of(port) or port
+
+
+def _record_snapshot(vehicle: str, params: Dict[str, Dict], source: str) -> None:
+    """Add parameters read from a vehicle to the snapshot history (best effort)."""
+    try:
+        with ParamStore() as store:
+            _, changed = store.record(vehicle, decoded_values(params), source)
+    except (sqlite3.Error, OSError) as e:
+        print(f"⚠ Parameter history not updated: {e}")
+        return
+    if changed:
+        print(f"  ({changed} changed values recorded in parameter history for {vehicle})")
+
+
+def _format_param(value, param_type: int) -> str:
+    if param_type in INT_PARAM_TYPES:
+        return str(decode_param_value(value, param_type))
+    return f"{value:.7g}"
 
 
 # ============================================================================
@@ -253,59 +428,120 @@ def _is_auto_calibration_param(name: str) -> bool:
     return any(pattern in name for pattern in AUTO_CALIBRATION_PATTERNS)
 
 
-def _compare_parameters(reference_params: Dict[str, Dict], current_params: Dict[str, Dict]) -> Tuple[int, List[Dict], List[Dict]]:
-    """Compare reference and current parameters.
+def _compare_parameter(param_name: str, reference: Dict, current: Dict) -> Tuple[str, Dict]:
+    """Classify one parameter against its reference.
+
+    Args:
+        param_name: Parameter name
+        reference: Reference {'value', 'type'}
+        current: Current {'value', 'type'} as received (MAVLink float encoding)
+
+    Returns:
+        Tuple of ('match' | 'config' | 'auto_cal', diff entry or None)
+    """
+    ref_val = reference['value']
+    cur_val_raw = current['value']
+    ref_type = reference['type']
+    cur_type = current['type']
+
+    # Decode current value from MAVLink float representation
+    if cur_type in INT_PARAM_TYPES:
+        cur_val = decode_param_value(cur_val_raw, cur_type)
+    else:  # REAL32
+        cur_val = cur_val_raw
+
+    # Compare values
+    values_match = False
+    if ref_type in INT_PARAM_TYPES:
+        values_match = (ref_val == cur_val and ref_type == cur_type)
+    else:  # REAL32
+        values_match = (abs(ref_val - cur_val) < FLOAT_COMPARISON_TOLERANCE and ref_type == cur_type)
+
+    if values_match:
+        return 'match', None
+
+    diff_entry = {
+        'name': param_name,
+        'reference': ref_val,
+        'current': cur_val,
+        'ref_type': ref_type,
+        'cur_type': cur_type
+    }
+    # Categorize the difference
+    return ('auto_cal' if _is_auto_calibration_param(param_name) else 'config'), diff_entry
+
+
+def compare_params_streaming(mav, reference_params: Dict[str, Dict], max_diffs: int = None, progress: bool = True
+                             ) -> Tuple[int, List[Dict], List[Dict], Dict[str, Dict], int, bool]:
+    """Request all parameters and classify each PARAM_VALUE as it arrives.
+
+    Running counts are shown live. With `max_diffs`, the download stops as soon
+    as that many configuration differences have been seen.
 
     Args:
+        mav: Connected MAVLink connection
         reference_params: Reference parameter dict
-        current_params: Current parameter dict from Pixhawk
+        max_diffs: Stop after this many configuration differences (None = read everything)
+        progress: Print the running counts
 
     Returns:
-        Tuple of (matching_count, config_differences, auto_cal_differences)
+        Tuple of (matching_count, config_differences, auto_cal_differences,
+        current_params, expected parameter count or 0 if none was received,
+        whether max_diffs stopped the download)
     """
+    if progress:
+        print("Requesting all parameters from Pixhawk...")
+    mav.mav.param_request_list_send(mav.target_system, mav.target_component)
+
+    current_params = {}
     matching = 0
     config_differences = []
     auto_cal_differences = []
+    expected_count = 0
+    limited = False
 
-    for param_name in reference_params:
-        if param_name not in current_params:
-            continue
+    timeout = time.time() + 15
+    last_msg_time = time.time()
+    last_display = 0.0
 
-        ref_val = reference_params[param_name]['value']
-        cur_val_raw = current_params[param_name]['value']
-        ref_type = reference_params[param_name]['type']
-        cur_type = current_params[param_name]['type']
-
-        # Decode current value from MAVLink float representation
-        if cur_type in INT_PARAM_TYPES:
-            cur_val = decode_param_value(cur_val_raw, cur_type)
-        else:  # REAL32
-            cur_val = cur_val_raw
-
-        # Compare values
-        values_match = False
-        if ref_type in INT_PARAM_TYPES:
-            values_match = (ref_val == cur_val and ref_type == cur_type)
-        else:  # REAL32
-            values_match = (abs(ref_val - cur_val) < FLOAT_COMPARISON_TOLERANCE and ref_type == cur_type)
-
-        if values_match:
-            matching += 1
-        else:
-            diff_entry = {
-                'name': param_name,
-                'reference': ref_val,
-                'current': cur_val,
-                'ref_type': ref_type,
-                'cur_type': cur_type
-            }
-            # Categorize the difference
-            if _is_auto_calibration_param(param_name):
-                auto_cal_differences.append(diff_entry)
-            else:
-                config_differences.append(diff_entry)
+    while time.time() < timeout:
+        msg = mav.recv_match(type='PARAM_VALUE', blocking=True, timeout=0.5)
+        if msg:
+            last_msg_time = time.time()
+            expected_count = msg.param_count
+            param_id = _param_id(msg)
+            if param_id not in current_params:
+                current_params[param_id] = {'value': msg.param_value, 'type': msg.param_type}
+                if param_id in reference_params:
+                    category, diff_entry = _compare_parameter(
+                        param_id, reference_params[param_id], current_params[param_id])
+                    if category == 'match':
+                        matching += 1
+                    elif category == 'auto_cal':
+                        auto_cal_differences.append(diff_entry)
+                    else:
+                        config_differences.append(diff_entry)
+
+            if progress and (last_msg_time - last_display >= 0.1 or msg.param_index + 1 == msg.param_count):
+                print(f"\rRead {len(current_params)}/{expected_count} | match {matching} | "
+                      f"config diffs {len(config_differences)} | auto-cal diffs {len(auto_cal_differences)}",
+                      end="", flush=True)
+                last_display = last_msg_time
+
+            if max_diffs is not None and len(config_differences) >= max_diffs:
+                limited = len(current_params) < expected_count
+                break
+            # Check if we've received all params
+            if msg.param_index + 1 == msg.param_count:
+                break
 
-    return matching, config_differences, auto_cal_differences
+        # Break if no messages received for 3 seconds
+        if time.time() - last_msg_time > 3:
+            break
+
+    if progress:
+        print()
+    return matching, config_differences, auto_cal_differences, current_params, expected_count, limited
 
 
 # ============================================================================
@@ -417,6 +653,7 @@ def reboot(port: str, baud: int) -> None:
     """Reboot Pixhawk and verify it comes back online."""
     try:
         mav = connection.connect(connection.make_serial_address(port, baud))
+        serial_number = discovery.serial_number_of(port)
 
         print("Sending reboot command...")
         if not _send_command_long(
@@ -429,21 +666,22 @@ def reboot(port: str, baud: int) -> None:
             return
 
         print("\nWaiting for connection to drop...", end="", flush=True)
-        time.sleep(2)
-
-        try:
-            for i in range(10):
-                msg = mav.recv_match(type='HEARTBEAT', blocking=False, timeout=0.5)
-                if not msg:
-                    print(" ✓ Connection dropped")
-                    break
-                print(".", end="", flush=True)
-                time.sleep(0.5)
-            else:
-                print(" ⚠ Connection still alive")
-        except Exception:
-            # Serial disconnect during reboot is expected
-            print(" ✓ Connection dropped")
+        with tracing.span("wait_disconnect"):
+            time.sleep(2)
+
+            try:
+                for i in range(10):
+                    msg = mav.recv_match(type='HEARTBEAT', blocking=False, timeout=0.5)
+                    if not msg:
+                        print(" ✓ Connection dropped")
+                        break
+                    print(".", end="", flush=True)
+                    time.sleep(0.5)
+                else:
+                    print(" ⚠ Connection still alive")
+            except Exception:
+                # Serial disconnect during reboot is expected
+                print(" ✓ Connection dropped")
 
         # Close the connection to release the serial port
         # This prevents the device number from changing (e.g., ttyACM0 → ttyACM1)
@@ -453,9 +691,10 @@ def reboot(port: str, baud: int) -> None:
             pass  # Connection may already be closed
 
         print(f"Waiting for Pixhawk to boot ({REBOOT_WAIT_SECONDS}s)...", end="", flush=True)
-        for _ in range(REBOOT_WAIT_SECONDS):
-            time.sleep(1)
-            print(".", end="", flush=True)
+        with tracing.span("wait_boot"):
+            for _ in range(REBOOT_WAIT_SECONDS):
+                time.sleep(1)
+                print(".", end="", flush=True)
         print()
 
         print("\nWaiting for device to reappear...", end="", flush=True)
@@ -465,24 +704,32 @@ def reboot(port: str, baud: int) -> None:
         # Check if port is a USB ACM device
         is_usb_acm = port.startswith('/dev/ttyACM')
 
-        for _ in range(DEVICE_POLL_ATTEMPTS):
-            if is_usb_acm:
-                # For USB devices, check for any /dev/ttyACM* device
-                acm_devices = glob.glob('/dev/ttyACM*')
-                if acm_devices:
-                    new_port = acm_devices[0]
-                    print(f" ✓ Device found at {new_port}")
-                    device_found = True
-                    break
-            else:
-                # For other devices (like UART), check exact path
-                if os.path.exists(port):
-                    new_port = port
-                    print(" ✓ Device found")
-                    device_found = True
-                    break
-            print(".", end="", flush=True)
-            time.sleep(1)
+        with tracing.span("wait_device"):
+            for _ in range(DEVICE_POLL_ATTEMPTS):
+                if serial_number:
+                    # Same USB device, whatever path it re-enumerated at
+                    new_port = discovery.port_for_serial_number(serial_number)
+                    if new_port:
+                        print(f" ✓ Device found at {new_port}")
+                        device_found = True
+                        break
+                elif is_usb_acm:
+                    # For USB devices, check for any /dev/ttyACM* device
+                    acm_devices = glob.glob('/dev/ttyACM*')
+                    if acm_devices:
+                        new_port = acm_devices[0]
+                        print(f" ✓ Device found at {new_port}")
+                        device_found = True
+                        break
+                else:
+                    # For other devices (like UART), check exact path
+                    if os.path.exists(port):
+                        new_port = port
+                        print(" ✓ Device found")
+                        device_found = True
+                        break
+                print(".", end="", flush=True)
+                time.sleep(1)
 
         if not device_found:
             print(f" ✗ Device did not reappear")
@@ -503,13 +750,16 @@ def reboot(port: str, baud: int) -> None:
         _handle_error(e)
 
 
-def compare_params_with_defaults(port: str, baud: int, reference_file: str = None) -> None:
+def compare_params_with_defaults(port: str, baud: int, reference_file: str = None, max_diffs: int = None) -> None:
     """Compare current Pixhawk parameters with reference defaults to verify reset.
 
+    Parameters are classified while they download; the verdict can come early.
+
     Args:
         port: Serial port path
         baud: Baud rate
         reference_file: Path to reference params file. If None, uses px4_v1.16.0_default.params from project root.
+        max_diffs: Stop reading after this many configuration differences
     """
     try:
         # Connect to Pixhawk
@@ -517,26 +767,39 @@ def compare_params_with_defaults(port: str, baud: int, reference_file: str = Non
 
         # Determine reference file path
         if reference_file is None:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            reference_file = os.path.join(script_dir, '..', '..', '..', 'px4_v1.16.0_default.params')
+            reference_file = default_reference_file()
 
         # Load reference parameters
         print(f"Loading reference parameters from {reference_file}...")
-        reference_params = _load_reference_params(reference_file)
+        with tracing.span("load_reference", file=reference_file):
+            reference_params = load_reference_params(reference_file)
         print(f"✓ Loaded {len(reference_params)} reference parameters\n")
 
-        # Read current parameters from Pixhawk
-        current_params = _read_all_params(mav)
-
-        # Compare parameters
-        matching, config_diffs, auto_cal_diffs = _compare_parameters(reference_params, current_params)
+        # Read current parameters from Pixhawk, comparing each as it arrives
+        with tracing.span("PARAM_REQUEST_LIST", category="mavlink"):
+            matching, config_diffs, auto_cal_diffs, current_params, expected_count, limited = \
+                compare_params_streaming(mav, reference_params, max_diffs)
 
         # Count parameters only in reference or only in current
-        only_in_reference = sum(1 for p in reference_params if p not in current_params)
-        only_in_current = sum(1 for p in current_params if p not in reference_params)
+        with tracing.span("compare"):
+            only_in_current = sum(1 for p in current_params if p not in reference_params)
+            if limited:
+                # Stopped by --max-diffs: parameters not read yet are not missing
+                only_in_reference = 0
+                print(f"Stopped after {len(current_params)}/{expected_count} parameters "
+                      f"({len(config_diffs)} configuration differences)\n")
+            else:
+                only_in_reference = sum(1 for p in reference_params if p not in current_params)
+                if expected_count and len(current_params) >= expected_count:
+                    _save_param_names(current_params)
+                else:
+                    print(f"✗ Incomplete download: received {len(current_params)}/{expected_count} parameters; "
+                          f"unread parameters are counted as missing\n")
+        _record_snapshot(_vehicle_id(port), current_params, "compare-params")
 
         # Display results
-        _display_comparison_results(matching, config_diffs, auto_cal_diffs, only_in_reference, only_in_current)
+        with tracing.span("display"):
+            _display_comparison_results(matching, config_diffs, auto_cal_diffs, only_in_reference, only_in_current)
 
     except FileNotFoundError as e:
         print(f"Error: Reference file not found: {reference_file}")
@@ -575,3 +838,117 @@ def configure_telem2(port: str, baud: int) -> None:
 
     except Exception as e:
         _handle_error(e)
+
+
+def param_get(port: str, baud: int, patterns: List[str], reference_file: str = None) -> None:
+    """Read parameters by name or glob pattern without downloading the full list.
+
+    Patterns (e.g. SER_TEL*) are resolved against the names cached by the last
+    full download (compare-params) and the reference params file.
+    """
+    try:
+        names = _resolve_param_names(patterns, reference_file)
+        if not names:
+            return
+        mav = connection.connect(connection.make_serial_address(port, baud))
+
+        start_time = time.time()
+        values = _read_params(mav, names)
+        elapsed = time.time() - start_time
+
+        for name in names:
+            if name in values:
+                print(f"  {name:16} = {_format_param(values[name]['value'], values[name]['type'])}")
+            else:
+                print(f"  ✗ {name}: no reply (not on this vehicle?)")
+        print(f"\n✓ Read {len(values)}/{len(names)} parameters in {elapsed * 1000:.0f} ms")
+        _record_snapshot(_vehicle_id(port), values, "param-get")
+
+    except Exception as e:
+        _handle_error(e)
+
+
+def param_set(port: str, baud: int, assignments: List[str]) -> None:
+    """Set parameters given as NAME=VALUE.
+
+    Current values are read first to learn each parameter's type; the writes are
+    then sent with several PARAM_SET in flight and confirmed by the PARAM_VALUE echoes.
+    """
+    try:
+        requested = {}
+        for assignment in assignments:
+            name, sep, value = assignment.partition('=')
+            if not sep:
+                raise ValueError(f"Expected NAME=VALUE, got {assignment}")
+            requested[name.strip().upper()] = value.strip()
+
+        mav = connection.connect(connection.make_serial_address(port, baud))
+        current = _read_params(mav, list(requested))
+        for name in requested:
+            if name not in current:
+                print(f"  ✗ {name}: no reply (not on this vehicle?)")
+
+        encoded = {}
+        for name, param in current.items():
+            param_type = param['type']
+            if param_type in INT_PARAM_TYPES:
+                encoded[name] = encode_param_value(int(requested[name]), param_type)
+            else:
+                encoded[name] = float(requested[name])
+
+        def send(name: str) -> None:
+            mav.mav.param_set_send(mav.target_system, mav.target_component, name.encode('utf-8'),
+                                   encoded[name], current[name]['type'])
+
+        with tracing.span("PARAM_SET", category="mavlink", count=len(encoded)):
+            confirmed = _request_params(mav, list(encoded), send)
+
+        for name in encoded:
+            param_type = current[name]['type']
+            if name not in confirmed:
+                print(f"  ✗ {name}: not confirmed")
+                continue
+            old = _format_param(current[name]['value'], param_type)
+            new = _format_param(confirmed[name]['value'], param_type)
+            ok = _format_param(encoded[name], param_type) == new
+            print(f"  {'✓' if ok else '✗'} {name:16} {old} → {new}")
+        _record_snapshot(_vehicle_id(port), confirmed, "param-set")
+
+    except Exception as e:
+        _handle_error(e)
+
+
+def param_history(pattern: str = "*", vehicle: str = None, since_days: float = None) -> None:
+    """Print recorded value changes of parameters matching a glob pattern."""
+    since = time.time() - since_days * 86400 if since_days is not None else None
+    with ParamStore() as store:
+        changes = store.changes(pattern.upper(), vehicle, since)
+        if not changes:
+            print(f"No recorded changes for {pattern}")
+            return
+        for c in changes:
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(c.taken_at))
+            old = "(first read)" if c.previous is None else f"{c.previous:.7g} →"
+            print(f"{when}  {c.vehicle:20} {c.name:16} {old} {c.value:.7g}")
+        print(f"\n{len(changes)} changes ({len(store.vehicles())} vehicles in {store.path})")
+
+
+def param_latest(pattern: str, non_default: bool = False, reference_file: str = None) -> None:
+    """Print the last recorded value of matching parameters on every vehicle.
+
+    Args:
+        pattern: Parameter name glob (e.g. MAV_1_CONFIG, EKF2_*)
+        non_default: Only show values that differ from the reference params file
+        reference_file: Reference params file for non_default
+    """
+    reference = load_reference_params(reference_file or default_reference_file()) if non_default else {}
+    with ParamStore() as store:
+        rows = store.latest(pattern.upper())
+    shown = 0
+    for vehicle, name, value, param_type in rows:
+        if non_default and name in reference and abs(reference[name]['value'] - value) < FLOAT_COMPARISON_TOLERANCE:
+            continue
+        default = f" (default {reference[name]['value']:.7g})" if name in reference else ""
+        print(f"{vehicle:20} {name:16} = {value:.7g}{default}")
+        shown += 1
+    print(f"\n{shown} values")
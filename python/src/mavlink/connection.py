@@ -3,7 +3,9 @@ from pymavlink import mavutil
 from pymavlink.mavutil import mavlink_connection
 import time
 
-from src.common.env import get_connection_address
+from src.common.env import get_connection_address, use_reader_thread
+from src.common import tracing
+from src.mavlink.serial_reader import start_reader
 
 
 def make_serial_address(port: str, baud: int) -> str:
@@ -47,39 +49,84 @@ def convert_mavsdk_to_pymavlink_address(address: str) -> str:
     return address.replace("://", ":", 1)
 
 
-def connect(address: str = None) -> mavlink_connection:
+def connect(address: str = None, heartbeat_timeout: float = None, quiet: bool = False) -> mavlink_connection:
     """
     Create MAVLink connection and wait for heartbeat.
 
+    With MAVLINK_READER=thread, serial links are then drained by a dedicated
+    reader thread (see src.mavlink.serial_reader).
+
     Args:
         address: Connection address. If None, uses DRONE_ADDRESS environment variable.
+            Comma-separated addresses open a redundant multi-link connection
+            (see src.mavlink.multilink).
+        heartbeat_timeout: Seconds to wait for a heartbeat; None waits indefinitely.
+        quiet: Do not print connection progress (e.g. when connecting from worker threads).
 
     Returns:
         mavlink_connection: Connected MAVLink instance.
 
     Raises:
         ValueError: If address is not provided and DRONE_ADDRESS is not set.
+        TimeoutError: If no heartbeat arrives within heartbeat_timeout.
     """
+    log = (lambda *args: None) if quiet else print
     if address is None:
         address = get_connection_address()
 
-    connection_address = convert_mavsdk_to_pymavlink_address(address)
-    print(f"Connecting to {connection_address}...")
+    # Several comma-separated addresses: one redundant connection over all of them
+    connection_addresses = [convert_mavsdk_to_pymavlink_address(a.strip()) for a in address.split(",")]
+    connection_address = ", ".join(connection_addresses)
+    log(f"Connecting to {connection_address}...")
+
+    with tracing.span("connect", address=connection_address):
+        with tracing.span("open"):
+            if len(connection_addresses) > 1:
+                # Imported here: multilink depends on timesync, which imports this module
+                from src.mavlink.multilink import MultiLink
+                mav = MultiLink(connection_addresses)
+            else:
+                mav = mavutil.mavlink_connection(connection_addresses[0])
+
+        # Allow connection to stabilize and initialize internal state
+        # This prevents pymavlink race conditions where sysid_state isn't ready
+        with tracing.span("stabilize"):
+            time.sleep(0.5)
+
+            # Flush any initial messages to ensure clean state
+            while True:
+                msg = mav.recv_match(blocking=False, timeout=0.1)
+                if msg is None:
+                    break
+
+        log("Waiting for heartbeat...")
+        with tracing.span("HEARTBEAT", category="mavlink"):
+            if mav.wait_heartbeat(timeout=heartbeat_timeout) is None:
+                mav.close()
+                raise TimeoutError(f"No heartbeat from {connection_address} within {heartbeat_timeout}s")
+    log(f"Heartbeat from system {mav.target_system}, component {mav.target_component}")
+
+    if use_reader_thread() and start_reader(mav):
+        log("Serial reader thread started")
 
-    mav = mavutil.mavlink_connection(connection_address)
+    return mav
 
-    # Allow connection to stabilize and initialize internal state
-    # This prevents pymavlink race conditions where sysid_state isn't ready
-    time.sleep(0.5)
 
-    # Flush any initial messages to ensure clean state
-    while True:
-        msg = mav.recv_match(blocking=False, timeout=0.1)
-        if msg is None:
-            break
+def set_message_interval(mav, message_id: int, rate_hz: float) -> None:
+    """
+    Request a stream rate for one message (MAV_CMD_SET_MESSAGE_INTERVAL).
 
-    print("Waiting for heartbeat...")
-    mav.wait_heartbeat()
-    print(f"Heartbeat from system {mav.target_system}, component {mav.target_component}")
+    Fire-and-forget: the COMMAND_ACK is left in the stream for callers that care.
 
-    return mav
+    Args:
+        mav: Connected MAVLink connection
+        message_id: MAVLink message ID (e.g. mavutil.mavlink.MAVLINK_MSG_ID_RC_CHANNELS)
+        rate_hz: Requested rate; 0 or less disables the stream
+    """
+    interval_us = int(1e6 / rate_hz) if rate_hz > 0 else -1
+    mav.mav.command_long_send(
+        mav.target_system,
+        mav.target_component,
+        mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+        0, message_id, interval_us, 0, 0, 0, 0, 0
+    )
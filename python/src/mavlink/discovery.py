@@ -0,0 +1,170 @@
+"""Serial port and baud rate auto-discovery
+
+Every candidate device is probed on its own thread by listening for MAVLink frames
+with a valid CRC. Bauds are tried in turn per device, since one port can only be
+open at one rate. USB CDC ACM ports ignore the baud rate and are probed once.
+
+Results are cached by USB serial number (device path for on-board UARTs). Later runs
+re-probe only the cached port/baud, which returns on the first HEARTBEAT; a stale entry
+(autopilot moved to another port, baud changed) is dropped and a full discovery runs.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import serial
+from serial.tools import list_ports
+from pymavlink.dialects.v20 import common as mavlink2
+
+from src.common import cache
+from src.common.constants import DEFAULT_USB_BAUD, DEFAULT_UART_PORT
+
+# Most likely rates first: PX4 TELEM defaults, then companion-computer rates
+PROBE_BAUDS = (57600, 921600, 115200, 460800, 230400, 38400)
+
+# PX4 sends HEARTBEAT at 1 Hz, so one window per baud catches at least one
+PROBE_SECONDS = 1.2
+
+DISCOVERY_CACHE_FILE = "discovery.json"
+
+
+@dataclass
+class DiscoveredPort:
+    """A serial device with a MAVLink autopilot behind it."""
+    port: str
+    baud: int
+    sysid: int
+    serial_number: Optional[str] = None
+
+    @property
+    def cache_key(self) -> str:
+        return self.serial_number or self.port
+
+
+def candidate_ports() -> list:
+    """USB serial devices plus the on-board UART (pyserial ListPortInfo entries)."""
+    return [
+        info for info in list_ports.comports()
+        if info.vid is not None or info.device == DEFAULT_UART_PORT
+    ]
+
+
+def _is_usb_acm(device: str) -> bool:
+    return device.startswith("/dev/ttyACM") or device.startswith("/dev/cu.usbmodem")
+
+
+def probe(device: str, baud: int, seconds: float = PROBE_SECONDS) -> Optional[int]:
+    """Listen on one port/baud for MAVLink frames.
+
+    Returns:
+        System ID of the autopilot heard (sender of a valid HEARTBEAT, or of any
+        valid frames if no HEARTBEAT arrived in time), None if nothing valid was heard
+    """
+    parser = mavlink2.MAVLink(None)
+    parser.robust_parsing = True
+    sysid = None
+    with serial.Serial(device, baud, timeout=0.1) as port:
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            data = port.read(max(port.in_waiting, 1))
+            for msg in parser.parse_buffer(data) or ():
+                if msg.get_type() == 'BAD_DATA':
+                    continue
+                if msg.get_type() == 'HEARTBEAT' and msg.type != mavlink2.MAV_TYPE_GCS:
+                    return msg.get_srcSystem()
+                sysid = msg.get_srcSystem()
+    return sysid
+
+
+def _probe_device(info) -> Optional[DiscoveredPort]:
+    """Try each baud on one device until MAVLink is heard."""
+    bauds = (DEFAULT_USB_BAUD,) if _is_usb_acm(info.device) else PROBE_BAUDS
+    for baud in bauds:
+        try:
+            sysid = probe(info.device, baud)
+        except (serial.SerialException, OSError):
+            return None  # Busy (e.g. held by mavlink-router) or gone
+        if sysid is not None:
+            return DiscoveredPort(info.device, baud, sysid, info.serial_number)
+    return None
+
+
+def discover() -> list[DiscoveredPort]:
+    """Probe all candidate ports concurrently and refresh the cache.
+
+    Returns:
+        Autopilots found, USB devices first
+    """
+    ports = candidate_ports()
+    if not ports:
+        return []
+    with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+        found = [result for result in executor.map(_probe_device, ports) if result]
+
+    cached = cache.load_json(DISCOVERY_CACHE_FILE)
+    for result in found:
+        cached[result.cache_key] = {"baud": result.baud, "sysid": result.sysid}
+    cache.save_json(DISCOVERY_CACHE_FILE, cached)
+    return sorted(found, key=lambda result: result.serial_number is None)
+
+
+def find_autopilot(use_cache: bool = True) -> Optional[DiscoveredPort]:
+    """Port/baud of the first autopilot, from the cache when it still answers there.
+
+    Args:
+        use_cache: Probe only the cached port/baud of connected devices first, falling
+            back to full discovery when none of them is heard
+    """
+    if use_cache:
+        cached = cache.load_json(DISCOVERY_CACHE_FILE)
+        for info in candidate_ports():
+            key = info.serial_number or info.device
+            entry = cached.get(key)
+            if not entry:
+                continue
+            # The on-board UART is always present, so presence alone proves nothing:
+            # confirm the autopilot still answers at the cached baud
+            try:
+                sysid = probe(info.device, entry["baud"])
+            except (serial.SerialException, OSError):
+                sysid = None
+            if sysid is not None:
+                return DiscoveredPort(info.device, entry["baud"], sysid, info.serial_number)
+            del cached[key]
+            cache.save_json(DISCOVERY_CACHE_FILE, cached)
+
+    print("Discovering autopilot serial ports...")
+    found = discover()
+    return found[0] if found else None
+
+
+def serial_number_of(device: str) -> Optional[str]:
+    """USB serial number of a device path (None for non-USB or absent devices)."""
+    for info in list_ports.comports():
+        if info.device == device:
+            return info.serial_number
+    return None
+
+
+def port_for_serial_number(serial_number: str) -> Optional[str]:
+    """Current device path of a USB device, which may change across re-enumeration."""
+    for info in list_ports.comports():
+        if info.serial_number == serial_number:
+            return info.device
+    return None
+
+
+def print_discovered() -> None:
+    """Probe all ports and print what was found (refreshes the cache)."""
+    print("Probing serial ports...")
+    start_time = time.time()
+    found = discover()
+    print(f"Probed {len(candidate_ports())} ports in {time.time() - start_time:.1f}s")
+    if not found:
+        print("✗ No MAVLink autopilot found")
+        return
+    for result in found:
+        serial_info = f" (serial {result.serial_number})" if result.serial_number else ""
+        print(f"✓ {result.port} @ {result.baud} baud: system {result.sysid}{serial_info}")
+    print(f"Cached in {cache.cache_dir() / DISCOVERY_CACHE_FILE}")
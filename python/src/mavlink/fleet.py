@@ -0,0 +1,151 @@
+"""Fleet-wide parameter audit against the reference defaults
+
+Every endpoint runs the connect → PARAM_REQUEST_LIST → compare pipeline of
+compare-params in a bounded worker pool. The workers share one parsed copy of
+the reference file. Waiting on the links releases the GIL, so the downloads
+overlap.
+
+Endpoints file: one address per line (same formats as DRONE_ADDRESS), with an
+optional display name after whitespace; '#' starts a comment.
+
+    serial:///dev/ttyUSB0:57600   drone-01
+    udpin://0.0.0.0:14551         drone-02
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.common.param_store import ParamStore
+from src.mavlink import config, connection
+
+FLEET_WORKERS = 8
+FLEET_HEARTBEAT_TIMEOUT = 10.0
+FLEET_TOP_DIFFS = 5  # Differences listed per vehicle in the report
+
+
+@dataclass
+class VehicleAudit:
+    """Comparison result and timings of one endpoint."""
+    name: str
+    address: str
+    matching: int = 0
+    config_diffs: list = field(default_factory=list)
+    auto_cal_diffs: list = field(default_factory=list)
+    only_in_reference: int = 0
+    only_in_current: int = 0
+    connect_seconds: float = 0.0
+    download_seconds: float = 0.0
+    error: Optional[str] = None
+    params: dict = field(default_factory=dict, repr=False)  # As received, for the snapshot history
+
+
+def load_endpoints(path: str) -> list[tuple[str, str]]:
+    """Read (name, address) pairs from an endpoints file."""
+    endpoints = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            address, *name = line.split(None, 1)
+            endpoints.append((name[0] if name else address, address))
+    return endpoints
+
+
+def audit_vehicle(name: str, address: str, reference_params: dict, max_diffs: int = None) -> VehicleAudit:
+    """Download and compare one vehicle's parameters (runs in a worker thread)."""
+    result = VehicleAudit(name, address)
+    start_time = time.time()
+    mav = None
+    try:
+        mav = connection.connect(address, heartbeat_timeout=FLEET_HEARTBEAT_TIMEOUT, quiet=True)
+        result.connect_seconds = time.time() - start_time
+
+        start_time = time.time()
+        result.matching, result.config_diffs, result.auto_cal_diffs, current_params, expected_count, limited = \
+            config.compare_params_streaming(mav, reference_params, max_diffs, progress=False)
+        result.download_seconds = time.time() - start_time
+
+        if not current_params:
+            result.error = "no parameters received"
+        elif not limited and len(current_params) < expected_count:
+            result.error = f"incomplete download ({len(current_params)}/{expected_count} parameters)"
+        result.params = current_params
+        result.only_in_current = sum(1 for p in current_params if p not in reference_params)
+        if not limited:
+            result.only_in_reference = sum(1 for p in reference_params if p not in current_params)
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    finally:
+        if mav is not None:
+            mav.close()
+    return result
+
+
+def _print_report(results: list[VehicleAudit], elapsed: float) -> None:
+    # Most configuration differences first; unreachable vehicles last
+    results = sorted(results, key=lambda r: (r.error is not None, -len(r.config_diffs), r.name))
+    print("\n" + "=" * 96)
+    print(f"{'Vehicle':24} | {'Config':>6} | {'Auto-cal':>8} | {'Match':>5} | {'Missing':>7} | {'Extra':>5} | "
+          f"{'Connect':>7} | {'Download':>8}")
+    print("-" * 96)
+    for r in results:
+        if r.error:
+            print(f"{r.name:24} | ✗ {r.error}")
+            continue
+        print(f"{r.name:24} | {len(r.config_diffs):6d} | {len(r.auto_cal_diffs):8d} | {r.matching:5d} | "
+              f"{r.only_in_reference:7d} | {r.only_in_current:5d} | {r.connect_seconds:6.1f}s | "
+              f"{r.download_seconds:7.1f}s")
+
+    differing = [r for r in results if r.config_diffs and not r.error]
+    if differing:
+        print("\nConfiguration differences:")
+        for r in differing:
+            listed = ", ".join(f"{d['name']}={d['current']:.7g}" for d in r.config_diffs[:FLEET_TOP_DIFFS])
+            more = f" (+{len(r.config_diffs) - FLEET_TOP_DIFFS} more)" if len(r.config_diffs) > FLEET_TOP_DIFFS else ""
+            print(f"  {r.name}: {listed}{more}")
+
+    audited = [r for r in results if not r.error]
+    at_defaults = sum(1 for r in audited if not r.config_diffs)
+    serial_time = sum(r.connect_seconds + r.download_seconds for r in audited)
+    print("-" * 96)
+    print(f"{len(audited)}/{len(results)} vehicles audited, {at_defaults} at defaults, "
+          f"in {elapsed:.1f}s ({serial_time:.1f}s one at a time)")
+    print("=" * 96)
+
+
+def fleet_audit(endpoints_file: str, reference_file: str = None, workers: int = FLEET_WORKERS,
+                max_diffs: int = None) -> None:
+    """Compare every vehicle in the endpoints file with the reference defaults.
+
+    Args:
+        endpoints_file: Endpoints file (see module docstring)
+        reference_file: Reference params file; defaults to the compare-params reference
+        workers: Vehicles audited at once
+        max_diffs: Stop each download after this many configuration differences
+    """
+    endpoints = load_endpoints(endpoints_file)
+    if not endpoints:
+        print(f"No endpoints in {endpoints_file}")
+        return
+    reference_file = reference_file or config.default_reference_file()
+    reference_params = config.load_reference_params(reference_file)
+    print(f"Auditing {len(endpoints)} vehicles against {len(reference_params)} reference parameters "
+          f"({min(workers, len(endpoints))} at a time)")
+
+    start_time = time.time()
+    results = []
+    with ParamStore() as store, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(audit_vehicle, name, address, reference_params, max_diffs)
+                   for name, address in endpoints]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            if r.params:
+                # Recorded from this thread only: a SQLite connection is not shared across threads
+                store.record(r.name, config.decoded_values(r.params), "fleet-audit")
+            status = f"✗ {r.error}" if r.error else f"✓ {len(r.config_diffs)} configuration differences"
+            print(f"[{len(results)}/{len(endpoints)}] {r.name}: {status}")
+
+    _print_report(results, time.time() - start_time)
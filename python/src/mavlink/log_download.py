@@ -0,0 +1,221 @@
+"""Onboard log listing and resumable download (LOG_REQUEST_LIST / LOG_REQUEST_DATA)
+
+The output file is preallocated to the log size and memory-mapped, so every
+LOG_DATA chunk is copied straight to its offset. Received chunks are tracked in
+a bitmap. The missing ranges are requested as a few large LOG_REQUEST_DATA
+windows that the vehicle streams back without per-chunk round trips. When a
+stream stops, only the remaining gaps are requested again.
+
+The bitmap is saved as a range map in a sidecar file (<output>.part) so an
+interrupted transfer resumes where it stopped.
+"""
+import json
+import mmap
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.mavlink.connection import connect
+
+LOG_DATA_CHUNK = 90           # Payload bytes per LOG_DATA message
+LOG_WINDOW_BYTES = 1 << 20    # Bytes requested per LOG_REQUEST_DATA
+LOG_STALL_SECONDS = 0.5       # No LOG_DATA for this long: the window is done, request the gaps
+LOG_LIST_TIMEOUT = 3.0
+LOG_RETRIES = 10              # Stalls in a row without new data before giving up
+LOG_CHECKPOINT_SECONDS = 2.0  # Range map save interval
+
+SERIAL_BITS_PER_BYTE = 10
+
+
+def list_logs(mav, timeout: float = LOG_LIST_TIMEOUT) -> list:
+    """Request the log directory.
+
+    Returns:
+        LOG_ENTRY messages sorted by id
+    """
+    mav.mav.log_request_list_send(mav.target_system, mav.target_component, 0, 0xFFFF)
+    entries = {}
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        msg = mav.recv_match(type='LOG_ENTRY', blocking=True, timeout=0.5)
+        if msg is None:
+            continue
+        if msg.num_logs == 0:
+            break
+        entries[msg.id] = msg
+        deadline = time.time() + timeout
+        if len(entries) >= msg.num_logs:
+            break
+    return [entries[i] for i in sorted(entries)]
+
+
+def _missing_ranges(received: np.ndarray) -> list[tuple[int, int]]:
+    """[first, last) chunk index runs that have not been received."""
+    missing = np.concatenate(([False], ~received, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(missing))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def _load_range_map(path: str, log_id: int, size: int, chunks: int) -> np.ndarray:
+    """Received-chunk bitmap from a sidecar of the same log (all False otherwise)."""
+    received = np.zeros(chunks, dtype=bool)
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return received
+    if state.get("id") != log_id or state.get("size") != size:
+        return received
+    for first, last in state.get("ranges", []):
+        received[first:last] = True
+    return received
+
+
+def _save_range_map(path: str, log_id: int, size: int, received: np.ndarray) -> None:
+    """Write received chunk ranges to the sidecar."""
+    state = {"id": log_id, "size": size, "chunk": LOG_DATA_CHUNK, "ranges": _missing_ranges(~received)}
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def download_log(mav, log_id: int, size: int, path: str, window: int = LOG_WINDOW_BYTES,
+                 capacity_bytes_per_s: Optional[float] = None) -> bool:
+    """Download one log into `path`, resuming from `path`.part if present.
+
+    Args:
+        log_id: Log id from LOG_ENTRY
+        size: Log size in bytes from LOG_ENTRY
+        window: Bytes requested per LOG_REQUEST_DATA
+        capacity_bytes_per_s: Link capacity, for reporting utilization
+
+    Returns:
+        True when the whole log has been written
+    """
+    chunks = (size + LOG_DATA_CHUNK - 1) // LOG_DATA_CHUNK
+    sidecar = path + ".part"
+    resume = os.path.exists(sidecar) and os.path.exists(path) and os.path.getsize(path) == size
+    received = _load_range_map(sidecar, log_id, size, chunks) if resume else np.zeros(chunks, dtype=bool)
+    if received.any():
+        print(f"Resuming: {int(received.sum()) * LOG_DATA_CHUNK / 1024:.0f} KiB already downloaded")
+
+    complete = False
+    try:
+        with open(path, "r+b" if resume else "w+b") as f:
+            f.truncate(size)
+            if size == 0:
+                complete = True
+                return True
+            with mmap.mmap(f.fileno(), size) as out:
+                complete = _transfer(mav, log_id, size, out, received, sidecar, window, capacity_bytes_per_s)
+                out.flush()
+    finally:
+        # Also runs on Ctrl-C, so the next run resumes from the last chunk received
+        if complete:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+        else:
+            _save_range_map(sidecar, log_id, size, received)
+    return complete
+
+
+def _transfer(mav, log_id: int, size: int, out: mmap.mmap, received: np.ndarray, sidecar: str,
+              window: int, capacity: Optional[float]) -> bool:
+    """Request missing ranges window by window until every chunk has arrived."""
+    start_time = last_report = last_checkpoint = time.time()
+    start_chunks = int(received.sum())
+    window_chunks = max(window // LOG_DATA_CHUNK, 1)
+    stalls = 0
+
+    try:
+        while True:
+            gaps = _missing_ranges(received)
+            if not gaps:
+                break
+            first, last = gaps[0]
+            last = min(last, first + window_chunks)
+            mav.mav.log_request_data_send(mav.target_system, mav.target_component, log_id,
+                                          first * LOG_DATA_CHUNK, (last - first) * LOG_DATA_CHUNK)
+            before = int(received.sum())
+
+            # Take the stream until it stalls or the requested range is complete
+            while not received[first:last].all():
+                msg = mav.recv_match(type='LOG_DATA', blocking=True, timeout=LOG_STALL_SECONDS)
+                if msg is None:
+                    break
+                if msg.id != log_id or msg.count == 0 or msg.ofs % LOG_DATA_CHUNK:
+                    continue
+                chunk = msg.ofs // LOG_DATA_CHUNK
+                if chunk >= len(received):
+                    continue
+                count = min(msg.count, size - msg.ofs)
+                out[msg.ofs:msg.ofs + count] = bytes(msg.data[:count])
+                received[chunk] = True
+
+                now = time.time()
+                if now - last_report >= 1.0:
+                    _print_progress(received, size, start_chunks, now - start_time, capacity)
+                    last_report = now
+                if now - last_checkpoint >= LOG_CHECKPOINT_SECONDS:
+                    _save_range_map(sidecar, log_id, size, received)
+                    last_checkpoint = now
+
+            stalls = stalls + 1 if int(received.sum()) == before else 0
+            if stalls > LOG_RETRIES:
+                print("\n✗ Transfer stalled")
+                return False
+    finally:
+        mav.mav.log_request_end_send(mav.target_system, mav.target_component)
+
+    _print_progress(received, size, start_chunks, time.time() - start_time, capacity)
+    print()
+    return True
+
+
+def _print_progress(received: np.ndarray, size: int, start_chunks: int, elapsed: float,
+                    capacity: Optional[float]) -> None:
+    done = min(int(received.sum()) * LOG_DATA_CHUNK, size)
+    rate = (int(received.sum()) - start_chunks) * LOG_DATA_CHUNK / elapsed if elapsed > 0 else 0.0
+    # LOG_DATA carries 90 payload bytes in a 109-byte MAVLink 2 frame
+    utilization = f" ({rate * 109 / 90 / capacity:.0%} of link)" if capacity else ""
+    print(f"\r{done / 1024:8.0f}/{size / 1024:.0f} KiB | {rate / 1024:7.1f} KiB/s{utilization}   ",
+          end="", flush=True)
+
+
+def _link_capacity(mav) -> Optional[float]:
+    baud = getattr(mav, 'baud', None)
+    return int(baud) / SERIAL_BITS_PER_BYTE if baud else None
+
+
+def log_list() -> None:
+    """Print the vehicle's onboard logs."""
+    mav = connect()
+    entries = list_logs(mav)
+    if not entries:
+        print("No logs on vehicle")
+        return
+    print(f"{'ID':>4} | {'Size':>10} | Time (UTC)")
+    print("-" * 40)
+    for entry in entries:
+        when = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(entry.time_utc)) if entry.time_utc else "-"
+        print(f"{entry.id:4d} | {entry.size / 1024:7.0f} KiB | {when}")
+
+
+def log_download(log_id: int, path: str = None, window: int = LOG_WINDOW_BYTES) -> None:
+    """Download a log by id (resumes an interrupted download to the same path)."""
+    mav = connect()
+    entry = next((e for e in list_logs(mav) if e.id == log_id), None)
+    if entry is None:
+        print(f"✗ Log {log_id} not found")
+        return
+    path = path or f"log_{log_id}.ulg"
+    print(f"Downloading log {log_id} ({entry.size / 1024:.0f} KiB) to {path}")
+    start_time = time.time()
+    if download_log(mav, log_id, entry.size, path, window, _link_capacity(mav)):
+        elapsed = time.time() - start_time
+        print(f"✓ Saved {path} in {elapsed:.1f}s")
+    else:
+        print(f"Partial download kept; run again to resume ({path}.part)")
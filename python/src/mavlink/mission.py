@@ -0,0 +1,269 @@
+"""Mission upload/download over the MAVLink mission protocol (MISSION_ITEM_INT)
+
+Items are held in a NumPy structured array (33 bytes per item) and read from /
+written to QGC WPL 110 files.
+
+Upload: every MISSION_ITEM_INT is encoded before MISSION_COUNT is sent, so each
+MISSION_REQUEST_INT is answered straight from the table; re-requested items are
+simply sent again.
+
+Download: up to `window` MISSION_REQUEST_INT are kept in flight instead of one
+request per round trip. Only items that have not arrived within the item timeout
+are requested again. A vehicle that NACKs overlapping requests (PX4 ends the
+transfer on an out-of-order request) gets a fresh transfer with one request at a
+time.
+"""
+import time
+from typing import Optional
+
+import numpy as np
+from pymavlink import mavutil
+
+from src.mavlink.connection import connect
+
+MISSION_DTYPE = np.dtype([
+    ('frame', np.uint8), ('command', np.uint16), ('current', np.uint8), ('autocontinue', np.uint8),
+    ('param1', np.float32), ('param2', np.float32), ('param3', np.float32), ('param4', np.float32),
+    ('x', np.int32), ('y', np.int32), ('z', np.float32),
+])
+
+WPL_HEADER = "QGC WPL 110"
+
+# Local frames carry x/y in meters * 1e4 in MISSION_ITEM_INT, global frames degrees * 1e7
+LOCAL_FRAMES = {
+    mavutil.mavlink.MAV_FRAME_LOCAL_NED,
+    mavutil.mavlink.MAV_FRAME_LOCAL_ENU,
+    mavutil.mavlink.MAV_FRAME_LOCAL_OFFSET_NED,
+    mavutil.mavlink.MAV_FRAME_BODY_NED,
+    mavutil.mavlink.MAV_FRAME_BODY_OFFSET_NED,
+    mavutil.mavlink.MAV_FRAME_BODY_FRD,
+    mavutil.mavlink.MAV_FRAME_LOCAL_FRD,
+    mavutil.mavlink.MAV_FRAME_LOCAL_FLU,
+}
+
+MISSION_ITEM_TIMEOUT = 1.0     # Seconds before an item is requested (or MISSION_COUNT sent) again
+MISSION_RETRIES = 5            # Timeouts in a row before giving up
+MISSION_DOWNLOAD_WINDOW = 8    # MISSION_REQUEST_INT in flight during download
+
+
+def _typed(mission_type: int) -> dict:
+    """mission_type keyword for send/encode calls; omitted for plain missions, since
+    the MAVLink 1 dialect pymavlink starts with has no mission_type extension field."""
+    return {'mission_type': mission_type} if mission_type != mavutil.mavlink.MAV_MISSION_TYPE_MISSION else {}
+
+
+def _xy_scale(frames: np.ndarray) -> np.ndarray:
+    return np.where(np.isin(frames, list(LOCAL_FRAMES)), 1e4, 1e7)
+
+
+def load_wpl(path: str) -> np.ndarray:
+    """Read a QGC WPL 110 file into a mission item array."""
+    with open(path) as f:
+        header = f.readline().strip()
+        if not header.startswith(WPL_HEADER):
+            raise ValueError(f"Not a {WPL_HEADER} file: {path}")
+        rows = [line.split() for line in f if line.strip()]
+    if not rows:
+        return np.zeros(0, dtype=MISSION_DTYPE)
+
+    # Columns: index, current, frame, command, param1-4, x (lat), y (lon), z (alt), autocontinue
+    table = np.array(rows, dtype=np.float64)
+    items = np.zeros(len(table), dtype=MISSION_DTYPE)
+    items['current'] = table[:, 1]
+    items['frame'] = table[:, 2]
+    items['command'] = table[:, 3]
+    for i in range(4):
+        items[f'param{i + 1}'] = table[:, 4 + i]
+    scale = _xy_scale(items['frame'])
+    items['x'] = np.round(table[:, 8] * scale)
+    items['y'] = np.round(table[:, 9] * scale)
+    items['z'] = table[:, 10]
+    items['autocontinue'] = table[:, 11]
+    return items
+
+
+def save_wpl(path: str, items: np.ndarray) -> None:
+    """Write mission items as a QGC WPL 110 file."""
+    scale = _xy_scale(items['frame'])
+    x, y = items['x'] / scale, items['y'] / scale
+    with open(path, "w") as f:
+        f.write(WPL_HEADER + "\n")
+        for seq, item in enumerate(items):
+            f.write(f"{seq}\t{item['current']}\t{item['frame']}\t{item['command']}\t"
+                    f"{item['param1']:.8g}\t{item['param2']:.8g}\t{item['param3']:.8g}\t{item['param4']:.8g}\t"
+                    f"{x[seq]:.8f}\t{y[seq]:.8f}\t{item['z']:.6g}\t{item['autocontinue']}\n")
+
+
+def _print_rate(action: str, count: int, elapsed: float, retransmits: int) -> None:
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"✓ {action} {count} items in {elapsed:.2f}s ({rate:.1f} items/s, {retransmits} retransmitted)")
+
+
+def upload_mission(mav, items: np.ndarray, mission_type: int = mavutil.mavlink.MAV_MISSION_TYPE_MISSION) -> bool:
+    """Upload mission items (MISSION_COUNT → MISSION_REQUEST_INT/MISSION_ITEM_INT → MISSION_ACK).
+
+    Returns:
+        True if the vehicle accepted the mission
+    """
+    # Encode everything up front so each request is answered without per-item work
+    encoded = [
+        mav.mav.mission_item_int_encode(
+            mav.target_system, mav.target_component, seq,
+            int(item['frame']), int(item['command']), int(item['current']), int(item['autocontinue']),
+            float(item['param1']), float(item['param2']), float(item['param3']), float(item['param4']),
+            int(item['x']), int(item['y']), float(item['z']), **_typed(mission_type),
+        )
+        for seq, item in enumerate(items)
+    ]
+    sent = np.zeros(len(items), dtype=bool)
+    retransmits = 0
+    timeouts = 0
+    start_time = time.time()
+
+    mav.mav.mission_count_send(mav.target_system, mav.target_component, len(items), **_typed(mission_type))
+    while True:
+        msg = mav.recv_match(type=['MISSION_REQUEST_INT', 'MISSION_REQUEST', 'MISSION_ACK'],
+                             blocking=True, timeout=MISSION_ITEM_TIMEOUT)
+        if msg is None:
+            timeouts += 1
+            if timeouts > MISSION_RETRIES:
+                print(f"✗ Upload timed out after {int(sent.sum())}/{len(items)} items")
+                return False
+            if not sent.any():
+                mav.mav.mission_count_send(mav.target_system, mav.target_component, len(items), **_typed(mission_type))
+            continue
+        if getattr(msg, 'mission_type', mission_type) != mission_type:
+            continue
+        timeouts = 0
+
+        if msg.get_type() == 'MISSION_ACK':
+            if msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                _print_rate("Uploaded", len(items), time.time() - start_time, retransmits)
+                return True
+            result = mavutil.mavlink.enums['MAV_MISSION_RESULT'][msg.type].name
+            print(f"✗ Upload rejected: {result}")
+            return False
+
+        seq = msg.seq
+        if seq >= len(items):
+            continue
+        if sent[seq]:
+            retransmits += 1
+        sent[seq] = True
+        mav.mav.send(encoded[seq])
+
+
+def _request_count(mav, mission_type: int) -> Optional[int]:
+    """Start a download transfer (MISSION_REQUEST_LIST); returns the item count, None if unanswered."""
+    for _ in range(MISSION_RETRIES):
+        mav.mav.mission_request_list_send(mav.target_system, mav.target_component, **_typed(mission_type))
+        msg = mav.recv_match(type='MISSION_COUNT', blocking=True, timeout=MISSION_ITEM_TIMEOUT)
+        if msg is not None and getattr(msg, 'mission_type', mission_type) == mission_type:
+            return msg.count
+    return None
+
+
+def download_mission(mav, mission_type: int = mavutil.mavlink.MAV_MISSION_TYPE_MISSION,
+                     window: int = MISSION_DOWNLOAD_WINDOW) -> Optional[np.ndarray]:
+    """Download mission items with up to `window` requests in flight.
+
+    Returns:
+        Mission item array, or None on failure
+    """
+    start_time = time.time()
+    count = _request_count(mav, mission_type)
+    if count is None:
+        print("✗ No MISSION_COUNT received")
+        return None
+
+    items = np.zeros(count, dtype=MISSION_DTYPE)
+    received = np.zeros(count, dtype=bool)
+    in_flight: dict[int, float] = {}  # seq -> time requested
+    next_seq = 0
+    retransmits = 0
+    timeouts = 0
+
+    while not received.all():
+        now = time.time()
+        # Keep the pipeline full
+        while len(in_flight) < window and next_seq < count:
+            if received[next_seq]:
+                next_seq += 1
+                continue
+            mav.mav.mission_request_int_send(mav.target_system, mav.target_component, next_seq, **_typed(mission_type))
+            in_flight[next_seq] = now
+            next_seq += 1
+
+        msg = mav.recv_match(type=['MISSION_ITEM_INT', 'MISSION_ACK'], blocking=True, timeout=0.1)
+        if msg is not None and msg.get_type() == 'MISSION_ACK':
+            if getattr(msg, 'mission_type', mission_type) != mission_type \
+                    or msg.type == mavutil.mavlink.MAV_MISSION_ACCEPTED:
+                continue
+            result = mavutil.mavlink.enums['MAV_MISSION_RESULT'][msg.type].name
+            if window == 1:
+                print(f"✗ Download rejected: {result}")
+                return None
+            # The vehicle ended the transfer on overlapping requests: start over, one at a time
+            print(f"⚠ Vehicle rejected pipelined requests ({result}), restarting with one request at a time")
+            window = 1
+            count = _request_count(mav, mission_type)
+            if count is None:
+                print("✗ No MISSION_COUNT received on restart")
+                return None
+            items = np.zeros(count, dtype=MISSION_DTYPE)
+            received = np.zeros(count, dtype=bool)
+            in_flight.clear()
+            next_seq = 0
+            timeouts = 0
+            continue
+        if msg is not None and msg.seq < count and getattr(msg, 'mission_type', mission_type) == mission_type:
+            seq = msg.seq
+            if not received[seq]:
+                item = items[seq]
+                for name in MISSION_DTYPE.names:
+                    item[name] = getattr(msg, name)
+                received[seq] = True
+            in_flight.pop(seq, None)
+            timeouts = 0
+            continue
+
+        # Re-request only the items that are overdue
+        overdue = [seq for seq, t in in_flight.items() if now - t > MISSION_ITEM_TIMEOUT]
+        if overdue:
+            timeouts += 1
+            if timeouts > MISSION_RETRIES:
+                print(f"✗ Download timed out after {int(received.sum())}/{count} items")
+                return None
+            for seq in overdue:
+                mav.mav.mission_request_int_send(mav.target_system, mav.target_component, seq, **_typed(mission_type))
+                in_flight[seq] = now
+                retransmits += 1
+
+    mav.mav.mission_ack_send(mav.target_system, mav.target_component,
+                             mavutil.mavlink.MAV_MISSION_ACCEPTED, **_typed(mission_type))
+    _print_rate("Downloaded", count, time.time() - start_time, retransmits)
+    return items
+
+
+def mission_upload(path: str) -> None:
+    """Upload a QGC WPL mission file to the vehicle."""
+    items = load_wpl(path)
+    print(f"Loaded {len(items)} mission items from {path} ({items.nbytes} bytes)")
+    mav = connect()
+    upload_mission(mav, items)
+
+
+def mission_download(path: str = None, window: int = MISSION_DOWNLOAD_WINDOW) -> None:
+    """Download the vehicle's mission, saving it as QGC WPL if a path is given."""
+    mav = connect()
+    items = download_mission(mav, window=window)
+    if items is None:
+        return
+    if path:
+        save_wpl(path, items)
+        print(f"Saved to {path}")
+        return
+    scale = _xy_scale(items['frame'])
+    for seq, item in enumerate(items):
+        print(f"{seq:4d}: cmd {item['command']:5d} frame {item['frame']:2d} "
+              f"x {item['x'] / scale[seq]:.7f} y {item['y'] / scale[seq]:.7f} z {item['z']:.2f}")
@@ -0,0 +1,193 @@
+"""Redundant MAVLink connection over several links at once
+
+MultiLink is a pymavlink mavfile whose transport is a set of other connections
+(e.g. USB, TELEM2 and UDP to the same vehicle). Frames are read from every link
+and de-duplicated by (sysid, compid, seq), so each message is delivered once, by
+whichever link carried it first. Outgoing frames go to the live link with the
+lowest TIMESYNC round-trip time; a link that stops receiving is skipped at once,
+without reconnecting. A link whose transport raises an I/O error (e.g. an
+unplugged USB radio) or reports a failed write is dropped, and the others carry on.
+"""
+import select
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pymavlink import mavutil
+
+from src.mavlink.timesync import TimeSync, TIMESYNC_INTERVAL_SECONDS
+
+# A link with no frames for this long is considered down
+LINK_TIMEOUT_SECONDS = 2.0
+
+# Copies of the same (sysid, compid, seq) arriving within this window are duplicates.
+# Short enough that an 8-bit seq cannot wrap round within it at normal stream rates.
+DEDUP_WINDOW_SECONDS = 0.25
+
+# Smoothing of per-link RTT for link selection
+RTT_EWMA_ALPHA = 0.3
+
+
+@dataclass
+class LinkState:
+    """Receive statistics and latency of one link."""
+    address: str
+    connection: object
+    sync: TimeSync = field(default_factory=TimeSync)
+    frames: int = 0
+    first: int = 0  # Frames this link delivered before any other
+    last_rx: float = 0.0
+    rtt: Optional[float] = None
+    error: Optional[str] = None  # I/O error that took the link down
+
+    def alive(self, now: float) -> bool:
+        return self.error is None and now - self.last_rx < LINK_TIMEOUT_SECONDS
+
+
+class MultiLink(mavutil.mavfile):
+    """pymavlink connection multiplexing several links to the same vehicle."""
+
+    def __init__(self, addresses: list[str], source_system: int = 255, source_component: int = 0):
+        """
+        Args:
+            addresses: pymavlink connection strings (e.g. "/dev/ttyACM0,57600", "udpin:0.0.0.0:14540")
+        """
+        self.links = [LinkState(address, mavutil.mavlink_connection(
+            address, source_system=source_system, source_component=source_component
+        )) for address in addresses]
+        super().__init__(None, ",".join(addresses), source_system=source_system, source_component=source_component)
+        self._seen: dict[tuple[int, int, int], tuple[float, int]] = {}
+        self._next = 0  # Round-robin start for fair reads
+        self._last_timesync = 0.0
+        self._active: Optional[LinkState] = None
+
+    def recv_msg(self):
+        """Next frame from any link that no other link has delivered yet."""
+        self.pre_message()
+        now = time.time()
+        if now - self._last_timesync >= TIMESYNC_INTERVAL_SECONDS:
+            self._send_timesync(now)
+
+        for i in range(len(self.links)):
+            link = self.links[(self._next + i) % len(self.links)]
+            # Keep draining this link past duplicates: its parser may still hold new frames
+            while (msg := self._read(link)) is not None:
+                self._next = (self._next + i + 1) % len(self.links)
+                if not self._duplicate(msg, link):
+                    self.post_message(msg)
+                    return msg
+        return None
+
+    def _drop(self, link: LinkState, error: str) -> None:
+        """Take a failed link out of reading, writing and polling."""
+        if link.error is None:
+            print(f"Link {link.address} lost: {error}")
+        link.error = error
+        link.last_rx = 0.0
+
+    def _read(self, link: LinkState):
+        """Read and parse pending bytes of one link (pymavlink's mavfile.recv_msg without posting)."""
+        if link.error is not None:
+            return None
+        conn = link.connection
+        while True:
+            try:
+                data = conn.recv(conn.mav.bytes_needed())
+            except OSError as e:  # Includes serial.SerialException
+                self._drop(link, str(e) or type(e).__name__)
+                return None
+            if data:
+                if conn.first_byte:
+                    conn.auto_mavlink_version(data)
+                if self.first_byte:
+                    self.auto_mavlink_version(data)
+            msg = conn.mav.parse_char(data)
+            if msg is not None:
+                break
+            if not data:
+                return None
+        if msg.get_type() == 'BAD_DATA':
+            return None
+
+        link.frames += 1
+        link.last_rx = time.time()
+        if msg.get_type() == 'TIMESYNC' and msg.tc1 != 0:
+            link.sync.ingest(msg.tc1, msg.ts1, time.time_ns())
+            if link.sync.last_rtt is not None:
+                rtt = link.sync.last_rtt
+                link.rtt = rtt if link.rtt is None else link.rtt + RTT_EWMA_ALPHA * (rtt - link.rtt)
+        return msg
+
+    def _duplicate(self, msg, link: LinkState) -> bool:
+        """Record a frame; True if another link already delivered it."""
+        if msg.get_msgId() < 0:
+            return False
+        key = (msg.get_srcSystem(), msg.get_srcComponent(), msg.get_seq())
+        now = link.last_rx
+        seen = self._seen.get(key)
+        if seen is not None and seen[1] == msg.get_msgId() and now - seen[0] < DEDUP_WINDOW_SECONDS:
+            return True
+        self._seen[key] = (now, msg.get_msgId())
+        link.first += 1
+        return False
+
+    def _send_timesync(self, now: float) -> None:
+        """Probe every link's round-trip time (replies are matched per link)."""
+        self._last_timesync = now
+        for link in self.links:
+            if link.error is None:
+                link.connection.mav.timesync_send(0, time.time_ns())
+                if getattr(link.connection, 'portdead', False):
+                    self._drop(link, "write failed")
+
+    def best_link(self) -> Optional[LinkState]:
+        """Live link with the lowest smoothed RTT (links without a measurement rank last)."""
+        now = time.time()
+        usable = [link for link in self.links if link.error is None]
+        alive = [link for link in usable if link.alive(now)] or usable
+        if not alive:
+            return None
+        return min(alive, key=lambda link: link.rtt if link.rtt is not None else float("inf"))
+
+    def write(self, buf):
+        """Send on the best link, falling back to the others if it fails."""
+        best = self.best_link()
+        if best is None:
+            return None
+        if best is not self._active:
+            if self._active is not None:
+                print(f"Link switch: {self._active.address} → {best.address}")
+            self._active = best
+        for link in [best] + [link for link in self.links if link is not best and link.error is None]:
+            # pymavlink transports swallow write errors: serial returns -1 and sets portdead
+            result = link.connection.write(buf)
+            if result == -1 or getattr(link.connection, 'portdead', False):
+                self._drop(link, "write failed")
+                continue
+            return result
+        return None
+
+    def select(self, timeout: float) -> bool:
+        """Wait until any link has data."""
+        usable = [link for link in self.links if link.error is None]
+        if not usable:
+            time.sleep(timeout)
+            return False
+        fds = [link.connection.fd for link in usable if link.connection.fd is not None]
+        if len(fds) < len(usable):
+            time.sleep(min(timeout, 0.01))  # Some transports cannot be polled
+            return True
+        try:
+            ready, _, _ = select.select(fds, [], [], timeout)
+        except (OSError, ValueError):
+            return False
+        return bool(ready)
+
+    def close(self) -> None:
+        for link in self.links:
+            link.connection.close()
+
+    def link_status(self) -> list[tuple[str, bool, int, int, Optional[float]]]:
+        """(address, alive, frames, frames delivered first, smoothed RTT) per link."""
+        now = time.time()
+        return [(link.address, link.alive(now), link.frames, link.first, link.rtt) for link in self.links]
@@ -0,0 +1,241 @@
+"""Asyncio publish/subscribe over one pymavlink connection
+
+One reader thread drains the link and hands batches of messages to the event
+loop. Each message object is appended to the queue of every subscriber to its
+type, as a reference and not a copy, so subscribers must treat messages as
+read-only. Queues are bounded. When a consumer falls behind, its own queue
+overflows according to its policy and its drop counter goes up. The reader and
+the other subscribers carry on at full rate. If reading fails (e.g. the serial
+device is unplugged), every subscription is closed with that error: consumers
+receive what was already queued, then the error is raised from `async for`.
+
+    async with AsyncLink(connection.connect()) as link:
+        async for msg in link.subscribe('ATTITUDE', maxsize=16, policy='drop_oldest'):
+            ...
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Iterable, Optional, Union
+
+from src.mavlink import connection
+
+SUBSCRIBER_QUEUE_SIZE = 64
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+READER_BATCH = 256        # Messages handed to the event loop per wakeup at most
+READER_POLL_SECONDS = 0.1
+
+
+class Subscription:
+    """Bounded message queue of one subscriber; iterate with `async for`."""
+
+    def __init__(self, link: "AsyncLink", types: Optional[frozenset], maxsize: int, policy: str):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy} (expected one of {', '.join(OVERFLOW_POLICIES)})")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.types = types
+        self.maxsize = maxsize
+        self.policy = policy
+        self.received = 0
+        self.dropped = 0
+        self._link = link
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _push(self, msg) -> None:
+        """Enqueue from the event loop thread (called by AsyncLink._dispatch)."""
+        self.received += 1
+        if len(self._queue) >= self.maxsize:
+            self.dropped += 1
+            if self.policy == "drop_newest":
+                return
+            self._queue.popleft()
+        self._queue.append(msg)
+        self._ready.set()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self):
+        while not self._queue:
+            if self._closed:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        """Unsubscribe; iteration ends (or raises error) once the queued messages are consumed."""
+        if not self._closed:
+            self._closed = True
+            self._error = error
+            self._link._unsubscribe(self)
+            self._ready.set()
+
+
+class AsyncLink:
+    """Feeds any number of subscriptions from one MAVLink connection."""
+
+    def __init__(self, mav):
+        self.mav = mav
+        self.batches = 0
+        self.messages = 0
+        self.error: Optional[BaseException] = None  # Exception that stopped the reader
+        self._by_type: dict[str, list[Subscription]] = {}
+        self._all: list[Subscription] = []  # Subscribed to every message type
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    async def __aenter__(self) -> "AsyncLink":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """Start the reader thread (must be called from a running event loop)."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._running = True
+        self._thread = threading.Thread(target=self._read, name="mavlink-pubsub", daemon=True)
+        self._thread.start()
+
+    async def close(self) -> None:
+        """Stop the reader and end every subscription."""
+        self._running = False
+        if self._thread is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._thread.join)
+            self._thread = None
+        for sub in self._all + [s for subs in self._by_type.values() for s in subs]:
+            sub.close()
+
+    def subscribe(self, types: Union[str, Iterable[str], None] = None, maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+                  policy: str = "drop_oldest") -> Subscription:
+        """Subscribe to message types (None: all types except BAD_DATA).
+
+        Args:
+            types: Message type name or names
+            maxsize: Queue bound of this subscriber
+            policy: On overflow, "drop_oldest" discards the oldest queued message,
+                "drop_newest" discards the incoming one
+        """
+        if isinstance(types, str):
+            types = (types,)
+        sub = Subscription(self, frozenset(types) if types is not None else None, maxsize, policy)
+        if self.error is not None:
+            sub.close(self.error)
+            return sub
+        if sub.types is None:
+            self._all.append(sub)
+        else:
+            for msg_type in sub.types:
+                self._by_type.setdefault(msg_type, []).append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        if sub.types is None:
+            if sub in self._all:
+                self._all.remove(sub)
+            return
+        for msg_type in sub.types:
+            subs = self._by_type.get(msg_type, [])
+            if sub in subs:
+                subs.remove(sub)
+
+    def _read(self) -> None:
+        """Reader thread: block for one message, then take whatever else is already buffered."""
+        mav = self.mav
+        while self._running:
+            batch = []
+            error = None
+            try:
+                msg = mav.recv_match(blocking=True, timeout=READER_POLL_SECONDS)
+                if msg is None:
+                    continue
+                batch.append(msg)
+                while len(batch) < READER_BATCH:
+                    msg = mav.recv_match(blocking=False)
+                    if msg is None:
+                        break
+                    batch.append(msg)
+            except Exception as e:  # e.g. SerialException when the device is unplugged
+                error = e
+            try:
+                if batch:
+                    self._loop.call_soon_threadsafe(self._dispatch, batch)
+                if error is not None:
+                    self._loop.call_soon_threadsafe(self._fail, error)
+            except RuntimeError:
+                break  # Event loop closed
+            if error is not None:
+                break
+
+    def _fail(self, error: BaseException) -> None:
+        """Reader died: close every subscription with its error (event loop thread)."""
+        self.error = error
+        self._running = False
+        for sub in self._all + [s for subs in self._by_type.values() for s in subs]:
+            sub.close(error)
+
+    def _dispatch(self, batch: list) -> None:
+        """Fan a batch out to the subscriber queues (event loop thread)."""
+        self.batches += 1
+        self.messages += len(batch)
+        by_type = self._by_type
+        everyone = self._all
+        for msg in batch:
+            msg_type = msg.get_type()
+            for sub in by_type.get(msg_type, ()):
+                sub._push(msg)
+            if everyone and msg_type != 'BAD_DATA':
+                for sub in everyone:
+                    sub._push(msg)
+
+
+async def _consume(sub: Subscription, delay: float) -> None:
+    async for _ in sub:
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def subscribe_monitor(types: list[str], duration: float = 10.0, maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+                            policy: str = "drop_oldest", consumer_delay: float = 0.0) -> None:
+    """Run one subscriber per message type and report per-subscriber delivery.
+
+    Args:
+        types: Message types, one subscription each
+        duration: Seconds to run
+        maxsize: Queue bound of each subscriber
+        policy: Overflow policy of each subscriber
+        consumer_delay: Seconds each consumer sleeps per message (simulates a slow consumer)
+    """
+    mav = connection.connect()
+    start_time = time.time()
+    async with AsyncLink(mav) as link:
+        subs = [link.subscribe(msg_type, maxsize, policy) for msg_type in types]
+        tasks = [asyncio.create_task(_consume(sub, consumer_delay)) for sub in subs]
+        await asyncio.sleep(duration)
+        for sub in subs:
+            sub.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.time() - start_time
+    if link.error is not None:
+        print(f"✗ Link failed: {link.error}")
+
+    print(f"\n{'Type':28} | {'Received':>8} | {'Rate':>7} | {'Dropped':>7}")
+    print("-" * 60)
+    for msg_type, sub in zip(types, subs):
+        print(f"{msg_type:28} | {sub.received:8d} | {sub.received / elapsed:5.1f}Hz | {sub.dropped:7d}")
+    print(f"\n{link.messages} messages read in {link.batches} batches")
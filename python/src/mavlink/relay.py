@@ -0,0 +1,211 @@
+"""Bandwidth-aware MAVLink relay to remote ground stations over UDP
+
+Frames from the vehicle connection are forwarded unchanged (same sysid/seq/CRC)
+to each client, filtered per client:
+- include / exclude: message types to forward
+- rates: maximum rate per message type ("*" for all others). Rate-limited types
+  are coalesced: the first frame in an interval goes out immediately, later ones
+  overwrite a pending slot, and the latest value is sent when the interval ends.
+  Slots are per source (sysid, compid) and, for multi-instance messages, per
+  instance, so e.g. every component's HEARTBEAT and every battery get through.
+
+Datagrams from clients (e.g. QGroundControl commands) are written to the vehicle.
+
+Client config (JSON):
+    {"clients": [
+        {"address": "192.168.1.20:14550", "rates": {"*": 10, "HEARTBEAT": 1}},
+        {"address": "10.0.0.5:14551", "include": ["HEARTBEAT", "GLOBAL_POSITION_INT"]}
+    ]}
+"""
+import json
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.mavlink.connection import connect
+from src.common import output
+from src.common.stats import LogHistogram
+
+RELAY_UPLINK_MAX = 4096  # Max client datagram size read per poll
+
+# Field identifying the instance of messages one component sends for several things
+INSTANCE_FIELDS = {
+    'BATTERY_STATUS': 'id',
+    'DISTANCE_SENSOR': 'id',
+    'ESC_INFO': 'index',
+    'ESC_STATUS': 'index',
+    'SERVO_OUTPUT_RAW': 'port',
+    'NAMED_VALUE_FLOAT': 'name',
+    'NAMED_VALUE_INT': 'name',
+    'ADSB_VEHICLE': 'ICAO_address',
+    'PARAM_VALUE': 'param_index',
+    'MISSION_ITEM_INT': 'seq',
+}
+
+
+@dataclass
+class RelayClient:
+    """One UDP destination with its filter, rate limits and statistics."""
+    address: tuple[str, int]
+    include: Optional[frozenset] = None
+    exclude: frozenset = frozenset()
+    intervals: dict[str, float] = field(default_factory=dict)  # Message type ("*" = default) -> seconds
+    sock: socket.socket = None
+    sent: int = 0
+    filtered: int = 0
+    coalesced: int = 0
+    bytes_sent: int = 0
+    latency: LogHistogram = field(default_factory=lambda: LogHistogram(minimum=1e-6, maximum=10.0))
+    _last_sent: dict[tuple, float] = field(default_factory=dict)  # Slot key -> last send time
+    _pending: dict[tuple, object] = field(default_factory=dict)
+
+    def interval(self, msg_type: str) -> float:
+        return self.intervals.get(msg_type, self.intervals.get("*", 0.0))
+
+    def offer(self, msg, now: float) -> None:
+        """Forward, coalesce or drop one received frame."""
+        msg_type = msg.get_type()
+        if msg_type in self.exclude or (self.include is not None and msg_type not in self.include):
+            self.filtered += 1
+            return
+        interval = self.interval(msg_type)
+        if not interval:
+            self._send(msg, None, now, immediate=True)
+            return
+        key = _slot_key(msg, msg_type)
+        if now - self._last_sent.get(key, 0.0) < interval:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = msg
+            return
+        self._send(msg, key, now, immediate=True)
+
+    def flush(self, now: float) -> Optional[float]:
+        """Send pending frames whose interval has ended.
+
+        Returns:
+            Time of the next pending deadline, None if nothing is pending
+        """
+        next_due = None
+        for key, msg in list(self._pending.items()):
+            due = self._last_sent[key] + self.interval(key[2])
+            if now >= due:
+                del self._pending[key]
+                self._send(msg, key, now, immediate=False)
+            elif next_due is None or due < next_due:
+                next_due = due
+        return next_due
+
+    def _send(self, msg, key: Optional[tuple], now: float, immediate: bool) -> None:
+        """Send a frame; latency is recorded for frames not deliberately held back.
+
+        Args:
+            key: Rate-limit slot of the frame (None for types without a rate limit)
+        """
+        buf = msg.get_msgbuf()
+        try:
+            self.sock.sendto(buf, self.address)
+        except OSError:
+            return  # Client unreachable; keep relaying to the others
+        if immediate:
+            self.latency.add(max(time.time() - msg._timestamp, 0.0))
+        if key is not None:
+            self._last_sent[key] = now
+        self.sent += 1
+        self.bytes_sent += len(buf)
+
+
+def _slot_key(msg, msg_type: str) -> tuple:
+    """Coalescing slot: (sysid, compid, type, instance or None)."""
+    instance_field = INSTANCE_FIELDS.get(msg_type)
+    instance = getattr(msg, instance_field, None) if instance_field else None
+    return msg.get_srcSystem(), msg.get_srcComponent(), msg_type, instance
+
+
+def load_clients(path: str) -> list[RelayClient]:
+    """Read the relay client config file."""
+    with open(path) as f:
+        config = json.load(f)
+    return [_make_client(entry) for entry in config["clients"]]
+
+
+def parse_client(spec: str) -> RelayClient:
+    """Client from a command-line spec "host:port" (forwards everything)."""
+    return _make_client({"address": spec})
+
+
+def _make_client(entry: dict) -> RelayClient:
+    host, port = entry["address"].rsplit(":", 1)
+    client = RelayClient(
+        address=(host, int(port)),
+        include=frozenset(entry["include"]) if "include" in entry else None,
+        exclude=frozenset(entry.get("exclude", ())),
+        intervals={msg_type: 1.0 / rate for msg_type, rate in entry.get("rates", {}).items() if rate > 0},
+    )
+    client.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.sock.setblocking(False)
+    return client
+
+
+def _forward_uplink(mav, clients: list[RelayClient]) -> None:
+    """Write datagrams received from clients to the vehicle."""
+    for client in clients:
+        while True:
+            try:
+                data = client.sock.recv(RELAY_UPLINK_MAX)
+            except (BlockingIOError, OSError):
+                break
+            mav.write(data)
+
+
+def _print_stats(clients: list[RelayClient], elapsed: float) -> None:
+    print(f"\n{'Client':24} | {'Sent/s':>7} | {'KiB/s':>6} | {'Coalesced':>9} | {'Filtered':>8} | "
+          f"{'Added latency p50/p99':>22}")
+    print("-" * 92)
+    for c in clients:
+        lat = c.latency
+        latency = f"{lat.percentile(50) * 1e3:.3f}/{lat.percentile(99) * 1e3:.3f} ms" if lat.count else "-"
+        print(f"{c.address[0] + ':' + str(c.address[1]):24} | {c.sent / elapsed:7.1f} | "
+              f"{c.bytes_sent / elapsed / 1024:6.1f} | {c.coalesced:9d} | {c.filtered:8d} | {latency:>22}")
+
+
+def run_relay(clients: list[RelayClient], duration: float = None, display_rate: float = 0.2) -> None:
+    """Relay vehicle frames to clients until `duration` elapses (forever if None).
+
+    Args:
+        clients: Destinations with their filters
+        duration: Seconds to run, None to run until interrupted
+        display_rate: Statistics report rate in Hz
+    """
+    if not clients:
+        raise ValueError("No relay clients configured")
+    mav = connect()
+    print(f"Relaying to {len(clients)} client(s): "
+          + ", ".join(f"{host}:{port}" for host, port in (c.address for c in clients)))
+
+    throttle = output.DisplayThrottle(display_rate)
+    start_time = time.time()
+    next_due = None
+    try:
+        while duration is None or time.time() - start_time < duration:
+            # Wake up for the next coalesced frame if one is due before new data arrives
+            timeout = 0.05 if next_due is None else min(max(next_due - time.time(), 0.001), 0.05)
+            msg = mav.recv_match(blocking=True, timeout=timeout)
+            now = time.time()
+            if msg is not None and msg.get_type() != 'BAD_DATA':
+                for client in clients:
+                    client.offer(msg, now)
+
+            next_due = None
+            for client in clients:
+                due = client.flush(now)
+                if due is not None and (next_due is None or due < next_due):
+                    next_due = due
+
+            _forward_uplink(mav, clients)
+            if throttle.ready():
+                _print_stats(clients, now - start_time)
+    except KeyboardInterrupt:
+        pass
+    _print_stats(clients, time.time() - start_time)
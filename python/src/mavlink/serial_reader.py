@@ -0,0 +1,136 @@
+"""Dedicated reader thread for pymavlink serial connections
+
+By default pymavlink reads the UART inside recv_match(), a few bytes per frame,
+and only while the caller is waiting for a message. While the caller prints or
+computes, the kernel buffer fills and frames are lost at high baud rates.
+
+SerialReader drains the port on its own thread with reads sized from in_waiting,
+parses frames with its own MAVLink parser and hands them over through a bounded
+queue. The connection's recv_msg()/select() are redirected to that queue, so
+recv_match(), wait_heartbeat() and message hooks keep working unchanged.
+"""
+import threading
+import time
+from collections import deque
+
+from pymavlink import mavutil
+
+# Frames buffered for the consumer; the oldest are dropped (and counted) beyond this
+READER_QUEUE_SIZE = 4096
+
+# Upper bound for one read; the port is drained in chunks of whatever is waiting
+READER_MAX_READ = 65536
+
+# Blocking read timeout, bounds how long stop() waits for the thread
+READER_POLL_SECONDS = 0.1
+
+
+class SerialReader:
+    """Reader thread feeding a bounded frame queue for one mavserial connection."""
+
+    def __init__(self, mav, queue_size: int = READER_QUEUE_SIZE):
+        """
+        Args:
+            mav: Connected pymavlink serial connection (mavutil.mavserial)
+            queue_size: Maximum number of frames waiting for the consumer
+        """
+        self.mav = mav
+        self.overflows = 0
+        self.bytes_read = 0
+        self.reads = 0
+        self.frames = 0
+        self.max_depth = 0
+        self._queue: deque[tuple[float, object]] = deque()
+        self._queue_size = queue_size
+        self._ready = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        # Separate parser: the connection's own MAVLink object keeps sending on the caller's thread
+        self._parser = type(mav.mav)(None, srcSystem=mav.mav.srcSystem, srcComponent=mav.mav.srcComponent)
+        self._parser.robust_parsing = mav.mav.robust_parsing
+        self._parser.signing = mav.mav.signing
+
+    def start(self) -> "SerialReader":
+        """Start the thread and redirect the connection's receive path to the queue."""
+        self._running = True
+        self.mav.recv_msg = self.recv_msg
+        self.mav.select = self.wait
+        self._thread = threading.Thread(target=self._run, name="mavlink-serial-reader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread and restore pymavlink's own receive path."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        del self.mav.recv_msg, self.mav.select
+
+    def _run(self) -> None:
+        port = self.mav.port
+        port.timeout = READER_POLL_SECONDS
+        while self._running:
+            try:
+                # Block for the first byte, then take everything already buffered
+                data = port.read(1)
+                if not data:
+                    continue
+                waiting = port.in_waiting
+                if waiting:
+                    data += port.read(min(waiting, READER_MAX_READ))
+            except (OSError, TypeError, ValueError):
+                # Port closed or device gone; recv_match() then times out as usual
+                break
+            received = time.time()
+            self.reads += 1
+            self.bytes_read += len(data)
+            if self.mav.logfile_raw:
+                self.mav.logfile_raw.write(data)
+            frames = self._parser.parse_buffer(data)
+            if frames:
+                self._enqueue(received, frames)
+
+    def _enqueue(self, received: float, frames: list) -> None:
+        with self._ready:
+            for msg in frames:
+                if len(self._queue) >= self._queue_size:
+                    self._queue.popleft()
+                    self.overflows += 1
+                self._queue.append((received, msg))
+            self.frames += len(frames)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._ready.notify()
+
+    def recv_msg(self):
+        """Replacement for mavfile.recv_msg(): next queued frame, or None."""
+        self.mav.pre_message()
+        try:
+            received, msg = self._queue.popleft()
+        except IndexError:
+            return None
+        # post_message() takes the timestamp from _timestamp when set; use the read time
+        self.mav._timestamp = received
+        try:
+            self.mav.post_message(msg)
+        finally:
+            self.mav._timestamp = None
+        return msg
+
+    def wait(self, timeout: float) -> bool:
+        """Replacement for mavfile.select(): wait until a frame is queued."""
+        with self._ready:
+            return self._ready.wait_for(lambda: self._queue, timeout)
+
+    @property
+    def depth(self) -> int:
+        """Frames currently waiting for the consumer."""
+        return len(self._queue)
+
+
+def start_reader(mav) -> SerialReader:
+    """Start a reader thread on a serial connection (returns None for other link types)."""
+    if not isinstance(mav, mavutil.mavserial):
+        return None
+    return SerialReader(mav).start()
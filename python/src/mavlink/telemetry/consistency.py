@@ -0,0 +1,343 @@
+"""GPS versus local position consistency via MAVLink
+
+GPS fixes (GPS_RAW_INT, or GLOBAL_POSITION_INT) are converted in batches to
+local NED around the EKF origin (GPS_GLOBAL_ORIGIN, else HOME_POSITION, else the
+first 3D fix). Each fix is compared with LOCAL_POSITION_NED linearly
+interpolated to the fix time. When the reference point is not the EKF origin,
+its local position is added to the converted fixes: HOME_POSITION's x/y/z, or
+the local position interpolated at the first fix. Geodesy (WGS84 → ECEF → NED), time alignment and
+window statistics are vectorized over whole arrays, so the same code serves a
+live link (small batches) and recorded tlogs (millions of samples at once).
+
+Windows are `window` seconds long and start every `step` seconds; per window the
+horizontal and vertical divergence mean, RMS and maximum are reported.
+"""
+import time
+from operator import attrgetter
+from typing import Optional
+
+import numpy as np
+
+from src.mavlink.connection import connect
+from src.mavlink.timesync import EPOCH_THRESHOLD_USEC
+from src.mavlink.tlog import TLog
+from src.common import output
+
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+
+GPS_FIX_3D = 3
+CONSISTENCY_WINDOW_SECONDS = 10.0
+CONSISTENCY_STEP_SECONDS = 2.0
+MAX_ALIGN_GAP_SECONDS = 0.5       # Local samples further apart than this are not interpolated across
+HORIZONTAL_WARN_METERS = 3.0
+VERTICAL_WARN_METERS = 5.0
+WORST_WINDOWS = 10                # Windows listed in the offline report
+
+ORIGIN_TYPES = ['GPS_GLOBAL_ORIGIN', 'HOME_POSITION']
+GPS_SOURCES = ('GPS_RAW_INT', 'GLOBAL_POSITION_INT')
+SOURCE_FIELDS = {
+    'GPS_RAW_INT': ('time_usec', 'fix_type', 'lat', 'lon', 'alt'),
+    'GLOBAL_POSITION_INT': ('time_boot_ms', 'lat', 'lon', 'alt'),
+}
+
+WINDOW_DTYPE = np.dtype([
+    ('start', 'f8'), ('count', 'i8'),
+    ('h_mean', 'f8'), ('h_rms', 'f8'), ('h_max', 'f8'),
+    ('v_mean', 'f8'), ('v_rms', 'f8'), ('v_max', 'f8'),
+])
+
+
+def geodetic_to_ned(lat_deg: np.ndarray, lon_deg: np.ndarray, alt_m: np.ndarray,
+                    origin: tuple[float, float, float]) -> np.ndarray:
+    """WGS84 positions to north/east/down meters around origin (lat°, lon°, alt m); shape (N, 3)."""
+    def ecef(lat, lon, alt):
+        sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+        n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat * sin_lat)
+        return ((n + alt) * cos_lat * np.cos(lon), (n + alt) * cos_lat * np.sin(lon),
+                (n * (1.0 - WGS84_E2) + alt) * sin_lat)
+
+    lat0, lon0 = np.radians(origin[0]), np.radians(origin[1])
+    x0, y0, z0 = ecef(lat0, lon0, origin[2])
+    x, y, z = ecef(np.radians(lat_deg), np.radians(lon_deg), np.asarray(alt_m, dtype=np.float64))
+    dx, dy, dz = x - x0, y - y0, z - z0
+
+    sin_lat, cos_lat = np.sin(lat0), np.cos(lat0)
+    sin_lon, cos_lon = np.sin(lon0), np.cos(lon0)
+    north = -sin_lat * cos_lon * dx - sin_lat * sin_lon * dy + cos_lat * dz
+    east = -sin_lon * dx + cos_lon * dy
+    down = -(cos_lat * cos_lon * dx + cos_lat * sin_lon * dy + sin_lat * dz)
+    return np.column_stack((north, east, down))
+
+
+def align(t: np.ndarray, ref_t: np.ndarray, ref_values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Interpolate reference samples (ref_t sorted, values (M, k)) at times t.
+
+    Returns:
+        Tuple of (values at t (N, k), mask of t bracketed by samples at most MAX_ALIGN_GAP_SECONDS apart)
+    """
+    idx = np.searchsorted(ref_t, t)
+    valid = (idx > 0) & (idx < len(ref_t))
+    clipped = np.clip(idx, 1, max(len(ref_t) - 1, 1))
+    valid &= (ref_t[clipped] - ref_t[clipped - 1]) <= MAX_ALIGN_GAP_SECONDS
+    values = np.column_stack([np.interp(t, ref_t, ref_values[:, k]) for k in range(ref_values.shape[1])])
+    return values, valid
+
+
+def divergence(t: np.ndarray, lat: np.ndarray, lon: np.ndarray, alt: np.ndarray, origin: tuple,
+               local_t: np.ndarray, local_ned: np.ndarray, origin_local=(0.0, 0.0, 0.0)
+               ) -> tuple[np.ndarray, np.ndarray]:
+    """GPS minus local position at each aligned fix.
+
+    Args:
+        origin_local: Local NED position of the origin point (zero when it is the EKF origin)
+
+    Returns:
+        Tuple of (fix times, NED differences (N, 3) in meters)
+    """
+    gps_ned = geodetic_to_ned(lat, lon, alt, origin) + np.asarray(origin_local, dtype=np.float64)
+    local_at_fix, valid = align(t, local_t, local_ned)
+    return t[valid], gps_ned[valid] - local_at_fix[valid]
+
+
+def window_stats(t: np.ndarray, error: np.ndarray, window: float = CONSISTENCY_WINDOW_SECONDS,
+                 step: float = CONSISTENCY_STEP_SECONDS) -> np.ndarray:
+    """Divergence statistics over sliding windows (t sorted); returns WINDOW_DTYPE rows."""
+    if not len(t):
+        return np.zeros(0, dtype=WINDOW_DTYPE)
+    horizontal = np.hypot(error[:, 0], error[:, 1])
+    vertical = np.abs(error[:, 2])
+
+    # Per-step buckets, then each window combines `span` consecutive buckets
+    span = max(int(round(window / step)), 1)
+    bucket = ((t - t[0]) // step).astype(np.int64)
+    buckets = int(bucket[-1]) + 1
+
+    def window_sum(values: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate(([0.0], np.cumsum(np.bincount(bucket, weights=values, minlength=buckets))))
+        return cumulative[span:] - cumulative[:-span] if buckets >= span else cumulative[-1:] - cumulative[:1]
+
+    def window_max(values: np.ndarray) -> np.ndarray:
+        per_bucket = np.zeros(buckets)
+        np.maximum.at(per_bucket, bucket, values)
+        if buckets < span:
+            return per_bucket.max(keepdims=True)
+        return np.lib.stride_tricks.sliding_window_view(per_bucket, span).max(axis=1)
+
+    counts = window_sum(np.ones(len(t)))
+    rows = np.zeros(len(counts), dtype=WINDOW_DTYPE)
+    rows['start'] = t[0] + np.arange(len(counts)) * step
+    rows['count'] = counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rows['h_mean'] = window_sum(horizontal) / counts
+        rows['h_rms'] = np.sqrt(window_sum(horizontal * horizontal) / counts)
+        rows['v_mean'] = window_sum(vertical) / counts
+        rows['v_rms'] = np.sqrt(window_sum(vertical * vertical) / counts)
+    rows['h_max'] = window_max(horizontal)
+    rows['v_max'] = window_max(vertical)
+    return rows[rows['count'] > 0]
+
+
+def _fixes(records: np.ndarray, receive_t: np.ndarray, source: str):
+    """(times, lat°, lon°, alt m) of usable fixes from GPS_RAW_INT or GLOBAL_POSITION_INT records."""
+    if source == 'GPS_RAW_INT':
+        usable = records['fix_type'] >= GPS_FIX_3D
+        vehicle_t = records['time_usec'] * 1e-6
+        # Some autopilots stamp GPS_RAW_INT with UTC; fall back to receive time then
+        epoch = len(records) and records['time_usec'].max() > EPOCH_THRESHOLD_USEC
+    else:
+        usable = (records['lat'] != 0) | (records['lon'] != 0)
+        vehicle_t = records['time_boot_ms'] * 1e-3
+        epoch = False
+    t = receive_t if epoch else vehicle_t
+    return (t[usable], records['lat'][usable] * 1e-7, records['lon'][usable] * 1e-7,
+            records['alt'][usable] * 1e-3, bool(epoch))
+
+
+class ConsistencyChecker:
+    """Live GPS/local consistency: stage messages, convert and compare in batches."""
+
+    def __init__(self, source: str = 'GPS_RAW_INT', window: float = CONSISTENCY_WINDOW_SECONDS):
+        if source not in GPS_SOURCES:
+            raise ValueError(f"Unknown GPS source: {source} (expected one of {', '.join(GPS_SOURCES)})")
+        self.source = source
+        self.window = window
+        self.origin: Optional[tuple] = None
+        self.origin_local = np.zeros(3)      # Local NED position of the origin point
+        self.origin_source: Optional[str] = None
+        self.utc_stamped = False
+        self.compared = 0
+        self._fix_dtype = np.dtype([(name, 'f8') for name in SOURCE_FIELDS[source]])
+        self._fetch = attrgetter(*SOURCE_FIELDS[source])
+        self._staged_gps: list = []
+        self._staged_gps_receive: list = []
+        self._staged_local: list = []
+        self._pending = np.zeros((0, 4))     # t, lat, lon, alt of fixes waiting for later local samples
+        self._local = np.zeros((0, 5))       # boot t, receive t, x, y, z
+        self._errors = np.zeros((0, 4))      # t, dn, de, dd
+
+    @property
+    def message_types(self) -> list[str]:
+        return [self.source, 'LOCAL_POSITION_NED'] + ORIGIN_TYPES
+
+    def ingest(self, msg) -> None:
+        msg_type = msg.get_type()
+        if msg_type == self.source:
+            self._staged_gps.append(self._fetch(msg))
+            self._staged_gps_receive.append(msg._timestamp)
+        elif msg_type == 'LOCAL_POSITION_NED':
+            self._staged_local.append((msg.time_boot_ms * 1e-3, msg._timestamp, msg.x, msg.y, msg.z))
+        elif msg_type in ORIGIN_TYPES and self.origin_source != 'GPS_GLOBAL_ORIGIN':
+            self.origin = (msg.latitude * 1e-7, msg.longitude * 1e-7, msg.altitude * 1e-3)
+            # HOME_POSITION is not the NED zero: x/y/z is home's local position
+            self.origin_local = np.array([msg.x, msg.y, msg.z]) if msg_type == 'HOME_POSITION' else np.zeros(3)
+            self.origin_source = msg_type
+
+    def update(self) -> None:
+        """Convert staged fixes and compare those that local samples now bracket."""
+        if self._staged_local:
+            self._local = np.concatenate([self._local, np.array(self._staged_local)])
+            self._staged_local.clear()
+        if self._staged_gps:
+            records = np.array(self._staged_gps, dtype=self._fix_dtype)
+            t, lat, lon, alt, utc = _fixes(records, np.array(self._staged_gps_receive), self.source)
+            self.utc_stamped |= utc
+            self._staged_gps.clear()
+            self._staged_gps_receive.clear()
+            self._pending = np.concatenate([self._pending, np.column_stack((t, lat, lon, alt))])
+        if not len(self._pending) or len(self._local) < 2:
+            return
+        local_t = self._local[:, 1 if self.utc_stamped else 0]
+        if self.origin is None:
+            # The first fix bracketed by local samples, at the local position of that moment
+            local_at_fix, valid = align(self._pending[:, 0], local_t, self._local[:, 2:])
+            if not valid.any():
+                return
+            first = np.flatnonzero(valid)[0]
+            self.origin = tuple(self._pending[first, 1:])
+            self.origin_local = local_at_fix[first]
+            self.origin_source = f"first {self.source} fix"
+
+        ready = self._pending[:, 0] <= local_t[-1]
+        fixes, self._pending = self._pending[ready], self._pending[~ready]
+        fix_t, error = divergence(fixes[:, 0], fixes[:, 1], fixes[:, 2], fixes[:, 3], self.origin,
+                                  local_t, self._local[:, 2:], self.origin_local)
+        self.compared += len(fix_t)
+        self._errors = np.concatenate([self._errors, np.column_stack((fix_t, error))])
+
+        # Keep one window of history
+        horizon = local_t[-1] - self.window - MAX_ALIGN_GAP_SECONDS
+        self._local = self._local[local_t >= horizon]
+        self._errors = self._errors[self._errors[:, 0] >= horizon]
+
+    def stats(self) -> Optional[np.void]:
+        """Statistics over the trailing window, None before the first comparison."""
+        if not len(self._errors):
+            return None
+        recent = self._errors[self._errors[:, 0] > self._errors[-1, 0] - self.window]
+        return window_stats(recent[:, 0], recent[:, 1:], self.window, self.window)[0]
+
+
+def _print_window(row, prefix: str = "") -> None:
+    h_flag = "⚠" if row['h_max'] > HORIZONTAL_WARN_METERS else "✓"
+    v_flag = "⚠" if row['v_max'] > VERTICAL_WARN_METERS else "✓"
+    print(f"{prefix}{h_flag} horizontal mean {row['h_mean']:6.2f} rms {row['h_rms']:6.2f} max {row['h_max']:6.2f} m | "
+          f"{v_flag} vertical mean {row['v_mean']:6.2f} rms {row['v_rms']:6.2f} max {row['v_max']:6.2f} m "
+          f"({row['count']} fixes)")
+
+
+def monitor_consistency(duration: float = 60.0, source: str = 'GPS_RAW_INT',
+                        window: float = CONSISTENCY_WINDOW_SECONDS, display_rate: float = 0.5) -> None:
+    """Compare GPS with local position on a live link.
+
+    Args:
+        duration: Seconds to monitor
+        source: GPS_RAW_INT (raw receiver) or GLOBAL_POSITION_INT (fused)
+        window: Statistics window in seconds
+        display_rate: Report rate in Hz
+    """
+    checker = ConsistencyChecker(source, window)
+    mav = connect()
+    print(f"\n-- {source} vs LOCAL_POSITION_NED ({window:g}s windows) --")
+    throttle = output.DisplayThrottle(display_rate)
+    start_time = time.time()
+    try:
+        while time.time() - start_time < duration:
+            msg = mav.recv_match(type=checker.message_types, blocking=True, timeout=1.0)
+            if msg is not None:
+                checker.ingest(msg)
+            if not throttle.ready():
+                continue
+            checker.update()
+            row = checker.stats()
+            if row is None:
+                print("Waiting for GPS fixes and local position...")
+            else:
+                _print_window(row)
+    except KeyboardInterrupt:
+        pass
+    print(f"\n{checker.compared} fixes compared (origin: {checker.origin_source or 'none'})")
+
+
+def check_tlog(path: str, source: str = 'GPS_RAW_INT', window: float = CONSISTENCY_WINDOW_SECONDS,
+               step: float = CONSISTENCY_STEP_SECONDS) -> None:
+    """Compare GPS with local position over a recorded tlog."""
+    if source not in GPS_SOURCES:
+        raise ValueError(f"Unknown GPS source: {source} (expected one of {', '.join(GPS_SOURCES)})")
+    start_time = time.time()
+    with TLog(path, [source, 'LOCAL_POSITION_NED'] + ORIGIN_TYPES) as log:
+        scanned = time.time()
+        gps_receive, gps = log.messages(source)
+        local_receive, local = log.messages('LOCAL_POSITION_NED')
+        origin_records = [(name, log.messages(name)[1]) for name in ORIGIN_TYPES]
+        frames = log.frames
+    decoded = time.time()
+
+    t, lat, lon, alt, utc_stamped = _fixes(gps, gps_receive, source)
+    print(f"{path}: {frames} frames, {len(gps)} {source}, {len(local)} LOCAL_POSITION_NED "
+          f"(scanned in {scanned - start_time:.2f}s, decoded in {decoded - scanned:.2f}s)")
+    if not len(t) or len(local) < 2:
+        print("✗ Not enough GPS fixes or local positions to compare")
+        return
+    if utc_stamped:
+        print(f"⚠ {source} is stamped with UTC; aligned on log receive times")
+
+    local_t = local_receive if utc_stamped else local['time_boot_ms'] * 1e-3
+    order = np.argsort(local_t, kind='stable')
+    local_t = local_t[order]
+    local_ned = np.column_stack((local['x'][order], local['y'][order], local['z'][order])).astype(np.float64)
+
+    origin_name, origin, origin_local = next(
+        ((name, (r['latitude'][0] * 1e-7, r['longitude'][0] * 1e-7, r['altitude'][0] * 1e-3),
+          (r['x'][0], r['y'][0], r['z'][0]) if name == 'HOME_POSITION' else (0.0, 0.0, 0.0))
+         for name, r in origin_records if len(r)), (None, None, None))
+    if origin is None:
+        # The first fix bracketed by local samples, at the local position of that moment
+        local_at_fix, valid = align(t, local_t, local_ned)
+        if not valid.any():
+            print("✗ No GPS fix overlaps the local positions")
+            return
+        first = np.flatnonzero(valid)[0]
+        origin_name, origin, origin_local = f"first {source} fix", (lat[first], lon[first], alt[first]), \
+            local_at_fix[first]
+
+    compare_start = time.time()
+    fix_t, error = divergence(t, lat, lon, alt, origin, local_t, local_ned, origin_local)
+    order = np.argsort(fix_t, kind='stable')
+    fix_t, error = fix_t[order], error[order]
+    rows = window_stats(fix_t, error, window, step)
+    compare_seconds = time.time() - compare_start
+
+    print(f"Origin: {origin_name} ({origin[0]:.7f}, {origin[1]:.7f}, {origin[2]:.1f} m)")
+    print(f"{len(fix_t)} fixes compared in {compare_seconds * 1000:.1f} ms "
+          f"({len(fix_t) / max(compare_seconds, 1e-9) / 1e6:.1f} M fixes/s)\n")
+    if not len(rows):
+        return
+    horizontal = np.hypot(error[:, 0], error[:, 1])
+    vertical = np.abs(error[:, 2])
+    print(f"Overall: horizontal p50 {np.percentile(horizontal, 50):.2f} p95 {np.percentile(horizontal, 95):.2f} "
+          f"max {horizontal.max():.2f} m | vertical p50 {np.percentile(vertical, 50):.2f} "
+          f"p95 {np.percentile(vertical, 95):.2f} max {vertical.max():.2f} m")
+    print(f"\nWorst {min(WORST_WINDOWS, len(rows))} of {len(rows)} windows ({window:g}s every {step:g}s):")
+    for row in rows[np.argsort(-rows['h_max'])[:WORST_WINDOWS]]:
+        _print_window(row, prefix=f"  t+{row['start'] - fix_t[0]:8.1f}s ")
@@ -0,0 +1,267 @@
+"""Terminal dashboard of heartbeat, EKF, RC and link state via MAVLink
+
+Every message is ingested at full rate into the existing analyzers
+(HeartbeatAnalyzer, EstimatorHealth, RcAnalyzer, LinkQualityMonitor), which are
+O(1) or batched per message. The screen is rebuilt at a fixed display rate only.
+Each frame is laid out as plain text rows and compared with the previous frame;
+only the runs of cells that changed are written to curses. Rendering therefore
+costs a bounded amount per frame, however fast telemetry arrives.
+"""
+import contextlib
+import curses
+import locale
+import math
+import time
+from collections import deque
+
+from src.mavlink.connection import connect
+from src.mavlink.telemetry.estimator import ESTIMATOR_MESSAGE_TYPES, LEVEL_NAMES, EstimatorHealth
+from src.mavlink.telemetry.heartbeat import HeartbeatAnalyzer, _status_name
+from src.mavlink.telemetry.link_quality import SERIAL_BITS_PER_BYTE, LinkQualityMonitor
+from src.mavlink.telemetry.rc_analysis import RC_CHANNEL_COUNT, RcAnalyzer
+from src.common import output
+from src.common.constants import DISPLAY_RATE_HZ
+
+DASHBOARD_READ_TIMEOUT = 0.05     # Longest wait for a message before checking the display deadline
+DASHBOARD_HEARTBEAT_ROWS = 4      # Components listed
+DASHBOARD_EVENT_ROWS = 6          # Most recent events listed
+RC_CHANNELS_PER_ROW = 6
+
+EKF_VIEW_TYPES = ['GLOBAL_POSITION_INT', 'LOCAL_POSITION_NED', 'ATTITUDE']
+LEVEL_SYMBOLS = {"ok": "✓", "warn": "⚠", "fail": "✗"}
+
+
+def _stamp(t: float) -> str:
+    return time.strftime('%H:%M:%S', time.localtime(t))
+
+
+class Dashboard:
+    """Analyzer state behind the dashboard; feed every message to ingest(), call lines() per frame."""
+
+    def __init__(self, capacity_bytes_per_s: float = None):
+        self.heartbeat = HeartbeatAnalyzer()
+        self.estimator = EstimatorHealth()
+        self.rc = RcAnalyzer()
+        self.link = LinkQualityMonitor(capacity_bytes_per_s)
+        self.events: deque[tuple[float, str, str]] = deque(maxlen=DASHBOARD_EVENT_ROWS)
+        self.messages = 0
+        self._latest: dict = {}
+        self._rc_events_seen = 0
+        self._estimator_types = frozenset(ESTIMATOR_MESSAGE_TYPES)
+        self._view_types = frozenset(EKF_VIEW_TYPES)
+
+    def ingest(self, msg) -> None:
+        """Route one message to the analyzers that use it."""
+        self.messages += 1
+        self.link.ingest(msg)
+        msg_type = msg.get_type()
+        if msg_type == 'HEARTBEAT':
+            for change in self.heartbeat.ingest(msg):
+                self.events.append((msg._timestamp, "⚠",
+                                    f"{msg.get_srcSystem()}/{msg.get_srcComponent()}: {change}"))
+        elif msg_type == 'RC_CHANNELS':
+            self.rc.ingest(msg)
+        elif msg_type in self._view_types:
+            self._latest[msg_type] = msg
+        elif msg_type in self._estimator_types:
+            for alert in self.estimator.ingest(msg):
+                self.events.append((alert.t, LEVEL_SYMBOLS[alert.level], alert.text))
+
+    def _collect_rc_events(self) -> None:
+        """RC failsafe events are detected per batch; pick up the ones not shown yet."""
+        events = self.rc.failsafe_events
+        for event_time, description in events[self._rc_events_seen:]:
+            self.events.append((event_time, "✓" if description == "RC recovered" else "✗", description))
+        self._rc_events_seen = len(events)
+
+    def lines(self, now: float) -> list[str]:
+        """Current state as text rows (fixed layout, so unchanged cells stay unchanged)."""
+        rows = []
+        rows += self._heartbeat_lines(now)
+        rows += [""] + self._ekf_lines()
+        rows += [""] + self._rc_lines()
+        rows += [""] + self._link_lines()
+        rows += ["", "EVENTS"]
+        self._collect_rc_events()
+        events = [f"  [{_stamp(t)}] {symbol} {text}" for t, symbol, text in self.events]
+        rows += events + [""] * (DASHBOARD_EVENT_ROWS - len(events))
+        return rows
+
+    def _heartbeat_lines(self, now: float) -> list[str]:
+        rows = ["HEARTBEAT"]
+        components = sorted(self.heartbeat.components.items())[:DASHBOARD_HEARTBEAT_ROWS]
+        for (sysid, compid), c in components:
+            age = now - c.last_time
+            flag = "✗" if age > self.heartbeat.gap_seconds else "✓"
+            p50 = f"{c.intervals.percentile(50):5.2f}s" if c.intervals.count else "    -"
+            rows.append(f"  {flag} {sysid:>3}/{compid:<3} {_status_name(c.system_status):12} "
+                        f"{'ARMED' if c.armed else 'DISARMED':8} mode {c.custom_mode:<10d} "
+                        f"p50 {p50}  gaps {c.gaps:<4d} last {age:5.1f}s ago")
+        if not components:
+            rows.append("  Waiting for HEARTBEAT...")
+        rows += [""] * (DASHBOARD_HEARTBEAT_ROWS + 1 - len(rows))
+        return rows
+
+    def _ekf_lines(self) -> list[str]:
+        gps_msg = self._latest.get('GLOBAL_POSITION_INT')
+        local_msg = self._latest.get('LOCAL_POSITION_NED')
+        att_msg = self._latest.get('ATTITUDE')
+        rows = ["EKF"]
+        rows.append(f"  Position  Lat {gps_msg.lat / 1e7:11.7f}° Lon {gps_msg.lon / 1e7:11.7f}° "
+                    f"Alt {gps_msg.alt / 1000.0:7.2f}m" if gps_msg else "  Position  -")
+        rows.append(f"  Velocity  N {local_msg.vx:6.2f} E {local_msg.vy:6.2f} D {local_msg.vz:6.2f} m/s"
+                    if local_msg else "  Velocity  -")
+        rows.append(f"  Attitude  Roll {math.degrees(att_msg.roll):6.1f}° Pitch {math.degrees(att_msg.pitch):6.1f}° "
+                    f"Yaw {math.degrees(att_msg.yaw):6.1f}°" if att_msg else "  Attitude  -")
+
+        ratios = [f"{LEVEL_SYMBOLS[LEVEL_NAMES[m.level]]}{m.name.replace('_ratio', '')} {m.ewma.mean:4.2f}"
+                  for m in self.estimator.ratios if m.ewma.count]
+        rows.append("  Ratios    " + ("  ".join(ratios) if ratios else "-"))
+        vibration = [m for m in self.estimator.vibration if m.ewma.count]
+        flags = [f"{name} 0x{bits:04x}" for name in ('ESTIMATOR_STATUS', 'EKF_STATUS_REPORT')
+                 if (bits := self.estimator.flags(name)) is not None]
+        if vibration:
+            worst = max(vibration, key=lambda m: m.ewma.mean)
+            flags.insert(0, f"{LEVEL_SYMBOLS[LEVEL_NAMES[worst.level]]}vib {worst.ewma.mean:5.1f}m/s²")
+        rows.append("  Health    " + ("  ".join(flags) if flags else "-"))
+        return rows
+
+    def _rc_lines(self) -> list[str]:
+        rows_per_table = math.ceil(RC_CHANNEL_COUNT / RC_CHANNELS_PER_ROW)
+        self.rc.flush()
+        if not self.rc.samples:
+            return ["RC", "  Waiting for RC_CHANNELS..."] + [""] * (rows_per_table - 1)
+        stats = self.rc.stats()
+        window = min(self.rc.samples, self.rc.window)
+        rows = [f"RC  (RSSI {stats['rssi']}, {window} samples, {len(self.rc.failsafe_events)} events)"]
+        for first in range(0, RC_CHANNEL_COUNT, RC_CHANNELS_PER_ROW):
+            cells = []
+            for ch in range(first, min(first + RC_CHANNELS_PER_ROW, RC_CHANNEL_COUNT)):
+                if stats["active"][ch]:
+                    cells.append(f"{ch + 1:2d}:{stats['mean'][ch]:5.0f} ±{stats['jitter'][ch]:4.1f}")
+                elif stats["dropouts"][ch]:
+                    cells.append(f"{ch + 1:2d}: drop {stats['dropouts'][ch]:<5d}")
+                else:
+                    cells.append(f"{ch + 1:2d}:     -     ")
+            rows.append("  " + "  ".join(cells))
+        return rows
+
+    def _link_lines(self) -> list[str]:
+        elapsed, type_bytes = self.link.interval()
+        rate = sum(type_bytes.values()) / elapsed if elapsed > 0 else 0.0
+        utilization = f" ({rate / self.link.capacity:5.1%} of link)" if self.link.capacity else ""
+        received = sum(s.received for s in self.link.sources.values())
+        lost = sum(s.lost for s in self.link.sources.values())
+        loss = lost / (received + lost) if received + lost else 0.0
+        rows = ["LINK",
+                f"  {rate:8.0f} B/s{utilization} | loss {loss:6.2%} ({lost}) | "
+                f"CRC errors {self.link.crc_errors} | framing errors {self.link.framing_errors}"]
+        radio = self.link.radio_status
+        rows.append(f"  Radio RSSI {radio.rssi}/{radio.remrssi} | noise {radio.noise}/{radio.remnoise} | "
+                    f"txbuf {radio.txbuf}% | rxerrors {radio.rxerrors}" if radio is not None else "  Radio -")
+        return rows
+
+
+class DiffScreen:
+    """Writes only the cells that differ from the previous frame."""
+
+    def __init__(self, window):
+        self.window = window
+        self.cells_written = 0
+        self._rows: list[str] = []
+
+    def reset(self) -> None:
+        """Forget the previous frame (after a resize), so the next one is drawn in full."""
+        self._rows = []
+        self.window.erase()
+
+    def draw(self, lines: list[str]) -> int:
+        """Show lines, clipped and padded to the window; returns the number of cells written."""
+        height, width = self.window.getmaxyx()
+        width -= 1  # Writing the bottom-right cell moves the cursor off screen
+        rows = [line[:width].ljust(width) for line in lines[:height]]
+        rows += [" " * width] * (height - len(rows))
+        previous = self._rows if len(self._rows) == height and len(self._rows[0]) == width else [""] * height
+
+        written = 0
+        for y, (new, old) in enumerate(zip(rows, previous)):
+            if new == old:
+                continue
+            x, end = 0, len(new)
+            while x < end:
+                if x < len(old) and new[x] == old[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < end and not (x < len(old) and new[x] == old[x]):
+                    x += 1
+                self.window.addstr(y, start, new[start:x])
+                written += x - start
+        self._rows = rows
+        self.cells_written += written
+        self.window.noutrefresh()
+        curses.doupdate()
+        return written
+
+
+def _run_dashboard(stdscr, mav, dashboard: Dashboard, duration: float, display_rate: float) -> None:
+    with contextlib.suppress(curses.error):
+        curses.curs_set(0)
+    stdscr.nodelay(True)
+    screen = DiffScreen(stdscr)
+    throttle = output.DisplayThrottle(display_rate)
+    start_time = time.time()
+    frames = 0
+    render_seconds = 0.0
+    frame_cells = 0
+    frame_messages = 0
+    last_frame = start_time
+
+    while duration is None or time.time() - start_time < duration:
+        msg = mav.recv_match(blocking=True, timeout=DASHBOARD_READ_TIMEOUT)
+        if msg is not None:
+            dashboard.ingest(msg)
+        if not throttle.ready():
+            continue
+
+        key = stdscr.getch()
+        if key in (ord('q'), ord('Q')):
+            break
+        if key == curses.KEY_RESIZE:
+            screen.reset()
+
+        render_start = time.perf_counter()
+        now = time.time()
+        message_rate = (dashboard.messages - frame_messages) / max(now - last_frame, 1e-9)
+        frame_messages, last_frame = dashboard.messages, now
+        header = (f"MAVLink dashboard  {_stamp(now)}  up {now - start_time:6.0f}s | {message_rate:6.0f} msg/s | "
+                  f"render {render_seconds / max(frames, 1) * 1000:5.2f} ms/frame, "
+                  f"{render_seconds / max(now - start_time, 1e-9):5.2%} of time, {frame_cells:4d} cells | q quits")
+        frame_cells = screen.draw([header, ""] + dashboard.lines(now))
+        render_seconds += time.perf_counter() - render_start
+        frames += 1
+
+    dashboard.rc.flush()
+
+
+def run_dashboard(duration: float = None, display_rate: float = DISPLAY_RATE_HZ) -> None:
+    """Show heartbeat, EKF, RC and link state in one curses view.
+
+    Args:
+        duration: Seconds to run (None: until q or Ctrl-C)
+        display_rate: Screen refresh rate in Hz
+    """
+    mav = connect()
+    baud = getattr(mav, 'baud', None)
+    dashboard = Dashboard(int(baud) / SERIAL_BITS_PER_BYTE if baud else None)
+    locale.setlocale(locale.LC_ALL, '')  # Wide characters (°, ✓) in curses
+    start_time = time.time()
+    try:
+        curses.wrapper(_run_dashboard, mav, dashboard, duration, display_rate)
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.time() - start_time
+    print(f"{dashboard.messages} messages in {elapsed:.1f}s ({dashboard.messages / max(elapsed, 1e-9):.0f}/s), "
+          f"{len(dashboard.heartbeat.transitions)} heartbeat transitions, {len(dashboard.estimator.alerts)} "
+          f"estimator alerts, {len(dashboard.rc.failsafe_events)} RC events")
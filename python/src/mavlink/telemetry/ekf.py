@@ -2,80 +2,137 @@
 import time
 import math
 from src.mavlink.connection import connect
+from src.mavlink.telemetry.records import write_message
+from src.mavlink.telemetry.history import TelemetryHistory
+from src.common import output
+from src.common.constants import DISPLAY_RATE_HZ
+
+# Messages combined into the EKF view
+EKF_MESSAGE_TYPES = ['GLOBAL_POSITION_INT', 'LOCAL_POSITION_NED', 'ATTITUDE']
+
+# Fields kept in multi-resolution history when a history window is requested
+EKF_HISTORY_FIELDS = {'LOCAL_POSITION_NED': ['x', 'y', 'z', 'vx', 'vy', 'vz']}
+
+
+def monitor_ekf(duration: float = 10.0, output_format: str = "text",
+                display_rate: float = DISPLAY_RATE_HZ, history_window: float = None) -> None:
+    """Monitor EKF status and position for specified duration.
+
+    Every position/velocity/attitude message is ingested; text output shows the
+    latest of each at display_rate.
+
+    Args:
+        duration: Duration to monitor in seconds
+        output_format: "text", "ndjson" or "csv"
+        display_rate: Text refresh rate in Hz
+        history_window: If set, keep fixed-memory history of local position/velocity and
+            report min/max/mean over this many seconds
+    """
+    with output.open_writer(output_format) as writer:
+        mav = connect()
+
+        if writer is None:
+            print("\n-- Monitoring EKF --")
+            print("Lat/Lon in degrees, Alt in meters, Velocity in m/s\n")
+
+        throttle = output.DisplayThrottle(display_rate)
+        history = TelemetryHistory(EKF_HISTORY_FIELDS) if history_window else None
+        latest = {}
+        start_time = time.time()
+
+        while (time.time() - start_time) < duration:
+            msg = mav.recv_match(type=EKF_MESSAGE_TYPES, blocking=True, timeout=1.0)
+
+            if msg and history is not None:
+                history.ingest(msg)
+            if msg and writer is not None:
+                write_message(writer, msg)
+                continue
+            if msg:
+                latest[msg.get_type()] = msg
+            if not throttle.ready():
+                continue
+
+            gps_msg = latest.get('GLOBAL_POSITION_INT')
+            local_msg = latest.get('LOCAL_POSITION_NED')
+            att_msg = latest.get('ATTITUDE')
+
+            if gps_msg and local_msg and att_msg:
+                # GLOBAL_POSITION_INT provides lat/lon in degE7, alt in mm
+                lat = gps_msg.lat / 1e7
+                lon = gps_msg.lon / 1e7
+                alt = gps_msg.alt / 1000.0  # mm to meters
+
+                # LOCAL_POSITION_NED provides velocity in m/s
+                vn = local_msg.vx
+                ve = local_msg.vy
+                vd = local_msg.vz
+
+                # ATTITUDE provides Euler angles in radians
+                roll = math.degrees(att_msg.roll)
+                pitch = math.degrees(att_msg.pitch)
+                yaw = math.degrees(att_msg.yaw)
+
+                print(f"Position: Lat {lat:11.7f}° Lon {lon:11.7f}° Alt {alt:7.2f}m")
+                print(f"Velocity: N {vn:6.2f} E {ve:6.2f} D {vd:6.2f} m/s")
+                print(f"Attitude: Roll {roll:6.1f}° Pitch {pitch:6.1f}° Yaw {yaw:6.1f}°")
+                if history is not None:
+                    means = [history.summary(f"LOCAL_POSITION_NED.{axis}", history_window).mean
+                             for axis in ('vx', 'vy', 'vz')]
+                    print(f"Velocity mean ({history_window:g}s): "
+                          f"N {means[0]:6.2f} E {means[1]:6.2f} D {means[2]:6.2f} m/s")
+                print()
+            else:
+                print("Waiting for telemetry data...")
+
+        print("Monitoring complete")
+        if history is not None:
+            _print_history(history, history_window)
+
+
+def _print_history(history: TelemetryHistory, window: float) -> None:
+    """Print min/max/mean of every tracked field over the window."""
+    print(f"\n-- History (last {window:g}s) --")
+    print(f"{'Field':25} | {'Samples':>8} | {'Min':>9} | {'Mean':>9} | {'Max':>9}")
+    print("-" * 70)
+    for key in history.series:
+        summary = history.summary(key, window)
+        if summary.count:
+            print(f"{key:25} | {summary.count:8d} | {summary.min:9.3f} | {summary.mean:9.3f} | {summary.max:9.3f}")
+        else:
+            print(f"{key:25} | {0:8d} | {'-':>9} | {'-':>9} | {'-':>9}")
 
 
-def monitor_ekf(duration: float = 10.0) -> None:
-    """Monitor EKF status and position for specified duration."""
-    mav = connect()
-
-    print("\n-- Monitoring EKF --")
-    print("Lat/Lon in degrees, Alt in meters, Velocity in m/s\n")
-
-    start_time = time.time()
+def ekf_status_once(output_format: str = "text") -> None:
+    """Get single snapshot of EKF status."""
+    with output.open_writer(output_format) as writer:
+        mav = connect()
+
+        # Check EKF status from SYS_STATUS
+        sys_msg = mav.recv_match(type='SYS_STATUS', blocking=True, timeout=3.0)
+
+        if sys_msg and writer is not None:
+            write_message(writer, sys_msg)
+        elif sys_msg:
+            # Decode sensor health from sensors_enabled, sensors_health bitfields
+            # Bit 3: GPS (3D fix)
+            gps_enabled = bool(sys_msg.onboard_control_sensors_enabled & (1 << 3))
+            gps_healthy = bool(sys_msg.onboard_control_sensors_health & (1 << 3))
+
+            print(f"GPS enabled: {gps_enabled}")
+            print(f"GPS healthy: {gps_healthy}")
+        else:
+            print("SYS_STATUS: Not available")
 
-    while (time.time() - start_time) < duration:
         # Get GPS position
-        gps_msg = mav.recv_match(type='GLOBAL_POSITION_INT', blocking=True, timeout=1.0)
-
-        # Get local position and velocity
-        local_msg = mav.recv_match(type='LOCAL_POSITION_NED', blocking=True, timeout=1.0)
+        gps_msg = mav.recv_match(type='GLOBAL_POSITION_INT', blocking=True, timeout=3.0)
 
-        # Get attitude
-        att_msg = mav.recv_match(type='ATTITUDE', blocking=True, timeout=1.0)
-
-        if gps_msg and local_msg and att_msg:
-            # GLOBAL_POSITION_INT provides lat/lon in degE7, alt in mm
+        if gps_msg and writer is not None:
+            write_message(writer, gps_msg)
+        elif gps_msg:
             lat = gps_msg.lat / 1e7
             lon = gps_msg.lon / 1e7
-            alt = gps_msg.alt / 1000.0  # mm to meters
-
-            # LOCAL_POSITION_NED provides velocity in m/s
-            vn = local_msg.vx
-            ve = local_msg.vy
-            vd = local_msg.vz
-
-            # ATTITUDE provides Euler angles in radians
-            roll = math.degrees(att_msg.roll)
-            pitch = math.degrees(att_msg.pitch)
-            yaw = math.degrees(att_msg.yaw)
-
-            print(f"Position: Lat {lat:11.7f}° Lon {lon:11.7f}° Alt {alt:7.2f}m")
-            print(f"Velocity: N {vn:6.2f} E {ve:6.2f} D {vd:6.2f} m/s")
-            print(f"Attitude: Roll {roll:6.1f}° Pitch {pitch:6.1f}° Yaw {yaw:6.1f}°")
-            print()
+            alt = gps_msg.alt / 1000.0
+            print(f"Position: Lat {lat:.7f}° Lon {lon:.7f}° Alt {alt:.2f}m")
         else:
-            print("Waiting for telemetry data...")
-
-        time.sleep(0.5)
-
-    print("Monitoring complete")
-
-
-def ekf_status_once() -> None:
-    """Get single snapshot of EKF status."""
-    mav = connect()
-
-    # Check EKF status from SYS_STATUS
-    sys_msg = mav.recv_match(type='SYS_STATUS', blocking=True, timeout=3.0)
-
-    if sys_msg:
-        # Decode sensor health from sensors_enabled, sensors_health bitfields
-        # Bit 3: GPS (3D fix)
-        gps_enabled = bool(sys_msg.onboard_control_sensors_enabled & (1 << 3))
-        gps_healthy = bool(sys_msg.onboard_control_sensors_health & (1 << 3))
-
-        print(f"GPS enabled: {gps_enabled}")
-        print(f"GPS healthy: {gps_healthy}")
-    else:
-        print("SYS_STATUS: Not available")
-
-    # Get GPS position
-    gps_msg = mav.recv_match(type='GLOBAL_POSITION_INT', blocking=True, timeout=3.0)
-
-    if gps_msg:
-        lat = gps_msg.lat / 1e7
-        lon = gps_msg.lon / 1e7
-        alt = gps_msg.alt / 1000.0
-        print(f"Position: Lat {lat:.7f}° Lon {lon:.7f}° Alt {alt:.2f}m")
-    else:
-        print("Position: Not available (GPS may not be locked)")
+            print("Position: Not available (GPS may not be locked)")
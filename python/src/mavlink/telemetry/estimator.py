@@ -0,0 +1,251 @@
+"""Streaming estimator health analytics via MAVLink
+
+Tracks the EKF innovation test ratios (ESTIMATOR_STATUS), estimator flags
+(ESTIMATOR_STATUS, EKF_STATUS_REPORT) and vibration (VIBRATION). Each metric
+keeps a time-weighted EWMA and variance and counts its threshold crossings, all
+O(1) per sample with no per-sample allocation. Alerts are raised:
+- when a metric's EWMA enters the warning or failure band (a sustained trend,
+  not a single spike); it leaves the band only below threshold * hysteresis.
+  After a stream gap the EWMA restarts, and bands change again only once it has
+  averaged a few samples
+- when a single test ratio reaches 1.0 (the measurement was rejected)
+- when estimator flags gain a fault bit (including constant position mode) or
+  lose a solution bit; predicted-position bits are informational only
+- when accelerometer clipping counters increase
+"""
+import time
+from dataclasses import dataclass
+
+from pymavlink import mavutil
+
+from src.mavlink.connection import connect, set_message_interval
+from src.common import output
+from src.common.stats import Ewma
+
+ESTIMATOR_MESSAGE_TYPES = ['ESTIMATOR_STATUS', 'EKF_STATUS_REPORT', 'VIBRATION']
+
+# Innovation test ratios: < 0.5 nominal, 0.5-1.0 degraded, >= 1.0 measurement rejected
+TEST_RATIO_FIELDS = ['vel_ratio', 'pos_horiz_ratio', 'pos_vert_ratio', 'mag_ratio', 'hagl_ratio', 'tas_ratio']
+TEST_RATIO_WARN = 0.5
+TEST_RATIO_FAIL = 1.0
+
+# Vibration levels in m/s/s (above 30 degrades the estimate, above 60 is severe)
+VIBRATION_FIELDS = ['vibration_x', 'vibration_y', 'vibration_z']
+VIBRATION_WARN = 30.0
+VIBRATION_FAIL = 60.0
+CLIPPING_FIELDS = ['clipping_0', 'clipping_1', 'clipping_2']
+
+ESTIMATOR_EWMA_SECONDS = 2.0
+ESTIMATOR_HYSTERESIS = 0.8
+ESTIMATOR_GAP_SECONDS = 2.0  # Restart the EWMA after a longer stream gap
+ESTIMATOR_MIN_SAMPLES = 5  # EWMA samples since (re)start before bands can change
+
+# Flag bits that are faults when set (constant position mode means no aiding source is used)
+FAULT_FLAGS = {
+    'ESTIMATOR_STATUS': mavutil.mavlink.ESTIMATOR_GPS_GLITCH | mavutil.mavlink.ESTIMATOR_ACCEL_ERROR
+    | mavutil.mavlink.ESTIMATOR_CONST_POS_MODE,
+    'EKF_STATUS_REPORT': mavutil.mavlink.EKF_UNINITIALIZED | mavutil.mavlink.EKF_GPS_GLITCHING
+    | mavutil.mavlink.EKF_CONST_POS_MODE,
+}
+# Predicted-position bits toggle in normal operation (e.g. on the ground) and raise no alerts
+INFO_FLAGS = {
+    'ESTIMATOR_STATUS': mavutil.mavlink.ESTIMATOR_PRED_POS_HORIZ_REL | mavutil.mavlink.ESTIMATOR_PRED_POS_HORIZ_ABS,
+    'EKF_STATUS_REPORT': mavutil.mavlink.EKF_PRED_POS_HORIZ_REL | mavutil.mavlink.EKF_PRED_POS_HORIZ_ABS,
+}
+# The remaining bits are solutions that should stay set once valid
+FLAG_ENUMS = {'ESTIMATOR_STATUS': 'ESTIMATOR_STATUS_FLAGS', 'EKF_STATUS_REPORT': 'EKF_STATUS_FLAGS'}
+
+LEVEL_NAMES = ("ok", "warn", "fail")
+
+
+@dataclass
+class Alert:
+    t: float
+    level: str
+    text: str
+
+
+class _Metric:
+    """EWMA, variance and threshold bands of one field."""
+
+    __slots__ = ("name", "ewma", "warn", "fail", "level", "max", "warn_crossings", "fail_crossings", "rejections",
+                 "_rejecting")
+
+    def __init__(self, name: str, warn: float, fail: float):
+        self.name = name
+        self.ewma = Ewma(ESTIMATOR_EWMA_SECONDS, max_gap=ESTIMATOR_GAP_SECONDS)
+        self.warn = warn
+        self.fail = fail
+        self.level = 0
+        self.max = 0.0
+        self.warn_crossings = 0
+        self.fail_crossings = 0
+        self.rejections = 0
+        self._rejecting = False
+
+    def update(self, value: float, t: float, alerts: list) -> None:
+        mean = self.ewma.update(value, t)
+        if value > self.max:
+            self.max = value
+
+        # Single samples at or above the failure threshold (rejected measurements)
+        if value >= self.fail:
+            self.rejections += 1
+            if not self._rejecting:
+                self._rejecting = True
+                alerts.append(Alert(t, "fail", f"{self.name} {value:.2f} ≥ {self.fail:g}"))
+        else:
+            self._rejecting = False
+
+        # Sustained trend: EWMA band with hysteresis on the way down
+        if self.ewma.run < ESTIMATOR_MIN_SAMPLES:
+            return
+        level = self.level
+        if level < 2 and mean >= self.fail:
+            level = 2
+            self.fail_crossings += 1
+        elif level < 1 and mean >= self.warn:
+            level = 1
+            self.warn_crossings += 1
+        elif level == 2 and mean < self.fail * ESTIMATOR_HYSTERESIS:
+            level = 1 if mean >= self.warn else 0
+        elif level == 1 and mean < self.warn * ESTIMATOR_HYSTERESIS:
+            level = 0
+        if level != self.level:
+            threshold = self.fail if level == 2 else self.warn
+            verb = "rose above" if level > self.level else "recovered below"
+            if level < self.level:
+                threshold = (self.fail if self.level == 2 else self.warn) * ESTIMATOR_HYSTERESIS
+            alerts.append(Alert(t, LEVEL_NAMES[level],
+                                f"{self.name} EWMA {mean:.2f} (σ {self.ewma.std:.2f}) {verb} {threshold:.2f}"))
+            self.level = level
+
+
+class EstimatorHealth:
+    """Estimator health state; feed every message of ESTIMATOR_MESSAGE_TYPES to ingest()."""
+
+    def __init__(self):
+        self.ratios = [_Metric(name, TEST_RATIO_WARN, TEST_RATIO_FAIL) for name in TEST_RATIO_FIELDS]
+        self.vibration = [_Metric(name, VIBRATION_WARN, VIBRATION_FAIL) for name in VIBRATION_FIELDS]
+        self.alerts: list[Alert] = []
+        self.samples = 0
+        self._flags: dict[str, int] = {}
+        self._clipping = None
+
+    def metrics(self) -> list[_Metric]:
+        return self.ratios + self.vibration
+
+    def ingest(self, msg) -> list[Alert]:
+        """Update the statistics from one message; returns the alerts it raised."""
+        msg_type = msg.get_type()
+        t = msg._timestamp
+        alerts = []
+        self.samples += 1
+        if msg_type == 'ESTIMATOR_STATUS':
+            for metric in self.ratios:
+                metric.update(getattr(msg, metric.name), t, alerts)
+            self._check_flags(msg_type, msg.flags, t, alerts)
+        elif msg_type == 'VIBRATION':
+            for metric in self.vibration:
+                metric.update(getattr(msg, metric.name), t, alerts)
+            clipping = (msg.clipping_0, msg.clipping_1, msg.clipping_2)
+            if self._clipping is not None and clipping != self._clipping:
+                added = [now - before for now, before in zip(clipping, self._clipping)]
+                if any(n > 0 for n in added):
+                    alerts.append(Alert(t, "warn", f"accelerometer clipping +{'/+'.join(map(str, added))} "
+                                                   f"(IMU 0/1/2)"))
+            self._clipping = clipping
+        elif msg_type == 'EKF_STATUS_REPORT':
+            self._check_flags(msg_type, msg.flags, t, alerts)
+        if alerts:
+            self.alerts.extend(alerts)
+        return alerts
+
+    def _check_flags(self, msg_type: str, flags: int, t: float, alerts: list) -> None:
+        previous = self._flags.get(msg_type)
+        self._flags[msg_type] = flags
+        if previous is None or flags == previous:
+            return
+        faults = FAULT_FLAGS[msg_type]
+        solutions = ~(faults | INFO_FLAGS[msg_type])
+        raised = flags & ~previous & faults
+        lost = previous & ~flags & solutions
+        cleared = previous & ~flags & faults
+        if raised:
+            alerts.append(Alert(t, "fail", f"{msg_type}: {_flag_names(msg_type, raised)} set"))
+        if lost:
+            alerts.append(Alert(t, "warn", f"{msg_type}: {_flag_names(msg_type, lost)} lost"))
+        if cleared:
+            alerts.append(Alert(t, "ok", f"{msg_type}: {_flag_names(msg_type, cleared)} cleared"))
+
+    def flags(self, msg_type: str):
+        return self._flags.get(msg_type)
+
+
+def _flag_names(msg_type: str, bits: int) -> str:
+    """Names of the set bits, e.g. 'ESTIMATOR_GPS_GLITCH|ESTIMATOR_ACCEL_ERROR'."""
+    entries = mavutil.mavlink.enums[FLAG_ENUMS[msg_type]]
+    names = [entries[1 << i].name if (1 << i) in entries else f"bit{i}"
+             for i in range(bits.bit_length()) if bits & (1 << i)]
+    return "|".join(names)
+
+
+def _print_alert(alert: Alert) -> None:
+    symbol = {"ok": "✓", "warn": "⚠", "fail": "✗"}[alert.level]
+    stamp = time.strftime('%H:%M:%S', time.localtime(alert.t)) + f".{int(alert.t * 1000) % 1000:03d}"
+    print(f"[{stamp}] {symbol} {alert.text}")
+
+
+def _print_status(health: EstimatorHealth) -> None:
+    parts = [f"{m.name.replace('_ratio', '')} {m.ewma.mean:.2f}" for m in health.ratios if m.ewma.count]
+    vib = [m.ewma.mean for m in health.vibration if m.ewma.count]
+    if vib:
+        parts.append(f"vib {max(vib):.1f}m/s²")
+    print("  " + (" | ".join(parts) if parts else "Waiting for ESTIMATOR_STATUS / VIBRATION..."))
+
+
+def _print_summary(health: EstimatorHealth, elapsed: float) -> None:
+    print(f"\n{'Metric':16} | {'Samples':>7} | {'EWMA':>7} | {'σ':>6} | {'Max':>7} | {'Warn':>4} | {'Fail':>4} | "
+          f"{'Rejected':>8}")
+    print("-" * 80)
+    for m in health.metrics():
+        if not m.ewma.count:
+            continue
+        print(f"{m.name:16} | {m.ewma.count:7d} | {m.ewma.mean:7.3f} | {m.ewma.std:6.3f} | {m.max:7.3f} | "
+              f"{m.warn_crossings:4d} | {m.fail_crossings:4d} | {m.rejections:8d}")
+    print(f"\n{health.samples} messages in {elapsed:.1f}s ({health.samples / elapsed:.0f}/s), "
+          f"{len(health.alerts)} alerts")
+
+
+def monitor_estimator(duration: float = 30.0, display_rate: float = 0.5, rate_hz: float = None) -> None:
+    """Watch estimator health, printing alerts as they happen.
+
+    Args:
+        duration: Seconds to monitor
+        display_rate: Status line rate in Hz
+        rate_hz: If set, request ESTIMATOR_STATUS and VIBRATION at this rate
+    """
+    mav = connect()
+    if rate_hz:
+        set_message_interval(mav, mavutil.mavlink.MAVLINK_MSG_ID_ESTIMATOR_STATUS, rate_hz)
+        set_message_interval(mav, mavutil.mavlink.MAVLINK_MSG_ID_VIBRATION, rate_hz)
+
+    print(f"\n-- Estimator health ({duration:g}s) --")
+    print(f"Test ratios: warn ≥ {TEST_RATIO_WARN}, rejected ≥ {TEST_RATIO_FAIL}; "
+          f"vibration: warn ≥ {VIBRATION_WARN:g}, fail ≥ {VIBRATION_FAIL:g} m/s²; "
+          f"EWMA τ = {ESTIMATOR_EWMA_SECONDS:g}s\n")
+
+    health = EstimatorHealth()
+    throttle = output.DisplayThrottle(display_rate)
+    start_time = time.time()
+    try:
+        while time.time() - start_time < duration:
+            msg = mav.recv_match(type=ESTIMATOR_MESSAGE_TYPES, blocking=True, timeout=1.0)
+            if msg is not None:
+                for alert in health.ingest(msg):
+                    _print_alert(alert)
+            if throttle.ready():
+                _print_status(health)
+    except KeyboardInterrupt:
+        pass
+    _print_summary(health, time.time() - start_time)
@@ -1,18 +1,62 @@
 """Heartbeat monitoring for MAVLink"""
 from pymavlink import mavutil
 import time
+from collections import deque
+from dataclasses import dataclass, field
 
 from src.mavlink import connection
+from src.mavlink.telemetry.records import write_message
+from src.common import output
+from src.common.constants import DISPLAY_RATE_HZ
+from src.common.stats import LogHistogram
 
+# MAV_STATE names for HEARTBEAT.system_status
+SYSTEM_STATUS_NAMES = {
+    0: "UNINIT",
+    1: "BOOT",
+    2: "CALIBRATING",
+    3: "STANDBY",
+    4: "ACTIVE",
+    5: "CRITICAL",
+    6: "EMERGENCY",
+    7: "POWEROFF",
+    8: "FLIGHT_TERMINATION"
+}
 
-def monitor_heartbeat(address: str, duration: float = 10.0) -> None:
+# Heartbeats are nominally 1 Hz; a longer silence counts as a gap
+HEARTBEAT_GAP_SECONDS = 1.5
+
+# Most recent state transitions kept for the final report
+MAX_TRANSITIONS = 1000
+
+
+def _status_name(system_status: int) -> str:
+    """Decode HEARTBEAT.system_status."""
+    return SYSTEM_STATUS_NAMES.get(system_status, f"UNKNOWN({system_status})")
+
+
+def _armed(base_mode: int) -> bool:
+    """Decode the armed flag from HEARTBEAT.base_mode."""
+    return bool(base_mode & mavutil.mavlink.MAV_MODE_FLAG_SAFETY_ARMED)
+
+
+def monitor_heartbeat(address: str, duration: float = 10.0, output_format: str = "text",
+                      display_rate: float = DISPLAY_RATE_HZ) -> None:
     """
     Monitor heartbeat messages continuously.
 
     Args:
         address: MAVLink connection address in MAVSDK format (e.g., "serial:///dev/ttyACM0:57600")
         duration: Duration to monitor in seconds
+        output_format: "text", "ndjson" or "csv"
+        display_rate: Maximum text line rate in Hz
     """
+    with output.open_writer(output_format) as writer:
+        _monitor_heartbeat(address, duration, writer, output.DisplayThrottle(display_rate))
+
+
+def _monitor_heartbeat(address: str, duration: float, writer, throttle) -> None:
+    """Heartbeat monitor loop writing records to writer (or text when writer is None)."""
     try:
         # Use centralized connection with stabilization
         mav = connection.connect(address)
@@ -47,22 +91,14 @@ def monitor_heartbeat(address: str, duration: float = 10.0) -> None:
             last_heartbeat = now
             heartbeat_count += 1
 
-            # Decode system status
-            status_map = {
-                0: "UNINIT",
-                1: "BOOT",
-                2: "CALIBRATING",
-                3: "STANDBY",
-                4: "ACTIVE",
-                5: "CRITICAL",
-                6: "EMERGENCY",
-                7: "POWEROFF",
-                8: "FLIGHT_TERMINATION"
-            }
-            status = status_map.get(msg.system_status, f"UNKNOWN({msg.system_status})")
-
-            # Decode base mode (armed/disarmed)
-            armed = "ARMED" if msg.base_mode & 0b10000000 else "DISARMED"
+            if writer is not None:
+                write_message(writer, msg)
+                continue
+            if not throttle.ready():
+                continue
+
+            status = _status_name(msg.system_status)
+            armed = "ARMED" if _armed(msg.base_mode) else "DISARMED"
 
             print(f"[{heartbeat_count:3d}] Interval: {interval:.2f}s | "
                   f"Status: {status:20s} | {armed}")
@@ -73,3 +109,124 @@ def monitor_heartbeat(address: str, duration: float = 10.0) -> None:
     print(f"Received {heartbeat_count} heartbeats in {duration:.1f} seconds")
     if heartbeat_count > 0:
         print(f"Average rate: {heartbeat_count / duration:.2f} Hz")
+
+
+@dataclass
+class ComponentHeartbeat:
+    """Heartbeat timing and state of one (sysid, compid)."""
+    intervals: LogHistogram = field(default_factory=LogHistogram)
+    count: int = 0
+    gaps: int = 0
+    last_time: float = None
+    armed: bool = None
+    system_status: int = None
+    custom_mode: int = None
+    mav_type: int = None
+
+
+class HeartbeatAnalyzer:
+    """Per-component heartbeat interval histograms and state transitions.
+
+    Memory is constant per component (fixed-size histogram, bounded transition log)
+    and each heartbeat costs O(1).
+    """
+
+    def __init__(self, gap_seconds: float = HEARTBEAT_GAP_SECONDS):
+        self.gap_seconds = gap_seconds
+        self.components: dict[tuple[int, int], ComponentHeartbeat] = {}
+        self.transitions: deque[tuple[float, tuple[int, int], str]] = deque(maxlen=MAX_TRANSITIONS)
+
+    def ingest(self, msg) -> list[str]:
+        """Record one HEARTBEAT.
+
+        Returns:
+            Descriptions of state transitions this heartbeat caused
+        """
+        key = (msg.get_srcSystem(), msg.get_srcComponent())
+        now = msg._timestamp
+        component = self.components.get(key)
+        if component is None:
+            component = self.components[key] = ComponentHeartbeat()
+
+        changes = []
+        if component.last_time is not None:
+            interval = now - component.last_time
+            component.intervals.add(interval)
+            if interval > self.gap_seconds:
+                component.gaps += 1
+                changes.append(f"heartbeat gap {interval:.2f}s")
+        else:
+            changes.append(f"new component (type {msg.type}, autopilot {msg.autopilot})")
+
+        armed = _armed(msg.base_mode)
+        if component.armed is not None and armed != component.armed:
+            changes.append("ARMED" if armed else "DISARMED")
+        if component.system_status is not None and msg.system_status != component.system_status:
+            changes.append(f"{_status_name(component.system_status)} → {_status_name(msg.system_status)}")
+        if component.custom_mode is not None and msg.custom_mode != component.custom_mode:
+            changes.append(f"custom_mode {component.custom_mode} → {msg.custom_mode}")
+
+        component.count += 1
+        component.last_time = now
+        component.armed = armed
+        component.system_status = msg.system_status
+        component.custom_mode = msg.custom_mode
+        component.mav_type = msg.type
+
+        for change in changes:
+            self.transitions.append((now, key, change))
+        return changes
+
+
+def _print_component_table(analyzer: HeartbeatAnalyzer) -> None:
+    """Print interval percentiles and state per component."""
+    print(f"{'Sys/Comp':>9} | {'Count':>6} | {'p50':>6} | {'p99':>6} | {'Max':>6} | {'Gaps':>5} | "
+          f"{'Status':18} | Armed")
+    print("-" * 80)
+    for (sysid, compid), c in sorted(analyzer.components.items()):
+        h = c.intervals
+        if h.count:
+            timing = f"{h.percentile(50):6.3f} | {h.percentile(99):6.3f} | {h.max:6.3f}"
+        else:
+            timing = f"{'-':>6} | {'-':>6} | {'-':>6}"
+        print(f"{sysid:>4}/{compid:<4} | {c.count:6d} | {timing} | {c.gaps:5d} | "
+              f"{_status_name(c.system_status):18} | {'yes' if c.armed else 'no'}")
+
+
+def analyze_heartbeat(address: str, duration: float = 60.0, display_rate: float = 0.2) -> None:
+    """
+    Analyze heartbeat timing and state of every component on the link.
+
+    Args:
+        address: MAVLink connection address in MAVSDK format
+        duration: Duration to analyze in seconds
+        display_rate: Summary table refresh rate in Hz (transitions print immediately)
+    """
+    try:
+        mav = connection.connect(address)
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+
+    print(f"\nAnalyzing heartbeats for {duration} seconds (intervals in seconds)...")
+    print("=" * 80)
+
+    analyzer = HeartbeatAnalyzer()
+    throttle = output.DisplayThrottle(display_rate)
+    throttle.ready()  # First table after one display interval
+    start_time = time.time()
+
+    while time.time() - start_time < duration:
+        msg = mav.recv_match(type='HEARTBEAT', blocking=True, timeout=1.0)
+        if msg:
+            for change in analyzer.ingest(msg):
+                stamp = time.strftime('%H:%M:%S', time.localtime(msg._timestamp))
+                print(f"[{stamp}] {msg.get_srcSystem()}/{msg.get_srcComponent()}: {change}")
+        if throttle.ready():
+            print()
+            _print_component_table(analyzer)
+            print()
+
+    print("=" * 80)
+    _print_component_table(analyzer)
+    print(f"\nState transitions recorded: {len(analyzer.transitions)}")
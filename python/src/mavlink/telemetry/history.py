@@ -0,0 +1,49 @@
+"""Multi-resolution history of MAVLink telemetry fields"""
+from src.common.history import DEFAULT_RATE_HZ, MultiResolutionSeries, Summary
+
+
+class TelemetryHistory:
+    """Fixed-memory history for selected fields of MAVLink messages.
+
+    Feed every received message to `ingest()`; messages without tracked fields are
+    ignored after a single dict lookup. Series are keyed "MESSAGE.field".
+    """
+
+    def __init__(self, fields: dict[str, list[str]], rate_hz: float = DEFAULT_RATE_HZ):
+        """
+        Args:
+            fields: Message type -> field names to track,
+                e.g. {'LOCAL_POSITION_NED': ['vx', 'vy', 'vz']}
+            rate_hz: Expected message rate, which sizes the raw sample rings
+        """
+        self._fields = {
+            msg_type: [(name, MultiResolutionSeries(rate_hz=rate_hz)) for name in names]
+            for msg_type, names in fields.items()
+        }
+        self.series = {
+            f"{msg_type}.{name}": series
+            for msg_type, tracked in self._fields.items()
+            for name, series in tracked
+        }
+
+    @property
+    def message_types(self) -> list[str]:
+        """Message types that carry tracked fields."""
+        return list(self._fields)
+
+    def ingest(self, msg) -> None:
+        """Add the tracked fields of a received message (stamped with its receive time)."""
+        tracked = self._fields.get(msg.get_type())
+        if tracked:
+            t = msg._timestamp
+            for name, series in tracked:
+                series.add(t, getattr(msg, name))
+
+    def summary(self, key: str, seconds: float) -> Summary:
+        """Aggregate of a tracked field over the last `seconds`.
+
+        Args:
+            key: "MESSAGE.field"
+            seconds: Window length ending at the field's newest sample
+        """
+        return self.series[key].summary(seconds)
@@ -0,0 +1,209 @@
+"""Link quality monitoring from MAVLink sequence numbers"""
+import time
+from dataclasses import dataclass
+
+from src.mavlink.connection import connect
+from src.common import output
+
+# Serial framing: 8N1 carries 8 data bits per 10 bits on the wire
+SERIAL_BITS_PER_BYTE = 10
+
+# Bandwidth budget used when suggesting which streams to cut
+TARGET_UTILIZATION = 0.8
+
+# Sequence jumps of at least this much (mod 256) are treated as a late packet, not loss
+REORDER_THRESHOLD = 128
+
+
+@dataclass
+class SourceStats:
+    """Sequence-number accounting for one (sysid, compid)."""
+    received: int = 0
+    lost: int = 0
+    duplicates: int = 0
+    reordered: int = 0
+    last_seq: int = None
+
+    @property
+    def loss_rate(self) -> float:
+        expected = self.received + self.lost
+        return self.lost / expected if expected else 0.0
+
+
+@dataclass
+class TypeStats:
+    """Traffic of one message type."""
+    count: int = 0
+    bytes: int = 0
+
+
+class LinkQualityMonitor:
+    """Loss, reordering, per-type bandwidth and frame errors of one link.
+
+    Counters accumulate since start; `interval()` returns and resets the per-type
+    byte counts used for rates.
+    """
+
+    def __init__(self, capacity_bytes_per_s: float = None):
+        """
+        Args:
+            capacity_bytes_per_s: Link capacity for utilization (e.g. baud / 10 for serial)
+        """
+        self.capacity = capacity_bytes_per_s
+        self.sources: dict[tuple[int, int], SourceStats] = {}
+        self.types: dict[str, TypeStats] = {}
+        self.crc_errors = 0
+        self.framing_errors = 0
+        self.error_bytes = 0
+        self.radio_status = None
+        self.start_time = time.time()
+        self._interval_start = self.start_time
+        self._interval_bytes: dict[str, int] = {}
+        self._interval_radio_rxerrors = None
+
+    def ingest(self, msg) -> None:
+        """Account one received frame (including BAD_DATA)."""
+        size = len(msg.get_msgbuf())
+        msg_type = msg.get_type()
+
+        if msg_type == 'BAD_DATA':
+            if 'CRC' in msg.reason:
+                self.crc_errors += 1
+            else:
+                self.framing_errors += 1
+            self.error_bytes += size
+            return
+
+        stats = self.types.get(msg_type)
+        if stats is None:
+            stats = self.types[msg_type] = TypeStats()
+        stats.count += 1
+        stats.bytes += size
+        self._interval_bytes[msg_type] = self._interval_bytes.get(msg_type, 0) + size
+
+        if msg_type == 'RADIO_STATUS':
+            self.radio_status = msg
+
+        key = (msg.get_srcSystem(), msg.get_srcComponent())
+        source = self.sources.get(key)
+        if source is None:
+            source = self.sources[key] = SourceStats()
+        seq = msg.get_seq()
+        source.received += 1
+        if source.last_seq is not None:
+            step = (seq - source.last_seq) % 256
+            if step == 0:
+                source.duplicates += 1
+                return
+            if step >= REORDER_THRESHOLD:
+                # Late frame: it was counted as lost when the sequence jumped past it
+                source.reordered += 1
+                source.lost = max(source.lost - 1, 0)
+                return
+            source.lost += step - 1
+        source.last_seq = seq
+
+    def interval(self) -> tuple[float, dict[str, int]]:
+        """Bytes per message type since the previous call.
+
+        Returns:
+            Tuple of (interval seconds, message type -> bytes)
+        """
+        now = time.time()
+        elapsed, counts = now - self._interval_start, self._interval_bytes
+        self._interval_start, self._interval_bytes = now, {}
+        return elapsed, counts
+
+    def radio_rxerrors_delta(self) -> int:
+        """RADIO_STATUS rxerrors increase since the previous call (None without RADIO_STATUS)."""
+        if self.radio_status is None:
+            return None
+        current = self.radio_status.rxerrors
+        previous, self._interval_radio_rxerrors = self._interval_radio_rxerrors, current
+        return (current - previous) % 65536 if previous is not None else 0
+
+
+def _print_interval(monitor: LinkQualityMonitor, top: int = 10) -> None:
+    """Print rates for the last interval plus cumulative loss/error counters."""
+    elapsed, type_bytes = monitor.interval()
+    if elapsed <= 0:
+        return
+    total_rate = sum(type_bytes.values()) / elapsed
+    utilization = f" ({total_rate / monitor.capacity:5.1%} of link)" if monitor.capacity else ""
+    print(f"\nThroughput: {total_rate:8.0f} B/s{utilization} | "
+          f"CRC errors: {monitor.crc_errors} | Framing errors: {monitor.framing_errors}")
+
+    for (sysid, compid), s in sorted(monitor.sources.items()):
+        print(f"  Source {sysid}/{compid}: received {s.received} | lost {s.lost} ({s.loss_rate:.2%}) | "
+              f"reordered {s.reordered} | duplicates {s.duplicates}")
+
+    radio = monitor.radio_status
+    if radio is not None:
+        print(f"  Radio: RSSI {radio.rssi}/{radio.remrssi} | noise {radio.noise}/{radio.remnoise} | "
+              f"txbuf {radio.txbuf}% | rxerrors +{monitor.radio_rxerrors_delta()} | fixed {radio.fixed}")
+
+    for msg_type, size in sorted(type_bytes.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {msg_type:28} {size / elapsed:8.0f} B/s")
+
+
+def _print_summary(monitor: LinkQualityMonitor, duration: float) -> None:
+    """Print per-type bandwidth ranking and which streams to cut to fit the budget."""
+    total_bytes = sum(t.bytes for t in monitor.types.values())
+    print("\n" + "=" * 80)
+    print("LINK SUMMARY")
+    print("=" * 80)
+    print(f"{'Message':28} | {'Count':>7} | {'Rate':>7} | {'B/s':>8} | {'Share':>6}")
+    print("-" * 80)
+    ranked = sorted(monitor.types.items(), key=lambda item: item[1].bytes, reverse=True)
+    for msg_type, t in ranked:
+        share = t.bytes / total_bytes if total_bytes else 0.0
+        print(f"{msg_type:28} | {t.count:7d} | {t.count / duration:5.1f}Hz | {t.bytes / duration:8.0f} | {share:6.1%}")
+
+    received = sum(s.received for s in monitor.sources.values())
+    lost = sum(s.lost for s in monitor.sources.values())
+    print("-" * 80)
+    print(f"Total: {total_bytes / duration:.0f} B/s | loss {lost}/{received + lost} frames | "
+          f"CRC errors {monitor.crc_errors} | framing errors {monitor.framing_errors} "
+          f"({monitor.error_bytes} bytes)")
+
+    if not monitor.capacity:
+        return
+    budget = monitor.capacity * TARGET_UTILIZATION
+    rate = total_bytes / duration
+    print(f"Link capacity: {monitor.capacity:.0f} B/s, utilization {rate / monitor.capacity:.1%}")
+    if rate <= budget:
+        print(f"✓ Traffic fits within {TARGET_UTILIZATION:.0%} of link capacity")
+        return
+    print(f"⚠ Over {TARGET_UTILIZATION:.0%} budget by {rate - budget:.0f} B/s. Cut or slow, largest first:")
+    for msg_type, t in ranked:
+        if rate <= budget:
+            break
+        rate -= t.bytes / duration
+        print(f"  - {msg_type} ({t.bytes / duration:.0f} B/s) → remaining {rate:.0f} B/s")
+
+
+def monitor_link(duration: float = 30.0, display_rate: float = 0.5) -> None:
+    """Measure loss, reordering, bandwidth per message type and frame errors.
+
+    Args:
+        duration: Duration to monitor in seconds
+        display_rate: Interval report rate in Hz
+    """
+    mav = connect()
+    baud = getattr(mav, 'baud', None)
+    capacity = int(baud) / SERIAL_BITS_PER_BYTE if baud else None
+
+    print(f"\n-- Monitoring link for {duration} seconds --")
+    monitor = LinkQualityMonitor(capacity)
+    throttle = output.DisplayThrottle(display_rate)
+    throttle.ready()  # First report after one display interval
+    start_time = time.time()
+
+    while time.time() - start_time < duration:
+        msg = mav.recv_match(blocking=True, timeout=1.0)
+        if msg:
+            monitor.ingest(msg)
+        if throttle.ready():
+            _print_interval(monitor)
+
+    _print_summary(monitor, time.time() - start_time)
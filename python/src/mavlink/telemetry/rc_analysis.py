@@ -0,0 +1,201 @@
+"""RC channel analytics over all 18 channels via MAVLink
+
+Every RC_CHANNELS message is staged with a single attribute fetch, then copied
+into a NumPy ring buffer in batches. Rolling statistics and event detection run
+vectorized over whole batches, never per sample in Python.
+"""
+import time
+from operator import attrgetter
+
+import numpy as np
+from pymavlink import mavutil
+
+from src.mavlink.connection import connect, set_message_interval
+from src.common import output
+
+RC_CHANNEL_COUNT = 18
+RC_CHANNEL_FIELDS = [f"chan{i}_raw" for i in range(1, RC_CHANNEL_COUNT + 1)]
+
+# UINT16_MAX marks a channel without a value
+RC_DROPOUT_VALUE = 65535
+
+# Stick jitter above this many microseconds (std of sample-to-sample change) is reported
+RC_JITTER_WARN_US = 4.0
+
+# A gap between RC_CHANNELS messages longer than this counts as a link loss
+RC_GAP_SECONDS = 0.5
+
+RC_WINDOW_SAMPLES = 1024
+RC_BATCH_SAMPLES = 64
+
+
+class RcAnalyzer:
+    """Rolling statistics over the last `window` RC_CHANNELS samples.
+
+    Ring columns: chan1..chan18, rssi, chancount.
+    """
+
+    def __init__(self, window: int = RC_WINDOW_SAMPLES, batch_size: int = RC_BATCH_SAMPLES):
+        self.window = window
+        self.batch_size = batch_size
+        self.samples = 0
+        self.failsafe_events: list[tuple[float, str]] = []
+        self._ring = np.zeros((window, RC_CHANNEL_COUNT + 2), dtype=np.uint16)
+        self._ring_times = np.zeros(window)
+        self._fetch = attrgetter(*RC_CHANNEL_FIELDS, "rssi", "chancount")
+        self._pending: list[tuple] = []
+        self._pending_times: list[float] = []
+        self._last_time = None
+        self._last_failsafe = False
+
+    def ingest(self, msg) -> None:
+        """Stage one RC_CHANNELS message; the batch is processed when full."""
+        self._pending.append(self._fetch(msg))
+        self._pending_times.append(msg._timestamp)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Move staged samples into the ring and detect failsafe events in bulk."""
+        if not self._pending:
+            return
+        batch = np.array(self._pending, dtype=np.uint16)
+        times = np.array(self._pending_times)
+        self._pending.clear()
+        self._pending_times.clear()
+
+        self._detect_failsafe(batch, times)
+
+        # Keep only what fits, then write the batch into the ring (possibly wrapping)
+        batch, times = batch[-self.window:], times[-self.window:]
+        slots = (self.samples + np.arange(len(batch))) % self.window
+        self._ring[slots] = batch
+        self._ring_times[slots] = times
+        self.samples += len(batch)
+
+    def _detect_failsafe(self, batch: np.ndarray, times: np.ndarray) -> None:
+        """Record transitions into failsafe and message gaps within a batch."""
+        channels = batch[:, :RC_CHANNEL_COUNT]
+        chancount = batch[:, RC_CHANNEL_COUNT + 1]
+        active = np.arange(RC_CHANNEL_COUNT) < chancount[:, None]
+
+        # Failsafe: no channels reported, or an active channel without a value
+        failsafe = (chancount == 0) | np.any(active & (channels == RC_DROPOUT_VALUE), axis=1)
+        previous = np.concatenate(([self._last_failsafe], failsafe[:-1]))
+        events = [(times[i], "RC failsafe (no valid channel data)") for i in np.flatnonzero(failsafe & ~previous)]
+        events += [(times[i], "RC recovered") for i in np.flatnonzero(~failsafe & previous)]
+        self._last_failsafe = bool(failsafe[-1])
+
+        all_times = np.concatenate(([self._last_time], times)) if self._last_time is not None else times
+        gaps = np.diff(all_times)
+        events += [(all_times[i + 1], f"RC_CHANNELS gap of {gaps[i]:.2f}s")
+                   for i in np.flatnonzero(gaps > RC_GAP_SECONDS)]
+        self._last_time = times[-1]
+
+        # Batches arrive in time order, so sorting each batch keeps the whole list in time order
+        self.failsafe_events.extend(sorted(events, key=lambda event: event[0]))
+
+    def _ordered(self) -> np.ndarray:
+        """Ring contents in chronological order."""
+        count = min(self.samples, self.window)
+        start = (self.samples - count) % self.window
+        return np.roll(self._ring, -start, axis=0)[:count]
+
+    def stats(self) -> dict[str, np.ndarray]:
+        """Per-channel rolling statistics over the window.
+
+        Returns:
+            Dict of arrays (one entry per channel): min, max, mean, jitter, dropouts,
+            plus 'active' (channel reported by the receiver) and scalar 'rssi'
+        """
+        self.flush()
+        data = self._ordered()
+        if not len(data):
+            empty = np.full(RC_CHANNEL_COUNT, np.nan)
+            return {"min": empty, "max": empty.copy(), "mean": empty.copy(), "jitter": empty.copy(),
+                    "dropouts": np.zeros(RC_CHANNEL_COUNT, dtype=np.int64),
+                    "active": np.zeros(RC_CHANNEL_COUNT, dtype=bool), "rssi": None}
+        channels = data[:, :RC_CHANNEL_COUNT].astype(np.float64)
+        chancount = data[:, RC_CHANNEL_COUNT + 1]
+        active = np.arange(RC_CHANNEL_COUNT) < chancount[:, None]
+        dropout = active & (data[:, :RC_CHANNEL_COUNT] == RC_DROPOUT_VALUE)
+        valid = active & ~dropout
+
+        masked = np.ma.masked_array(channels, mask=~valid)
+        both_valid = valid[1:] & valid[:-1]
+        deltas = np.ma.masked_array(np.diff(channels, axis=0), mask=~both_valid)
+
+        return {
+            "min": masked.min(axis=0).filled(np.nan),
+            "max": masked.max(axis=0).filled(np.nan),
+            "mean": masked.mean(axis=0).filled(np.nan),
+            "jitter": deltas.std(axis=0).filled(np.nan) if len(data) > 1 else np.full(RC_CHANNEL_COUNT, np.nan),
+            "dropouts": dropout.sum(axis=0),
+            "active": valid.any(axis=0),
+            "rssi": int(data[-1, RC_CHANNEL_COUNT]) if len(data) else None,
+        }
+
+
+def _print_stats(analyzer: RcAnalyzer) -> None:
+    """Print the per-channel statistics table."""
+    if not analyzer.samples:
+        print("\nNo RC_CHANNELS received")
+        return
+    stats = analyzer.stats()
+    window = min(analyzer.samples, analyzer.window)
+    print(f"\n{analyzer.samples} samples, window {window}, RSSI {stats['rssi']}")
+    print(f"{'Ch':>3} | {'Min':>5} | {'Max':>5} | {'Mean':>7} | {'Jitter':>6} | {'Drop':>5}")
+    print("-" * 46)
+    for ch in np.flatnonzero(stats["active"] | (stats["dropouts"] > 0)):
+        flag = "  ← jitter" if stats["jitter"][ch] > RC_JITTER_WARN_US else ""
+        print(f"{ch + 1:3d} | {stats['min'][ch]:5.0f} | {stats['max'][ch]:5.0f} | {stats['mean'][ch]:7.1f} | "
+              f"{stats['jitter'][ch]:6.2f} | {stats['dropouts'][ch]:5d}{flag}")
+
+
+def _print_events(analyzer: RcAnalyzer, already_reported: int) -> int:
+    """Print failsafe events not reported yet; returns the new reported count."""
+    for event_time, description in analyzer.failsafe_events[already_reported:]:
+        print(f"[{time.strftime('%H:%M:%S', time.localtime(event_time))}"
+              f".{int(event_time % 1 * 1000):03d}] {description}")
+    return len(analyzer.failsafe_events)
+
+
+def analyze_rc_channels(duration: float = 10.0, window: int = RC_WINDOW_SAMPLES, rate_hz: float = None,
+                        display_rate: float = 1.0) -> None:
+    """Analyze all 18 RC channels for the specified duration.
+
+    Args:
+        duration: Duration to analyze in seconds
+        window: Rolling window size in samples
+        rate_hz: If set, request this RC_CHANNELS stream rate from the autopilot
+        display_rate: Table refresh rate in Hz
+    """
+    mav = connect()
+    if rate_hz:
+        set_message_interval(mav, mavutil.mavlink.MAVLINK_MSG_ID_RC_CHANNELS, rate_hz)
+
+    print("\n-- Analyzing RC Channels --")
+    print(f"Jitter: std of sample-to-sample change (µs), flagged above {RC_JITTER_WARN_US}")
+
+    analyzer = RcAnalyzer(window=window)
+    throttle = output.DisplayThrottle(display_rate)
+    reported_events = 0
+    start_time = time.time()
+
+    while (time.time() - start_time) < duration:
+        msg = mav.recv_match(type='RC_CHANNELS', blocking=True, timeout=1.0)
+        if msg:
+            analyzer.ingest(msg)
+        if not throttle.ready():
+            continue
+
+        analyzer.flush()
+        reported_events = _print_events(analyzer, reported_events)
+        if analyzer.samples:
+            _print_stats(analyzer)
+
+    analyzer.flush()
+    _print_events(analyzer, reported_events)
+    print("\n-- Final RC statistics --")
+    _print_stats(analyzer)
+    print(f"Failsafe/link events: {len(analyzer.failsafe_events)}")
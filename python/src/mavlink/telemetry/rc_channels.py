@@ -1,57 +1,71 @@
 """RC channel telemetry via MAVLink"""
 import time
 from src.mavlink.connection import connect
+from src.mavlink.telemetry.records import write_message
+from src.common import output
+from src.common.constants import DISPLAY_RATE_HZ
 
 
-def monitor_rc_channels(duration: float = 10.0) -> None:
-    """Monitor RC channel values for specified duration."""
-    mav = connect()
+def monitor_rc_channels(duration: float = 10.0, output_format: str = "text",
+                        display_rate: float = DISPLAY_RATE_HZ) -> None:
+    """Monitor RC channel values for specified duration.
 
-    print("\n-- Monitoring RC Channels --")
-    print("Ch1-4 typically: Roll, Pitch, Throttle, Yaw")
-    print("Values range: 1000-2000 (1500 = center)\n")
+    Every RC_CHANNELS message is ingested; text output is refreshed at display_rate.
 
-    start_time = time.time()
+    Args:
+        duration: Duration to monitor in seconds
+        output_format: "text", "ndjson" or "csv"
+        display_rate: Text refresh rate in Hz
+    """
+    with output.open_writer(output_format) as writer:
+        mav = connect()
 
-    while (time.time() - start_time) < duration:
-        # Blocking receive with timeout
-        msg = mav.recv_match(type='RC_CHANNELS', blocking=True, timeout=1.0)
+        if writer is None:
+            print("\n-- Monitoring RC Channels --")
+            print("Ch1-4 typically: Roll, Pitch, Throttle, Yaw")
+            print("Values range: 1000-2000 (1500 = center)\n")
 
-        if msg:
-            # RC_CHANNELS provides up to 18 channels
-            channels = [
-                msg.chan1_raw, msg.chan2_raw, msg.chan3_raw, msg.chan4_raw,
-                msg.chan5_raw, msg.chan6_raw, msg.chan7_raw, msg.chan8_raw
-            ]
+        throttle = output.DisplayThrottle(display_rate)
+        start_time = time.time()
 
-            # Display first 8 channels
-            print(f"CH1: {channels[0]:4d} | CH2: {channels[1]:4d} | "
-                  f"CH3: {channels[2]:4d} | CH4: {channels[3]:4d} | "
-                  f"CH5: {channels[4]:4d} | CH6: {channels[5]:4d} | "
-                  f"CH7: {channels[6]:4d} | CH8: {channels[7]:4d}")
+        while (time.time() - start_time) < duration:
+            # Blocking receive with timeout
+            msg = mav.recv_match(type='RC_CHANNELS', blocking=True, timeout=1.0)
+            if not msg:
+                continue
 
-        time.sleep(0.1)  # Small delay between readings
+            if writer is not None:
+                write_message(writer, msg)
+            elif throttle.ready():
+                # Display first 8 channels (RC_CHANNELS provides up to 18)
+                print(f"CH1: {msg.chan1_raw:4d} | CH2: {msg.chan2_raw:4d} | "
+                      f"CH3: {msg.chan3_raw:4d} | CH4: {msg.chan4_raw:4d} | "
+                      f"CH5: {msg.chan5_raw:4d} | CH6: {msg.chan6_raw:4d} | "
+                      f"CH7: {msg.chan7_raw:4d} | CH8: {msg.chan8_raw:4d}")
 
-    print("\nMonitoring complete")
+        print("\nMonitoring complete")
 
 
-def rc_channels_once() -> None:
+def rc_channels_once(output_format: str = "text") -> None:
     """Get single snapshot of RC channel values."""
-    mav = connect()
-
-    # Wait for RC_CHANNELS message
-    msg = mav.recv_match(type='RC_CHANNELS', blocking=True, timeout=5.0)
-
-    if msg:
-        print("RC Channel Values:")
-        print(f"  Channel 1 (Roll):     {msg.chan1_raw}")
-        print(f"  Channel 2 (Pitch):    {msg.chan2_raw}")
-        print(f"  Channel 3 (Throttle): {msg.chan3_raw}")
-        print(f"  Channel 4 (Yaw):      {msg.chan4_raw}")
-        print(f"  Channel 5:            {msg.chan5_raw}")
-        print(f"  Channel 6:            {msg.chan6_raw}")
-        print(f"  Channel 7:            {msg.chan7_raw}")
-        print(f"  Channel 8:            {msg.chan8_raw}")
-        print(f"\n  RSSI: {msg.rssi} dB")
-    else:
-        print("No RC_CHANNELS message received (timeout)")
+    with output.open_writer(output_format) as writer:
+        mav = connect()
+
+        # Wait for RC_CHANNELS message
+        msg = mav.recv_match(type='RC_CHANNELS', blocking=True, timeout=5.0)
+
+        if msg and writer is not None:
+            write_message(writer, msg)
+        elif msg:
+            print("RC Channel Values:")
+            print(f"  Channel 1 (Roll):     {msg.chan1_raw}")
+            print(f"  Channel 2 (Pitch):    {msg.chan2_raw}")
+            print(f"  Channel 3 (Throttle): {msg.chan3_raw}")
+            print(f"  Channel 4 (Yaw):      {msg.chan4_raw}")
+            print(f"  Channel 5:            {msg.chan5_raw}")
+            print(f"  Channel 6:            {msg.chan6_raw}")
+            print(f"  Channel 7:            {msg.chan7_raw}")
+            print(f"  Channel 8:            {msg.chan8_raw}")
+            print(f"\n  RSSI: {msg.rssi} dB")
+        else:
+            print("No RC_CHANNELS message received (timeout)")
@@ -0,0 +1,13 @@
+"""Conversion of MAVLink messages into telemetry output records"""
+from src.common.output import RecordWriter
+
+
+def write_message(writer: RecordWriter, msg) -> None:
+    """Write a MAVLink message's raw field values as one record.
+
+    Args:
+        writer: Record sink
+        msg: Received pymavlink message (timestamped with its host receive time)
+    """
+    names = msg.get_fieldnames()
+    writer.write(msg.get_type(), msg._timestamp, names, [getattr(msg, name) for name in names])
@@ -0,0 +1,190 @@
+"""Clock alignment between autopilot and host via the TIMESYNC protocol
+
+The host sends TIMESYNC(tc1=0, ts1=host_ns) and the autopilot echoes ts1 with its
+own boot-relative clock in tc1. Each reply gives one round trip and one offset
+sample, assuming a symmetric link. Replies that took much longer than the fastest
+recent round trip carry queueing delay, so only the fastest samples feed the model.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+from src.mavlink.connection import connect
+from src.common import output
+from src.common.stats import LogHistogram
+
+TIMESYNC_INTERVAL_SECONDS = 1.0
+TIMESYNC_WINDOW = 64
+
+# Samples with RTT above min_rtt * this factor are not used for the offset model
+TIMESYNC_RTT_FILTER = 1.5
+
+# Fitting drift needs samples spread over at least this much vehicle time
+TIMESYNC_MIN_DRIFT_SPAN_SECONDS = 10.0
+
+# Onboard time_usec values above this are UNIX epoch time, not time since boot
+EPOCH_THRESHOLD_USEC = 1_000_000_000_000_000
+
+
+class TimeSync:
+    """Offset/drift model from vehicle boot time to host time, plus RTT statistics.
+
+    Attach to a pymavlink connection; requests are sent from the message hook, so
+    the estimator runs in the background of whatever loop is calling recv_match().
+    """
+
+    def __init__(self, interval: float = TIMESYNC_INTERVAL_SECONDS, window: int = TIMESYNC_WINDOW):
+        """
+        Args:
+            interval: Seconds between TIMESYNC requests
+            window: Number of recent samples the model is fitted to
+        """
+        self.interval = interval
+        self.rtt = LogHistogram(minimum=1e-5, maximum=10.0)
+        self.last_rtt = None
+        self._samples: deque[tuple[float, float, float]] = deque(maxlen=window)  # (vehicle s, offset s, rtt s)
+        self._offset = None
+        self._drift = 0.0
+        self._reference = 0.0  # Vehicle time the drift term is anchored at
+        self._last_request = 0.0
+        self._mav = None
+
+    def attach(self, mav) -> None:
+        """Start estimating on a connection (hooks into every received message)."""
+        self._mav = mav
+        mav.message_hooks.append(self._hook)
+        self.request()
+
+    def detach(self) -> None:
+        if self._mav is not None:
+            self._mav.message_hooks.remove(self._hook)
+            self._mav = None
+
+    def request(self) -> None:
+        """Send one TIMESYNC request stamped with the host clock."""
+        self._last_request = time.time()
+        self._mav.mav.timesync_send(0, time.time_ns())
+
+    def _hook(self, mav, msg) -> None:
+        if msg.get_type() == 'TIMESYNC' and msg.tc1 != 0:
+            self.ingest(msg.tc1, msg.ts1, time.time_ns())
+        if time.time() - self._last_request >= self.interval:
+            self.request()
+
+    def ingest(self, tc1: int, ts1: int, now_ns: int) -> None:
+        """Add one TIMESYNC reply.
+
+        Args:
+            tc1: Vehicle time when it answered (ns since boot)
+            ts1: Host time of our request, echoed back (ns)
+            now_ns: Host time the reply was received (ns)
+        """
+        rtt = (now_ns - ts1) * 1e-9
+        if rtt < 0 or rtt > 10.0:
+            return  # Reply to another host's request, or stale
+        vehicle = tc1 * 1e-9
+        offset = (ts1 + now_ns) * 0.5e-9 - vehicle
+        self.rtt.add(rtt)
+        self.last_rtt = rtt
+        self._samples.append((vehicle, offset, rtt))
+        self._fit()
+
+    def _fit(self) -> None:
+        """Fit offset (and drift, once enough time has passed) to the fastest samples."""
+        samples = np.array(self._samples)
+        best = samples[samples[:, 2] <= samples[:, 2].min() * TIMESYNC_RTT_FILTER]
+        vehicle, offset = best[:, 0], best[:, 1]
+        self._reference = vehicle[-1]
+        if vehicle[-1] - vehicle[0] >= TIMESYNC_MIN_DRIFT_SPAN_SECONDS and len(best) >= 3:
+            self._drift, self._offset = np.polyfit(vehicle - self._reference, offset, 1)
+        else:
+            self._offset = float(np.median(offset))
+
+    @property
+    def synchronized(self) -> bool:
+        return self._offset is not None
+
+    @property
+    def offset(self) -> float:
+        """Host time minus vehicle boot time, in seconds (None until the first reply)."""
+        return self._offset
+
+    @property
+    def drift_ppm(self) -> float:
+        """Host clock rate relative to the vehicle clock, in parts per million."""
+        return self._drift * 1e6
+
+    def to_host(self, vehicle_seconds: float) -> float:
+        """Map vehicle boot time (seconds) to host time.time()."""
+        return vehicle_seconds + self._offset + self._drift * (vehicle_seconds - self._reference)
+
+    def to_vehicle(self, host_seconds: float) -> float:
+        """Map host time.time() to vehicle boot time (seconds)."""
+        return (host_seconds - self._offset + self._drift * self._reference) / (1.0 + self._drift)
+
+    def vehicle_time(self, msg) -> float:
+        """Onboard timestamp of a message in seconds since boot (None if it carries none)."""
+        time_usec = getattr(msg, 'time_usec', None)
+        if time_usec is not None and 0 < time_usec < EPOCH_THRESHOLD_USEC:
+            return time_usec * 1e-6
+        time_boot_ms = getattr(msg, 'time_boot_ms', None)
+        if time_boot_ms is not None:
+            return time_boot_ms * 1e-3
+        return None
+
+    def latency(self, msg) -> float:
+        """Seconds from the onboard timestamp of a message to its reception on the host."""
+        if not self.synchronized:
+            return None
+        vehicle = self.vehicle_time(msg)
+        return msg._timestamp - self.to_host(vehicle) if vehicle is not None else None
+
+
+def _print_status(sync: TimeSync, latencies: dict[str, LogHistogram]) -> None:
+    """Print offset, drift, RTT percentiles and per-message latency."""
+    if not sync.synchronized:
+        print("Waiting for TIMESYNC replies...")
+        return
+    rtt = sync.rtt
+    print(f"\nOffset {sync.offset:.6f}s | drift {sync.drift_ppm:+.1f} ppm | "
+          f"RTT p50 {rtt.percentile(50) * 1e3:.2f}ms p90 {rtt.percentile(90) * 1e3:.2f}ms "
+          f"p99 {rtt.percentile(99) * 1e3:.2f}ms ({rtt.count} samples)")
+    for msg_type, hist in sorted(latencies.items()):
+        print(f"  {msg_type:28} latency p50 {hist.percentile(50) * 1e3:7.2f}ms "
+              f"p99 {hist.percentile(99) * 1e3:7.2f}ms")
+
+
+def monitor_timesync(duration: float = 30.0, display_rate: float = 0.5) -> None:
+    """Report clock offset, drift, RTT and end-to-end telemetry latency.
+
+    Args:
+        duration: Duration to monitor in seconds
+        display_rate: Report rate in Hz
+    """
+    mav = connect()
+    print(f"\n-- Measuring TIMESYNC for {duration} seconds --")
+    sync = TimeSync()
+    sync.attach(mav)
+    throttle = output.DisplayThrottle(display_rate)
+    latencies: dict[str, LogHistogram] = {}
+    start_time = time.time()
+
+    try:
+        while time.time() - start_time < duration:
+            msg = mav.recv_match(blocking=True, timeout=1.0)
+            if msg is not None and sync.synchronized and msg.get_type() != 'TIMESYNC':
+                latency = sync.latency(msg)
+                if latency is not None:
+                    hist = latencies.get(msg.get_type())
+                    if hist is None:
+                        # Latency can be slightly negative within the offset error
+                        hist = latencies[msg.get_type()] = LogHistogram(minimum=1e-5, maximum=10.0)
+                    hist.add(max(latency, 0.0))
+            if throttle.ready():
+                _print_status(sync, latencies)
+    finally:
+        sync.detach()
+
+    print("\n-- Final TIMESYNC statistics --")
+    _print_status(sync, latencies)
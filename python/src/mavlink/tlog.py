@@ -0,0 +1,159 @@
+"""Bulk decoding of telemetry logs (.tlog) into NumPy structured arrays
+
+A tlog is a sequence of records: an 8-byte big-endian microsecond timestamp
+followed by one raw MAVLink 1 or 2 frame. The file is memory-mapped and walked
+once. Each frame costs a header read; the payload offsets of the requested
+message types are recorded. Each type is then gathered in bulk into a
+structured array whose dtype comes from the pymavlink message definition.
+MAVLink 2 payloads truncated on the wire (trailing zero bytes dropped) are
+zero-filled.
+
+Frames are located by their length fields; CRCs are not checked. A byte that
+does not start a frame makes the scanner resynchronize one byte later.
+"""
+import mmap
+import re
+import struct
+from array import array
+from typing import Iterable
+
+import numpy as np
+from pymavlink import mavutil
+
+MAVLINK1_MAGIC = 0xFE
+MAVLINK2_MAGIC = 0xFD
+MAVLINK2_SIGNED = 0x01
+MAVLINK2_SIGNATURE_LEN = 13
+
+_STRUCT_TYPES = {
+    'Q': '<u8', 'q': '<i8', 'I': '<u4', 'i': '<i4', 'H': '<u2', 'h': '<i2',
+    'B': 'u1', 'b': 'i1', 'f': '<f4', 'd': '<f8', 'c': 'S1',
+}
+
+# Bytes gathered per vectorized copy when decoding a message type
+GATHER_CHUNK_BYTES = 8 << 20
+
+_TIMESTAMP = struct.Struct(">Q")
+
+
+def message_dtype(msg_type: str) -> np.dtype:
+    """Structured dtype of a message's base payload, fields in wire order."""
+    cls = mavutil.mavlink.mavlink_map[getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{msg_type}")]
+    descr = []
+    codes = re.findall(r"(\d*)([a-zA-Z])", cls.unpacker.format.lstrip('<'))
+    for name, (count, code) in zip(cls.ordered_fieldnames, codes):
+        if code == 's':
+            descr.append((name, f"S{count or 1}"))
+        elif count:
+            descr.append((name, _STRUCT_TYPES[code], (int(count),)))
+        else:
+            descr.append((name, _STRUCT_TYPES[code]))
+    return np.dtype(descr)
+
+
+class TLog:
+    """Memory-mapped tlog indexed by message type.
+
+    Use as a context manager; arrays returned by `messages()` are copies.
+    """
+
+    def __init__(self, path: str, msg_types: Iterable[str]):
+        """
+        Args:
+            path: .tlog file
+            msg_types: Message type names whose records are indexed
+        """
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._ids = {getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{name}"): name for name in msg_types}
+        self._offsets = {name: array('Q') for name in self._ids.values()}
+        self._lengths = {name: array('B') for name in self._ids.values()}
+        self._times = {name: array('Q') for name in self._ids.values()}
+        self.frames = 0
+        self.resyncs = 0
+        self._scan()
+
+    def __enter__(self) -> "TLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def _scan(self) -> None:
+        buf = self._map
+        end = len(buf)
+        wanted = {msg_id: (self._offsets[name].append, self._lengths[name].append, self._times[name].append)
+                  for msg_id, name in self._ids.items()}
+        unpack_time = _TIMESTAMP.unpack_from
+        frames = resyncs = 0
+        pos = 0
+
+        # Hot loop: one timestamp unpack and a few byte reads per frame
+        while pos + 10 <= end:
+            magic = buf[pos + 8]
+            length = buf[pos + 9]
+            if magic == MAVLINK2_MAGIC:
+                header = pos + 18
+                if header > end:
+                    break
+                msg_id = buf[pos + 15] | (buf[pos + 16] << 8) | (buf[pos + 17] << 16)
+                frame_end = header + length + 2
+                if buf[pos + 10] & MAVLINK2_SIGNED:
+                    frame_end += MAVLINK2_SIGNATURE_LEN
+            elif magic == MAVLINK1_MAGIC:
+                header = pos + 14
+                msg_id = buf[pos + 13] if header <= end else -1
+                frame_end = header + length + 2
+            else:
+                pos += 1  # Not at a record boundary: resynchronize
+                resyncs += 1
+                continue
+            if frame_end > end:
+                break  # Truncated final record
+            frames += 1
+            sink = wanted.get(msg_id)
+            if sink is not None:
+                sink[0](header)
+                sink[1](length)
+                sink[2](unpack_time(buf, pos)[0])
+            pos = frame_end
+        self.frames = frames
+        self.resyncs = resyncs
+
+    def count(self, msg_type: str) -> int:
+        return len(self._offsets[msg_type])
+
+    def messages(self, msg_type: str) -> tuple[np.ndarray, np.ndarray]:
+        """All records of one message type.
+
+        Returns:
+            Tuple of (log timestamps in seconds, structured array of base payload fields)
+        """
+        dtype = message_dtype(msg_type)
+        count = len(self._offsets[msg_type])
+        out = np.zeros(count, dtype=dtype)
+        times = np.frombuffer(self._times[msg_type], dtype=np.uint64).astype(np.float64) * 1e-6
+        if not count:
+            return times, out
+
+        size = dtype.itemsize
+        source = np.frombuffer(self._map, dtype=np.uint8)
+        # Reading past a truncated payload must stay inside the file; those bytes are zeroed below
+        padded = np.concatenate([source, np.zeros(size, dtype=np.uint8)]) \
+            if int(self._offsets[msg_type][-1]) + size > len(source) else source
+        offsets = np.frombuffer(self._offsets[msg_type], dtype=np.uint64).astype(np.int64)
+        lengths = np.frombuffer(self._lengths[msg_type], dtype=np.uint8)
+        columns = np.arange(size)
+        target = out.view(np.uint8).reshape(count, size)
+        rows = max(GATHER_CHUNK_BYTES // (size * 8), 1)
+        for first in range(0, count, rows):
+            chunk = slice(first, first + rows)
+            block = padded[offsets[chunk, None] + columns]
+            block[columns[None, :] >= lengths[chunk, None]] = 0
+            target[chunk] = block
+        del source, padded  # Release the buffer export so the mmap can be closed
+        return times, out
@@ -1,13 +1,16 @@
 """MAVSDK connection utilities"""
 from mavsdk import System
 
-from src.common.env import get_connection_address
+from src.common.env import get_connection_address, use_mavsdk_server_pool
 
 
 async def connect(address: str = None) -> System:
     """
     Connect to drone via MAVSDK and wait for connection.
 
+    With MAVSDK_SERVER_POOL=1 the System attaches to a pooled mavsdk_server for
+    the address (see src.mavsdk.server_pool) instead of starting its own.
+
     Args:
         address: Connection address. If None, uses DRONE_ADDRESS environment variable.
 
@@ -20,7 +23,12 @@ async def connect(address: str = None) -> System:
     if address is None:
         address = get_connection_address()
 
-    drone = System()
+    if use_mavsdk_server_pool():
+        from src.mavsdk import server_pool
+        host, port = server_pool.acquire(address)
+        drone = System(mavsdk_server_address=host, port=port)
+    else:
+        drone = System()
     await drone.connect(system_address=address)
 
     print("Waiting for drone to connect...")
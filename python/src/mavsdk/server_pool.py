@@ -0,0 +1,213 @@
+"""Shared mavsdk_server pool (opt-in with MAVSDK_SERVER_POOL=1)
+
+By default every `System()` starts its own mavsdk_server and gRPC channel, which
+costs hundreds of milliseconds and tens of MB per command. With the pool, one
+server per vehicle address is started on its own gRPC port and left running in
+its own session. Later commands, from this or any other process, attach to it.
+The registry (address -> pid, port) lives in the user cache directory and is
+guarded by a file lock. A server is health-checked (process alive, gRPC port
+accepting) before reuse, and replaced if it is not healthy. Entries record the
+process identity (boot id and start time) next to the PID; a process is only
+signalled if it still matches, so a PID reused after exit or reboot is never
+killed, its stale entry is dropped instead.
+
+A pooled server keeps its link open between commands. For example, pymavlink
+commands cannot use a serial port that a pooled server holds. Stop the pool
+with `mavsdk-pool stop`.
+"""
+import contextlib
+import fcntl
+import os
+import signal
+import socket
+import subprocess
+import time
+from typing import Iterator, Optional
+
+from src.common import cache
+
+POOL_REGISTRY_FILE = "mavsdk_servers.json"
+POOL_LOCK_FILE = "mavsdk_servers.lock"
+POOL_HOST = "127.0.0.1"
+POOL_BASE_PORT = 50100      # Above the 50051 default used by unpooled System()
+POOL_MAX_SERVERS = 64
+SERVER_START_TIMEOUT = 5.0
+SERVER_STOP_TIMEOUT = 2.0
+
+
+@contextlib.contextmanager
+def _locked() -> Iterator[dict]:
+    """Registry under an exclusive lock across processes; written back on exit."""
+    cache.cache_dir().mkdir(parents=True, exist_ok=True)
+    with open(cache.cache_dir() / POOL_LOCK_FILE, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        registry = cache.load_json(POOL_REGISTRY_FILE)
+        try:
+            yield registry
+        finally:
+            cache.save_json(POOL_REGISTRY_FILE, registry)
+
+
+def _server_binary() -> str:
+    """mavsdk_server bundled with the mavsdk package (MAVSDK_SERVER overrides)."""
+    override = os.getenv("MAVSDK_SERVER")
+    if override:
+        return override
+    import mavsdk
+    return os.path.join(os.path.dirname(mavsdk.__file__), "bin", "mavsdk_server")
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_identity(pid: int) -> Optional[str]:
+    """Boot id and start time of a process (None if it does not exist or /proc is unavailable)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip()
+    except OSError:
+        return None
+    # comm (field 2) may contain spaces and parentheses; starttime is field 22
+    start_ticks = stat.rsplit(")", 1)[1].split()[19]
+    return f"{boot_id}:{start_ticks}"
+
+
+def _owned(entry: dict) -> bool:
+    """Whether the entry's PID still belongs to the server that was registered."""
+    identity = entry.get("identity")
+    return identity is not None and _process_identity(entry["pid"]) == identity
+
+
+def _port_open(port: int, timeout: float = 0.2) -> bool:
+    try:
+        with socket.create_connection((POOL_HOST, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _healthy(entry: dict) -> bool:
+    return _owned(entry) and _port_open(entry["port"])
+
+
+def _free_port(registry: dict) -> int:
+    used = {entry["port"] for entry in registry.values()}
+    for port in range(POOL_BASE_PORT, POOL_BASE_PORT + POOL_MAX_SERVERS):
+        if port in used:
+            continue
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            try:
+                s.bind((POOL_HOST, port))
+            except OSError:
+                continue
+        return port
+    raise RuntimeError(f"No free gRPC port in {POOL_BASE_PORT}-{POOL_BASE_PORT + POOL_MAX_SERVERS - 1}")
+
+
+def _stop(pid: int) -> None:
+    """SIGTERM, then SIGKILL if the server has not exited in time (pid must be a verified server)."""
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    deadline = time.time() + SERVER_STOP_TIMEOUT
+    while time.time() < deadline:
+        with contextlib.suppress(ChildProcessError):
+            os.waitpid(pid, os.WNOHANG)  # Reap if started by this process
+        if not _alive(pid):
+            return
+        time.sleep(0.05)
+    with contextlib.suppress(ProcessLookupError):
+        os.kill(pid, signal.SIGKILL)
+
+
+def acquire(address: str) -> tuple[str, int]:
+    """gRPC endpoint of a healthy server for a vehicle address, starting one if needed.
+
+    Args:
+        address: System address in MAVSDK format (e.g. "udp://:14540")
+
+    Returns:
+        Tuple of (host, gRPC port)
+    """
+    with _locked() as registry:
+        entry = registry.get(address)
+        if entry is not None:
+            if _healthy(entry):
+                return POOL_HOST, entry["port"]
+            if _owned(entry):
+                _stop(entry["pid"])  # Our server, but not answering on its port
+            del registry[address]
+
+        port = _free_port(registry)
+        start_time = time.time()
+        process = subprocess.Popen(
+            [_server_binary(), "-p", str(port), address],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,  # Outlives this command
+        )
+        while not _port_open(port):
+            if process.poll() is not None:
+                raise RuntimeError(f"mavsdk_server for {address} exited with code {process.returncode}")
+            if time.time() - start_time > SERVER_START_TIMEOUT:
+                _stop(process.pid)
+                raise TimeoutError(f"mavsdk_server for {address} did not open port {port}")
+            time.sleep(0.02)
+        registry[address] = {"pid": process.pid, "identity": _process_identity(process.pid), "port": port,
+                             "started": time.time()}
+        print(f"Started pooled mavsdk_server for {address} on port {port} "
+              f"({(time.time() - start_time) * 1000:.0f} ms)")
+        return POOL_HOST, port
+
+
+def stop_all() -> int:
+    """Stop every pooled server.
+
+    Returns:
+        Number of servers stopped (stale entries are dropped without signalling)
+    """
+    count = 0
+    with _locked() as registry:
+        for entry in registry.values():
+            if _owned(entry):
+                _stop(entry["pid"])
+                count += 1
+        registry.clear()
+    return count
+
+
+def pool_status() -> None:
+    """Print pooled servers and their health, dropping dead entries."""
+    with _locked() as registry:
+        if not registry:
+            print("No pooled mavsdk_server instances")
+            return
+        print(f"{'Address':32} | {'PID':>7} | {'Port':>5} | {'Uptime':>8} | Health")
+        print("-" * 72)
+        for address, entry in list(registry.items()):
+            owned = _owned(entry)
+            healthy = owned and _port_open(entry["port"])
+            uptime = time.time() - entry.get("started", time.time())
+            print(f"{address:32} | {entry['pid']:7d} | {entry['port']:5d} | {uptime / 60:6.1f}m | "
+                  f"{'✓ ok' if healthy else '✗ down' if owned else '✗ gone (entry dropped)'}")
+            if not owned:
+                del registry[address]
+
+
+def pool_command(action: Optional[str]) -> None:
+    """mavsdk-pool status|stop"""
+    if action in (None, "status"):
+        pool_status()
+    elif action == "stop":
+        print(f"✓ Stopped {stop_all()} pooled mavsdk_server instance(s)")
+    else:
+        raise ValueError(f"Unknown mavsdk-pool action: {action} (expected status or stop)")
@@ -1,44 +1,78 @@
 """EKF and sensor telemetry queries"""
 import asyncio
+import time
 from src.mavsdk.connection import connect
+from src.common import output
+from src.common.constants import DISPLAY_RATE_HZ
+
+
+async def monitor_ekf(duration: float = 10.0, output_format: str = "text",
+                      display_rate: float = DISPLAY_RATE_HZ) -> None:
+    """Monitor EKF status and position for specified duration.
+
+    Each telemetry stream is consumed at its full rate by its own task; text output
+    shows the latest values at display_rate.
+
+    Args:
+        duration: Duration to monitor in seconds
+        output_format: "text", "ndjson" or "csv"
+        display_rate: Text refresh rate in Hz
+    """
+    with output.open_writer(output_format) as writer:
+        d = await connect()
+        latest = {}
+        streams = {
+            "health": d.telemetry.health(),
+            "position": d.telemetry.position(),
+            "velocity_ned": d.telemetry.velocity_ned(),
+            "attitude_euler": d.telemetry.attitude_euler(),
+        }
+        tasks = [asyncio.create_task(_ingest(name, stream, latest, writer)) for name, stream in streams.items()]
 
+        try:
+            if writer is not None:
+                await asyncio.sleep(duration)
+            else:
+                await _display_ekf(latest, duration, display_rate)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+async def _ingest(name: str, stream, latest: dict, writer) -> None:
+    """Consume one telemetry stream, keeping its latest value and writing records."""
+    async for value in stream:
+        latest[name] = value
+        if writer is not None:
+            writer.write_object(name, time.time(), value)
 
-async def monitor_ekf(duration: float = 10.0) -> None:
-    """Monitor EKF status and position for specified duration."""
-    d = await connect()
-    start_time = asyncio.get_event_loop().time()
 
+async def _display_ekf(latest: dict, duration: float, display_rate: float) -> None:
+    """Render the latest EKF telemetry at a fixed rate."""
     print("-- Monitoring EKF --\n")
 
+    start_time = asyncio.get_event_loop().time()
     while (asyncio.get_event_loop().time() - start_time) < duration:
-        try:
-            # Get telemetry with timeouts
-            health = await asyncio.wait_for(_get_health(d), timeout=2.0)
-            position = await asyncio.wait_for(_get_position(d), timeout=2.0)
-            velocity = await asyncio.wait_for(_get_velocity(d), timeout=2.0)
-            attitude = await asyncio.wait_for(_get_attitude(d), timeout=2.0)
-
-            # Display data
-            print(f"Status: Global {'OK' if health.is_global_position_ok else 'FAIL'} | "
-                  f"Local {'OK' if health.is_local_position_ok else 'FAIL'}")
-            print(f"Position: Lat {position.latitude_deg:.7f}° Lon {position.longitude_deg:.7f}° "
-                  f"Alt {position.absolute_altitude_m:.2f}m")
-            print(f"Velocity: N {velocity.north_m_s:.2f} E {velocity.east_m_s:.2f} D {velocity.down_m_s:.2f} m/s")
-            print(f"Attitude: Roll {attitude.roll_deg:.1f}° Pitch {attitude.pitch_deg:.1f}° Yaw {attitude.yaw_deg:.1f}°")
-            print()
-
-            await asyncio.sleep(1.0)
-        except asyncio.TimeoutError:
-            print("Telemetry timeout - data not available")
-            await asyncio.sleep(1.0)
-        except asyncio.CancelledError:
-            break
+        await asyncio.sleep(1.0 / display_rate)
 
+        health = latest.get("health")
+        position = latest.get("position")
+        velocity = latest.get("velocity_ned")
+        attitude = latest.get("attitude_euler")
+        if not (health and position and velocity and attitude):
+            print("Telemetry timeout - data not available")
+            continue
 
-async def _get_health(d):
-    """Get health status."""
-    async for health in d.telemetry.health():
-        return health
+        # Display data
+        print(f"Status: Global {'OK' if health.is_global_position_ok else 'FAIL'} | "
+              f"Local {'OK' if health.is_local_position_ok else 'FAIL'}")
+        print(f"Position: Lat {position.latitude_deg:.7f}° Lon {position.longitude_deg:.7f}° "
+              f"Alt {position.absolute_altitude_m:.2f}m")
+        print(f"Velocity: N {velocity.north_m_s:.2f} E {velocity.east_m_s:.2f} D {velocity.down_m_s:.2f} m/s")
+        print(f"Attitude: Roll {attitude.roll_deg:.1f}° Pitch {attitude.pitch_deg:.1f}° Yaw {attitude.yaw_deg:.1f}°")
+        print()
 
 
 async def _get_position(d):
@@ -47,34 +81,25 @@ async def _get_position(d):
         return position
 
 
-async def _get_velocity(d):
-    """Get velocity in NED frame."""
-    async for velocity in d.telemetry.velocity_ned():
-        return velocity
-
-
-async def _get_attitude(d):
-    """Get attitude (Euler angles)."""
-    async for attitude in d.telemetry.attitude_euler():
-        return attitude
-
-
-async def ekf_status_once() -> None:
+async def ekf_status_once(output_format: str = "text") -> None:
     """Get single snapshot of EKF status."""
-    d = await connect()
-
-    async for health in d.telemetry.health():
-        print(f"Global position: {health.is_global_position_ok}")
-        print(f"Local position:  {health.is_local_position_ok}")
-        break
-
-    try:
-        async def get_position():
-            async for position in d.telemetry.position():
-                return position
-
-        position = await asyncio.wait_for(get_position(), timeout=3.0)
-        print(f"Lat: {position.latitude_deg:.7f}° Lon: {position.longitude_deg:.7f}°")
-        print(f"Alt: {position.absolute_altitude_m:.2f}m")
-    except asyncio.TimeoutError:
-        print("Position: Not available (timeout - GPS may not be locked)")
+    with output.open_writer(output_format) as writer:
+        d = await connect()
+
+        async for health in d.telemetry.health():
+            if writer is not None:
+                writer.write_object("health", time.time(), health)
+            else:
+                print(f"Global position: {health.is_global_position_ok}")
+                print(f"Local position:  {health.is_local_position_ok}")
+            break
+
+        try:
+            position = await asyncio.wait_for(_get_position(d), timeout=3.0)
+            if writer is not None:
+                writer.write_object("position", time.time(), position)
+            else:
+                print(f"Lat: {position.latitude_deg:.7f}° Lon: {position.longitude_deg:.7f}°")
+                print(f"Alt: {position.absolute_altitude_m:.2f}m")
+        except asyncio.TimeoutError:
+            print("Position: Not available (timeout - GPS may not be locked)")
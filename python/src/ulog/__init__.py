@@ -0,0 +1 @@
+"""ULog (PX4 flight log) modules"""
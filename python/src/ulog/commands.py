@@ -0,0 +1,99 @@
+"""ulog-summary / ulog-export commands"""
+import os
+import time
+
+import numpy as np
+
+from src.ulog.parser import ULog, flatten
+
+# ULog 'L' message levels (syslog numbering)
+LOG_LEVEL_NAMES = {0: "EMERG", 1: "ALERT", 2: "CRIT", 3: "ERROR", 4: "WARNING", 5: "NOTICE", 6: "INFO", 7: "DEBUG"}
+WARNING_LEVEL = 4
+
+
+def ulog_summary(path: str) -> None:
+    """Print log metadata, topics with rates, and warnings/errors."""
+    start_time = time.time()
+    with ULog(path, topics=()) as log:
+        index = log.index
+        duration = log.duration()
+        print(f"{path}: ULog v{index.version}, {os.path.getsize(path) / 1e6:.1f} MB, "
+              f"{duration:.1f}s of data (indexed in {time.time() - start_time:.2f}s)")
+        for key in ("sys_name", "ver_hw", "ver_sw", "ver_sw_release", "sys_uuid"):
+            if key in index.info:
+                print(f"  {key}: {index.info[key]}")
+        print(f"  {len(index.parameters)} parameters, {len(index.messages)} logged messages, "
+              f"{index.dropouts} dropouts ({index.dropout_ms} ms)")
+
+        print(f"\n{'Topic':40} | {'Inst':>4} | {'Records':>9} | {'Rate':>8}")
+        print("-" * 70)
+        for sub in log.topics():
+            rate = sub.count / duration if duration > 0 else 0.0
+            print(f"{sub.name:40} | {sub.multi_id:4d} | {sub.count:9d} | {rate:6.1f}Hz")
+
+        warnings = [m for m in index.messages if m.level <= WARNING_LEVEL]
+        if warnings:
+            print(f"\nWarnings and errors ({len(warnings)}):")
+            for m in warnings:
+                offset = (m.timestamp - index.start_timestamp) * 1e-6
+                print(f"  [{offset:9.3f}s] {LOG_LEVEL_NAMES.get(m.level, m.level)}: {m.text}")
+
+
+def ulog_export(path: str, topics: list[str], out_dir: str = ".", output_format: str = "csv") -> None:
+    """Export topics to one file per topic instance.
+
+    Args:
+        path: .ulg file
+        topics: Topic names
+        out_dir: Output directory
+        output_format: "csv" (flattened columns) or "npy" (structured array)
+    """
+    if output_format not in ("csv", "npy"):
+        raise ValueError(f"Unknown export format: {output_format}")
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    start_time = time.time()
+
+    with ULog(path, topics=topics) as log:
+        print(f"Indexed {path} in {time.time() - start_time:.2f}s")
+        found = {sub.name for sub in log.topics()}
+        for name in topics:
+            if name not in found:
+                print(f"✗ Topic {name} not in log")
+
+        for sub in log.topics():
+            if sub.offsets is None:
+                continue
+            records = log.topic(sub.name, sub.multi_id)
+            target = os.path.join(out_dir, f"{stem}_{sub.name}_{sub.multi_id}.{output_format}")
+            if output_format == "npy":
+                np.save(target, records)
+            else:
+                _write_csv(target, records)
+            print(f"✓ {sub.name}[{sub.multi_id}]: {len(records)} records → {target}")
+
+    print(f"Done in {time.time() - start_time:.2f}s")
+
+
+def _quote(column: np.ndarray) -> np.ndarray:
+    """CSV-quote a char[] column: always enclosed in quotes, embedded quotes doubled."""
+    text = np.char.replace(np.char.decode(column, "ascii", "replace"), '"', '""')
+    return np.char.add(np.char.add('"', text), '"')
+
+
+def _write_csv(path: str, records: np.ndarray, chunk_rows: int = 100_000) -> None:
+    """Write flattened columns, converting to text a column at a time per chunk of rows.
+
+    char[] columns are quoted, so commas, quotes and newlines in strings keep the columns aligned.
+    """
+    names, columns = flatten(records)
+    with open(path, "w") as f:
+        f.write(",".join(names) + "\n")
+        for first in range(0, len(records), chunk_rows):
+            text = [
+                (_quote(column[first:first + chunk_rows])
+                 if column.dtype.kind == "S" else column[first:first + chunk_rows].astype(str)).tolist()
+                for column in columns
+            ]
+            f.write("\n".join(map(",".join, zip(*text))))
+            f.write("\n")
@@ -0,0 +1,251 @@
+"""Streaming ULog parser that decodes topics in bulk into NumPy structured arrays
+
+The file is memory-mapped and walked once. That pass reads the definitions
+(formats, info, parameters) and, for each data message, only its 3-byte header
+and msg_id. It records the file offsets of the topics that were asked for and
+counts the rest. Decoding a topic then gathers all its records at once into a
+structured array whose dtype is built from the topic's format definition. No
+Python object is created per message, and memory grows only with the topics
+requested.
+
+Format reference: https://docs.px4.io/main/en/dev_log/ulog_file_format.html
+"""
+import mmap
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import numpy as np
+
+ULOG_MAGIC = b"ULog\x01\x12\x35"
+ULOG_HEADER_SIZE = 16
+
+ULOG_TYPES = {
+    "int8_t": "i1", "uint8_t": "u1", "int16_t": "<i2", "uint16_t": "<u2",
+    "int32_t": "<i4", "uint32_t": "<u4", "int64_t": "<i8", "uint64_t": "<u8",
+    "float": "<f4", "double": "<f8", "bool": "?", "char": "S1",
+}
+
+# Bytes gathered per vectorized copy when decoding a topic
+GATHER_CHUNK_BYTES = 8 << 20
+
+_HEADER = struct.Struct("<HB")
+_MSG_ID = struct.Struct("<H")
+
+
+@dataclass
+class Subscription:
+    """A logged topic instance (ULog 'A' message)."""
+    name: str
+    multi_id: int
+    count: int = 0
+    offsets: Optional[array] = None  # Record offsets, only for requested topics
+
+
+@dataclass
+class LoggedMessage:
+    level: int
+    timestamp: int
+    text: str
+
+
+@dataclass
+class ULogIndex:
+    """Everything except topic data, gathered in the single pass."""
+    version: int = 0
+    start_timestamp: int = 0
+    formats: dict[str, list[tuple[str, str]]] = field(default_factory=dict)  # name -> [(type, field)]
+    info: dict[str, object] = field(default_factory=dict)
+    parameters: dict[str, float] = field(default_factory=dict)
+    subscriptions: dict[int, Subscription] = field(default_factory=dict)
+    messages: list[LoggedMessage] = field(default_factory=list)
+    dropouts: int = 0
+    dropout_ms: int = 0
+    first_data_offset: Optional[int] = None
+    last_data_offset: Optional[int] = None
+
+
+class ULog:
+    """Memory-mapped ULog file.
+
+    Use as a context manager; arrays returned by `topic()` are copies and stay
+    valid after the file is closed.
+    """
+
+    def __init__(self, path: str, topics: Optional[Iterable[str]] = None):
+        """
+        Args:
+            path: .ulg file
+            topics: Topic names whose data will be decoded; None indexes all topics
+        """
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._wanted = set(topics) if topics is not None else None
+        self.index = ULogIndex()
+        self._dtypes: dict[tuple[str, bool], np.dtype] = {}
+        self._parse()
+
+    def __enter__(self) -> "ULog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def _parse(self) -> None:
+        buf = self._map
+        if buf[:7] != ULOG_MAGIC:
+            raise ValueError("Not a ULog file")
+        index = self.index
+        index.version = buf[7]
+        index.start_timestamp = struct.unpack_from("<Q", buf, 8)[0]
+
+        subscriptions = index.subscriptions
+        unpack_header = _HEADER.unpack_from
+        unpack_msg_id = _MSG_ID.unpack_from
+        end = len(buf)
+        pos = ULOG_HEADER_SIZE
+
+        # Hot loop: one header unpack per message, offsets only for requested topics
+        while pos + 3 <= end:
+            size, msg_type = unpack_header(buf, pos)
+            payload = pos + 3
+            pos = payload + size
+            if pos > end:
+                break  # Truncated final message (log cut off mid-write)
+            if msg_type == 0x44:  # 'D'
+                sub = subscriptions.get(unpack_msg_id(buf, payload)[0])
+                if sub is None:
+                    continue
+                sub.count += 1
+                if sub.offsets is not None:
+                    sub.offsets.append(payload + 2)
+                if index.first_data_offset is None:
+                    index.first_data_offset = payload + 2
+                index.last_data_offset = payload + 2
+            else:
+                self._definition(msg_type, bytes(buf[payload:pos]))
+
+    def _definition(self, msg_type: int, payload: bytes) -> None:
+        """Handle a non-data message."""
+        index = self.index
+        kind = chr(msg_type)
+        if kind == "F":
+            name, _, fields = payload.decode("ascii", "replace").partition(":")
+            index.formats[name] = [
+                tuple(item.split(" ", 1)) for item in fields.split(";") if item.strip()
+            ]
+        elif kind == "A":
+            multi_id, msg_id = struct.unpack_from("<BH", payload)
+            name = payload[3:].decode("ascii", "replace")
+            wanted = self._wanted is None or name in self._wanted
+            index.subscriptions[msg_id] = Subscription(name, multi_id, offsets=array("Q") if wanted else None)
+        elif kind in "IP":
+            key_len = payload[0]
+            type_name, _, key = payload[1:1 + key_len].decode("ascii", "replace").partition(" ")
+            value = self._scalar(type_name, payload[1 + key_len:])
+            (index.info if kind == "I" else index.parameters)[key] = value
+        elif kind == "L":
+            level, timestamp = struct.unpack_from("<BQ", payload)
+            if level >= ord("0"):
+                level -= ord("0")  # Older loggers write the level as an ASCII digit
+            index.messages.append(LoggedMessage(level, timestamp, payload[9:].decode("utf-8", "replace")))
+        elif kind == "C":
+            level, _tag, timestamp = struct.unpack_from("<BHQ", payload)
+            index.messages.append(LoggedMessage(level, timestamp, payload[11:].decode("utf-8", "replace")))
+        elif kind == "O":
+            index.dropouts += 1
+            index.dropout_ms += struct.unpack_from("<H", payload)[0]
+
+    @staticmethod
+    def _scalar(type_name: str, raw: bytes):
+        """Value of an info/parameter message."""
+        if type_name.startswith("char["):
+            return raw.decode("utf-8", "replace")
+        base = type_name.split("[")[0]
+        if base not in ULOG_TYPES:
+            return raw
+        values = np.frombuffer(raw, dtype=ULOG_TYPES[base])
+        return values[0].item() if len(values) == 1 else values.tolist()
+
+    def dtype(self, format_name: str, strip_padding: bool = True) -> np.dtype:
+        """Structured dtype of a format; trailing padding is not logged, so it is dropped."""
+        key = (format_name, strip_padding)
+        if key in self._dtypes:
+            return self._dtypes[key]
+        fields = list(self.index.formats[format_name])
+        if strip_padding:
+            while fields and fields[-1][1].startswith("_padding"):
+                fields.pop()
+        descr = []
+        for type_name, name in fields:
+            base, _, count = type_name.partition("[")
+            count = int(count.rstrip("]")) if count else 0
+            if base == "char" and count:
+                descr.append((name, f"S{count}"))
+                continue
+            element = ULOG_TYPES.get(base) or self.dtype(base, strip_padding=False)
+            descr.append((name, element, (count,)) if count else (name, element))
+        dtype = np.dtype(descr)
+        self._dtypes[key] = dtype
+        return dtype
+
+    def topics(self) -> list[Subscription]:
+        """Logged topic instances, by name then multi id."""
+        return sorted(self.index.subscriptions.values(), key=lambda sub: (sub.name, sub.multi_id))
+
+    def topic(self, name: str, multi_id: int = 0) -> np.ndarray:
+        """All records of one topic instance as a structured array."""
+        sub = next((s for s in self.index.subscriptions.values()
+                    if s.name == name and s.multi_id == multi_id), None)
+        if sub is None:
+            raise KeyError(f"Topic {name} (instance {multi_id}) not in log")
+        if sub.offsets is None:
+            raise KeyError(f"Topic {name} was not requested when the log was opened")
+        dtype = self.dtype(name)
+        out = np.empty(len(sub.offsets), dtype=dtype)
+        if not len(out):
+            return out
+
+        source = np.frombuffer(self._map, dtype=np.uint8)
+        target = out.view(np.uint8).reshape(len(out), dtype.itemsize)
+        offsets = np.frombuffer(sub.offsets, dtype=np.uint64).astype(np.int64)
+        columns = np.arange(dtype.itemsize)
+        rows = max(GATHER_CHUNK_BYTES // (dtype.itemsize * 8), 1)
+        for first in range(0, len(offsets), rows):
+            chunk = offsets[first:first + rows]
+            target[first:first + len(chunk)] = source[chunk[:, None] + columns]
+        del source  # Release the buffer export so the mmap can be closed
+        return out
+
+    def duration(self) -> float:
+        """Seconds between the first and last data record."""
+        if self.index.first_data_offset is None:
+            return 0.0
+        first = struct.unpack_from("<Q", self._map, self.index.first_data_offset)[0]
+        last = struct.unpack_from("<Q", self._map, self.index.last_data_offset)[0]
+        return (last - first) * 1e-6
+
+
+def flatten(records: np.ndarray) -> tuple[list[str], list[np.ndarray]]:
+    """Column names and 1-D columns of a (nested) structured array, e.g. for CSV."""
+    names, columns = [], []
+
+    def visit(prefix: str, values: np.ndarray) -> None:
+        if values.dtype.names:
+            for name in values.dtype.names:
+                if not name.startswith("_padding"):
+                    visit(f"{prefix}{name}" if not prefix else f"{prefix}.{name}", values[name])
+        elif values.ndim > 1:
+            for i in range(values.shape[1]):
+                visit(f"{prefix}[{i}]", values[:, i])
+        else:
+            names.append(prefix)
+            columns.append(values)
+
+    visit("", records)
+    return names, columns